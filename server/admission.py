@@ -0,0 +1,207 @@
+"""
+Per-session admission control for the Socket.IO servers (app.py, asgi_app.py).
+
+Before this, a client sending frames as fast as it could had every frame that arrived
+while it was idle analysed, so it took a slot again the moment it gave one up.
+AdmissionController decides, for each frame, whether it is analysed at all and when it
+gets a slot:
+
+- token bucket per session: tokens refill at SESSION_FPS per second up to BURST; a
+  frame that finds no token is throttled ('rate'), so SESSION_FPS is the per-session
+  frame-rate ceiling (ADMISSION_FPS=0 turns it off)
+- global in-flight limit: at most max_in_flight frames are analysed at once over all
+  sessions; a session that finds every slot taken waits in line
+- round-robin: a session has at most one frame in flight or waiting, and a freed slot
+  goes to the session that has waited longest, so every waiting session gets a turn
+  before any session gets a second one. The line is never longer than the number of
+  sessions; sustained overload is degradation.py's job
+
+Every frame a session sends is charged to its bucket, including frames the server then
+drops because the session is still busy, so a client sending faster than the ceiling
+is throttled whatever the load. Throttled frames get a 'throttled' reply ({reason,
+retry_after, timestamp}) instead of being dropped silently.
+
+The controller keeps its per-session state and counters in the servers' session dicts,
+like DegradationController's frame count. acquire() / release() take and hand on
+slots; the servers do the waiting (eventlet events in app.py, futures in asgi_app.py).
+
+Run this module to simulate one greedy client among steady ones, with and without the
+frame-rate ceiling (per-client rates are per steady client on average):
+
+    python admission.py --greedy-fps 60 --clients 8 --fps 10 --service-ms 30
+"""
+
+import argparse
+import heapq
+import os
+from collections import deque
+
+RATE = 'rate'
+
+# Per-session ceiling in frames per second (0: no ceiling)
+SESSION_FPS = float(os.environ.get('ADMISSION_FPS', 15))
+# Frames a session may send back to back before the ceiling applies
+BURST = int(os.environ.get('ADMISSION_BURST', 5))
+# Frames analysed at once over all sessions (0: one per inference thread)
+MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', 0))
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight, fps=SESSION_FPS, burst=BURST):
+        self.max_in_flight = max(1, max_in_flight)
+        self.fps = fps
+        self.burst = max(1, burst)
+        self.in_flight = 0
+        # (session, waiter) in arrival order, one entry per session at most
+        self.waiting = deque()
+        self.admitted = 0
+        self.throttled = 0
+
+    def _state(self, session, now):
+        state = session.get('admission')
+        if state is None:
+            state = session['admission'] = {'tokens': float(self.burst), 'updated': now, 'admitted': 0,
+                                            'throttled': 0, 'in_flight': False, 'waiting': False}
+        return state
+
+    def admit(self, session, now):
+        """
+        None if this frame of the session may go on, else why it is throttled (RATE).
+        Call for every frame the session sends; now is a monotonic time in seconds.
+        """
+        state = self._state(session, now)
+        if self.fps:
+            state['tokens'] = min(self.burst, state['tokens'] + (now - state['updated']) * self.fps)
+            state['updated'] = now
+            if state['tokens'] < 1:
+                self.throttled += 1
+                state['throttled'] += 1
+                return RATE
+            state['tokens'] -= 1
+        self.admitted += 1
+        state['admitted'] += 1
+        return None
+
+    def acquire(self, session, waiter):
+        """
+        Take a slot for the session: True if it has one now, False if it is in line and
+        waiter will be handed back by release() when its turn comes.
+        """
+        state = self._state(session, 0.0)
+        if self.in_flight < self.max_in_flight:
+            self.in_flight += 1
+            state['in_flight'] = True
+            return True
+        self.waiting.append((session, waiter))
+        state['waiting'] = True
+        return False
+
+    def release(self, session):
+        """Give up the session's slot: the waiter of the session it passes to (wake it), or None."""
+        session['admission']['in_flight'] = False
+        if not self.waiting:
+            self.in_flight -= 1
+            return None
+        # The slot goes straight to the longest-waiting session; in_flight is unchanged
+        following, waiter = self.waiting.popleft()
+        following['admission']['waiting'] = False
+        following['admission']['in_flight'] = True
+        return waiter
+
+    def throttled_payload(self, session, reason, timestamp):
+        """The 'throttled' reply to a rejected frame; retry_after (ms) is when the session's next token is due."""
+        retry_after = max(0, round((1 - session['admission']['tokens']) / self.fps * 1000))
+        return {'type': 'throttled', 'reason': reason, 'retry_after': retry_after, 'timestamp': timestamp}
+
+    def summary(self, sessions):
+        """Limits, totals and per-session counters (sessions: sid -> session dict) for the status route."""
+        per_session = {}
+        for sid, session in sessions.items():
+            state = session.get('admission')
+            if state is not None:
+                per_session[sid] = {'admitted': state['admitted'], 'throttled': state['throttled'],
+                                    'in_flight': int(state['in_flight']), 'waiting': int(state['waiting'])}
+        return {
+            'fps': self.fps,
+            'burst': self.burst,
+            'max_in_flight': self.max_in_flight,
+            'in_flight': self.in_flight,
+            'waiting': len(self.waiting),
+            'admitted': self.admitted,
+            'throttled': self.throttled,
+            'sessions': per_session,
+        }
+
+
+def simulate(controller, rates, service, seconds, seed=0):
+    """
+    Event simulation of app.py's frame handling: each client sends at its rate (with some
+    jitter), frames go through controller.admit(), a frame arriving while its session is
+    busy is dropped, and the others take a slot in turn. Returns per-client results.
+    """
+    import random
+
+    rng = random.Random(seed)
+    events = []
+    for client, fps in enumerate(rates):
+        heapq.heappush(events, (rng.uniform(0, 1 / fps), 'frame', client))
+    sessions = [{'busy': False, 'arrived': None} for _ in rates]
+    results = [{'sent': 0, 'processed': 0, 'throttled': 0, 'dropped': 0, 'latency': []} for _ in rates]
+
+    while events:
+        now, kind, client = heapq.heappop(events)
+        session, result = sessions[client], results[client]
+        if kind == 'frame':
+            following = now + rng.uniform(0.9, 1.1) / rates[client]
+            if following < seconds:
+                heapq.heappush(events, (following, 'frame', client))
+            result['sent'] += 1
+            if controller.admit(session, now):
+                result['throttled'] += 1
+            elif session['busy']:
+                result['dropped'] += 1
+            else:
+                session['busy'], session['arrived'] = True, now
+                if controller.acquire(session, client):
+                    heapq.heappush(events, (now + service, 'done', client))
+        else:
+            session['busy'] = False
+            result['processed'] += 1
+            result['latency'].append(now - session['arrived'])
+            following = controller.release(session)
+            if following is not None:
+                heapq.heappush(events, (now + service, 'done', following))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a greedy client among steady ones, with and without a frame-rate ceiling")
+    parser.add_argument("--greedy-fps", type=float, default=60)
+    parser.add_argument("--clients", type=int, default=8, help="Steady clients")
+    parser.add_argument("--fps", type=float, default=10, help="Frame rate of the steady clients")
+    parser.add_argument("--service-ms", type=float, default=30, help="Processing time per frame")
+    parser.add_argument("--slots", type=int, default=2, help="Frames processed at once")
+    parser.add_argument("--ceiling", type=float, default=SESSION_FPS or 15, help="Per-session fps ceiling")
+    parser.add_argument("--seconds", type=float, default=60)
+    args = parser.parse_args()
+
+    import numpy as np
+
+    rates = [args.greedy_fps] + [args.fps] * args.clients
+    print(f"1 client at {args.greedy_fps:g} fps + {args.clients} at {args.fps:g} fps, {args.slots} slots, "
+          f"{args.service_ms:g} ms per frame")
+    print("ceiling   clients  sent/s  processed/s  throttled/s  dropped/s  p50 ms  p95 ms")
+    # fps=0: no ceiling, only the in-flight limit and the line (what the servers did before)
+    for ceiling in (0, args.ceiling):
+        controller = AdmissionController(args.slots, fps=ceiling, burst=BURST)
+        results = simulate(controller, rates, args.service_ms / 1000, args.seconds)
+        for label, group in (('greedy', results[:1]), ('steady', results[1:])):
+            latency = np.array([t for result in group for t in result['latency']] or [0.0]) * 1000
+            per_second = lambda key: sum(result[key] for result in group) / len(group) / args.seconds
+            print(f"{ceiling or 'none':>7}   {label:7s} {per_second('sent'):7.1f} {per_second('processed'):12.1f} "
+                  f"{per_second('throttled'):12.1f} {per_second('dropped'):10.1f} "
+                  f"{np.percentile(latency, 50):7.1f} {np.percentile(latency, 95):7.1f}")
+
+
+if __name__ == "__main__":
+    main()
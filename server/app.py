@@ -1,35 +1,30 @@
 from flask import Flask, request, jsonify
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
-import base64
 import numpy as np
 import logging
 import time
 import os
-import sys
-from io import BytesIO
-from PIL import Image
+from collections import deque
 
-# Add the secret-sauce directory to the Python path so we can import from it
-secret_sauce_path = os.path.join(os.path.dirname(__file__), 'secret-sauce')
-if secret_sauce_path not in sys.path:
-    sys.path.append(secret_sauce_path)
+# Inference (JPEG decode, MediaPipe, CNN) runs on native threads so it doesn't block the
+# event loop; INFERENCE_OFFLOAD=0 runs it inline on the hub as before (for comparison)
+INFERENCE_OFFLOAD = os.environ.get('INFERENCE_OFFLOAD', '1') != '0'
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', os.cpu_count() or 1))
+# tpool reads its pool size when first imported
+os.environ.setdefault('EVENTLET_THREADPOOL_SIZE', str(INFERENCE_THREADS))
 
-# Try importing OpenCV with error handling for missing dependencies
-try:
-    import cv2
-except ImportError as e:
-    print(f"Warning: OpenCV import error: {e}")
-    print("You may need to install a different OpenCV variant like 'opencv-contrib-python-headless'")
-    cv2 = None
+import eventlet
+from eventlet import tpool
+from eventlet.event import Event
 
-# Import the ASL recognition components from secret-sauce
-try:
-    from asl_recognition import ASLRecognizer
-    from main import handDetector
-except ImportError as e:
-    print(f"Error importing ASL recognition components: {e}")
-    print("Make sure the secret-sauce directory is properly set up")
+from admission import MAX_IN_FLIGHT, AdmissionController
+from dedupe import DedupeStats, FrameDeduper, frame_bytes
+from degradation import LEVELS, DegradationController, UPDATE_INTERVAL
+from emission import CHANGES, ChangeFilter, EmissionStats, check_mode
+from prediction_codec import BINARY, PredictionCodec, check_encoding, table_letters
+from profiles import PROFILES, get_profile
+from sign_model import SignLanguageModel
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -44,267 +39,42 @@ socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 stats = {
     'frames_received': 0,
     'frames_processed': 0,
+    'frames_dropped': 0,
+    # Frames not analysed because the degradation level only takes every k-th frame
+    'frames_skipped': 0,
     'start_time': time.time(),
-    'processing_times': []
+    'processing_times': [],
+    # Event-loop lag samples in seconds (see monitor_loop_lag)
+    'loop_lag': deque(maxlen=600),
+    'loop_lag_max': 0.0,
 }
 
-# Actual sign language detection model using the secret-sauce
-class SignLanguageModel:
-    def __init__(self):
-        logger.info("Initializing sign language detection model...")
-        # Check if OpenCV is available
-        self.ready = cv2 is not None
-        if not self.ready:
-            logger.warning("OpenCV is not available. Using fallback mode.")
-            return
-        
-        try:
-            # Set the correct model path - use the one in secret-sauce/models
-            model_path = os.path.join(secret_sauce_path, 'models', 'asl_model.h5')
-            print("MODEL PATH: ", model_path)
-            
-            # Initialize the hand detector with ASL recognition
-            self.detector = handDetector(detectionCon=0.5, use_asl=True)
-            
-            # If the detector wasn't able to initialize the ASL recognizer on its own,
-            # we'll explicitly initialize it
-            if not self.detector.asl_recognizer:
-                self.detector.asl_recognizer = ASLRecognizer(model_path)
-                self.detector.use_asl = True
-            
-            # Define custom rules for conflicting predictions from main.py
-            self.custom_rules = {
-                ("H", "S"): "A",
-                ("U", "B"): "B",
-                ("C", "Y"): "C",
-                ("O", "C"): "C",
-                ("R", "D"): "D",
-                ("B", "F"): "F",
-                ("U", "F"): "F",
-                ("X", "I"): "I",
-                ("X", "Y"): "I",
-                ("R", "I"): "I",
-                ("X", "L"): "L",
-                ("M", "S"): "M",
-                ("M", "X"): "M",
-                ("N", "M"): "N",
-                ("N", "G"): "N",
-                ("S", "T"): "T",
-                ("H", "T"): "T",
-                ("U", "K"): "U",
-                ("V", "K"): "V",
-                ("H", "C"): "X",
-                ("G", "C"): "X",
-                ("P", "M"): "P",
-                ("G", "S"): "P",
-                ("G", "M"): "P",
-                ("Q", "M"): "Q",
-            }
-            
-            # Also ensure class names are loaded
-            class_names_path = os.path.join(secret_sauce_path, 'models', 'class_names.txt')
-            if os.path.exists(class_names_path):
-                with open(class_names_path, 'r') as f:
-                    self.detector.asl_recognizer.class_names = [line.strip() for line in f.readlines()]
-                logger.info(f"Loaded {len(self.detector.asl_recognizer.class_names)} class names")
-            
-            logger.info("ASL recognition model initialized successfully")
-            self.ready = True
-        except Exception as e:
-            logger.error(f"Failed to initialize ASL recognition model: {e}")
-            self.ready = False
-        
-    def predict(self, frame):
-        """
-        Process a frame to detect and recognize ASL signs
-        Returns a dictionary with prediction results
-        """
-        if not self.ready:
-            logger.warning("Model not ready")
-            return {"letter": None, "confidence": 0, "error": "Model not ready"}
-        
-        try:
-            # Process the frame with hand detection
-            img = self.detector.findHands(frame.copy())
-            lmList, bbox = self.detector.findPosition(img, draw=False)
-            
-            # Initialize result
-            result = {
-                "letter": None,
-                "confidence": 0,
-                "alternatives": []
-            }
-            
-            # If a hand is detected and the detector has processed ASL recognition
-            if lmList and self.detector.asl_recognizer:
-                # Get the model's best prediction
-                model_letter, model_confidence = self.detector.get_asl_best()
-                
-                # Get top-3 predictions for alternatives
-                top3 = self.detector.get_asl_top3()
-                alternatives = [{"letter": letter, "confidence": float(conf)} for letter, conf in top3]
-                
-                # Get geometry-based prediction using the main.py implementation
-                geometry_letter = self._get_geometry_prediction(lmList)
-                
-                # Determine final letter using combined approach
-                final_letter = self._determine_final_letter(model_letter, model_confidence, geometry_letter)
-                
-                # Only return a prediction if we're confident enough
-                if model_confidence > 0.3 or final_letter:
-                    result["letter"] = final_letter or model_letter
-                    result["confidence"] = float(model_confidence)
-                    result["alternatives"] = alternatives
-                    result["geometry_letter"] = geometry_letter
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error in prediction: {e}")
-            return {"letter": None, "confidence": 0, "error": str(e)}
-    
-    def _get_geometry_prediction(self, lmList):
-        """Geometry-based prediction using hand landmarks based on exact main.py implementation"""
-        try:
-            # If no landmarks are detected, return None
-            if not lmList or len(lmList) < 21:
-                return None
-                
-            # Initialize result
-            result = ""
-            
-            # Define finger parts indices as in main.py
-            finger_mcp = [5, 9, 13, 17]
-            finger_dip = [6, 10, 14, 18]
-            finger_pip = [7, 11, 15, 19]
-            finger_tip = [8, 12, 16, 20]
-            
-            # Initialize fingers list (0.0, 0.25, 0.5, 1.0 values)
-            fingers = []
-            
-            # Calculate finger positions exactly as in main.py
-            for id in range(4):
-                if(lmList[finger_tip[id]][1]+ 25 < lmList[finger_dip[id]][1] and lmList[16][2]<lmList[20][2]):
-                    fingers.append(0.25)
-                elif(lmList[finger_tip[id]][2] > lmList[finger_dip[id]][2]):
-                    fingers.append(0)
-                elif(lmList[finger_tip[id]][2] < lmList[finger_pip[id]][2]): 
-                    fingers.append(1)
-                elif(lmList[finger_tip[id]][1] > lmList[finger_pip[id]][1] and lmList[finger_tip[id]][1] > lmList[finger_dip[id]][1]): 
-                    fingers.append(0.5)
-            
-            # Check for each letter pattern using EXACT conditions from main.py
-            if(lmList[3][2] > lmList[4][2]) and (lmList[3][1] > lmList[6][1])and (lmList[4][2] < lmList[6][2]) and fingers.count(0) == 4:
-                result = "A"
-                
-            elif(lmList[3][1] > lmList[4][1]) and fingers.count(1) == 4:
-                result = "B"
-            
-            elif(lmList[3][1] > lmList[6][1]) and fingers.count(0.5) >= 1 and (lmList[4][2]> lmList[8][2]):
-                result = "C"
-                
-            elif(fingers[0]==1) and fingers.count(0) == 3 and (lmList[3][1] > lmList[4][1]):
-                result = "D"
-            
-            elif (lmList[3][1] < lmList[6][1]) and fingers.count(0) == 4 and lmList[12][2]<lmList[4][2]:
-                result = "E"
-
-            elif (fingers.count(1) == 3) and (fingers[0]==0) and (lmList[3][2] > lmList[4][2]):
-                result = "F"
+# How often the lag monitor wakes up, in seconds
+LAG_INTERVAL = 0.1
 
-            elif(fingers[0]==0.25) and fingers.count(0) == 3:
-                result = "G"
-
-            elif(fingers[0]==0.25) and(fingers[1]==0.25) and fingers.count(0) == 2:
-                result = "H"
-            
-            elif (lmList[4][1] < lmList[6][1]) and fingers.count(0) == 3:
-                if (len(fingers)==4 and fingers[3] == 1):
-                    result = "I"
-            
-            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] > lmList[10][1] and fingers.count(1) == 2):
-                result = "K"
-                
-            elif(fingers[0]==1) and fingers.count(0) == 3 and (lmList[3][1] < lmList[4][1]):
-                result = "L"
-            
-            elif (lmList[4][1] < lmList[16][1]) and fingers.count(0) == 4:
-                result = "M"
-            
-            elif (lmList[4][1] < lmList[12][1]) and fingers.count(0) == 4:
-                result = "N"
-                
-            elif (lmList[4][1] > lmList[12][1]) and lmList[4][2]<lmList[6][2] and fingers.count(0) == 4:
-                result = "T"
+# Per-session frame-rate ceiling, and at most ADMISSION_MAX_IN_FLIGHT frames (default:
+# INFERENCE_THREADS) on the thread pool at once, handed to waiting sessions in turn (see admission.py)
+admission = AdmissionController(MAX_IN_FLIGHT or INFERENCE_THREADS)
 
-            elif (lmList[4][1] > lmList[12][1]) and lmList[4][2]<lmList[12][2] and fingers.count(0) == 4:
-                result = "S"
-                
-            elif(lmList[4][2] < lmList[8][2]) and (lmList[4][2] < lmList[12][2]) and (lmList[4][2] < lmList[16][2]) and (lmList[4][2] < lmList[20][2]):
-                result = "O"
-            
-            elif(fingers[2] == 0) and (lmList[4][2] < lmList[12][2]) and (lmList[4][2] > lmList[6][2]):
-                if (len(fingers)==4 and fingers[3] == 0):
-                    result = "P"
-            
-            elif(fingers[1] == 0) and (fingers[2] == 0) and (fingers[3] == 0) and (lmList[8][2] > lmList[5][2]) and (lmList[4][2] < lmList[1][2]):
-                result = "Q"
-                
-            elif(lmList[8][1] < lmList[12][1]) and (fingers.count(1) == 2) and (lmList[9][1] > lmList[4][1]):
-                result = "R"
-                
-            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 2 and lmList[3][2] > lmList[4][2] and (lmList[8][1] - lmList[11][1]) <= 50):
-                result = "U"
-                
-            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 2 and lmList[3][2] > lmList[4][2]):
-                result = "V"
-            
-            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 3):
-                result = "W"
-            
-            elif (fingers[0] == 0.5 and fingers.count(0) == 3 and lmList[4][1] > lmList[6][1]):
-                result = "X"
-            
-            elif(fingers.count(0) == 3) and (lmList[3][1] < lmList[4][1]):
-                if (len(fingers)==4 and fingers[3] == 1):
-                    result = "Y"
-            
-            return result if result else None
-            
-        except Exception as e:
-            logger.error(f"Error in geometry prediction: {e}")
-            return None
-    
-    def _determine_final_letter(self, model_letter, model_confidence, geometry_letter):
-        """Determine the final letter by combining model and geometry predictions"""
-        # If there's no geometry prediction, use the model
-        if not geometry_letter:
-            return model_letter
-        
-        # If model and geometry agree, use that letter
-        if model_letter == geometry_letter:
-            return model_letter
-        
-        # Check custom rules for known conflicts
-        rule_key = (model_letter, geometry_letter)
-        if rule_key in self.custom_rules:
-            return self.custom_rules[rule_key]
-        
-        # Default to model's prediction if confidence is high enough
-        if model_confidence > 0.7:
-            return model_letter
-        
-        # Fall back to geometry for specific letters that the model struggles with
-        geometry_reliable_letters = ["A", "B", "C", "D", "Y"]
-        if geometry_letter in geometry_reliable_letters:
-            return geometry_letter
-        
-        # If still undecided, use model prediction
-        return model_letter
+# Per-client state: each session has its own MediaPipe tracking context, so sessions
+# can be processed in parallel; a session only ever has one frame in flight
+sessions = {}
 
 # Initialize the model
 model = SignLanguageModel()
 
+# Steps processing quality down under load and back up when it passes (see degradation.py)
+degradation = DegradationController()
+
+# Binary prediction messages for sessions that ask for them (see prediction_codec.py)
+codec = PredictionCodec(table_letters(model.class_names), PROFILES, [level.name for level in LEVELS])
+
+# Prediction messages sent and suppressed (sessions in "changes" emission mode, see emission.py)
+emission_stats = EmissionStats()
+
+# Frames answered with the previous prediction because they were the same picture (see dedupe.py)
+dedupe_stats = DedupeStats()
+
 @app.route('/')
 def index():
     return jsonify({
@@ -314,10 +84,57 @@ def index():
             'uptime': time.time() - stats['start_time'],
             'frames_received': stats['frames_received'],
             'frames_processed': stats['frames_processed'],
-            'avg_processing_time': sum(stats['processing_times'][-100:]) / max(1, len(stats['processing_times'][-100:])) if stats['processing_times'] else 0
+            'avg_processing_time': sum(stats['processing_times'][-100:]) / max(1, len(stats['processing_times'][-100:])) if stats['processing_times'] else 0,
+            'frames_dropped': stats['frames_dropped'],
+            'frames_skipped': stats['frames_skipped'],
+            'event_loop_lag_ms': loop_lag_summary(),
+            'inference': {
+                'offload': INFERENCE_OFFLOAD,
+                'threads': INFERENCE_THREADS,
+                'in_flight': admission.in_flight,
+                'sessions': len(sessions),
+            },
+            'degradation': degradation.summary(),
+            'profile': model.profile.name,
+            'profiles': list(PROFILES),
+            'motion': model.motion_summary(session['motion'] for session in sessions.values()),
+            'emission': emission_stats.summary(),
+            'admission': admission.summary(sessions),
+            'dedupe': dedupe_stats.summary(),
         }
     })
 
+def monitor_loop_lag():
+    """
+    Background greenthread: sleeps LAG_INTERVAL at a time and records how late it wakes up.
+    Anything that holds the hub (CPU work on the loop) shows up as lag.
+    """
+    while True:
+        start = time.monotonic()
+        eventlet.sleep(LAG_INTERVAL)
+        lag = max(0.0, time.monotonic() - start - LAG_INTERVAL)
+        stats['loop_lag'].append(lag)
+        stats['loop_lag_max'] = max(stats['loop_lag_max'], lag)
+
+def loop_lag_summary():
+    """p50 / p99 / max event-loop lag in ms over the last minute (max since start)."""
+    samples = np.array(stats['loop_lag']) * 1000 if stats['loop_lag'] else np.zeros(1)
+    return {
+        'p50': round(float(np.percentile(samples, 50)), 2),
+        'p99': round(float(np.percentile(samples, 99)), 2),
+        'max': round(stats['loop_lag_max'] * 1000, 2),
+    }
+
+def monitor_load():
+    """Background greenthread: feed processing times and queue depth to the degradation controller."""
+    while True:
+        eventlet.sleep(UPDATE_INTERVAL)
+        busy = sum(session['busy'] for session in sessions.values())
+        degradation.update(stats['processing_times'], busy, INFERENCE_THREADS if INFERENCE_OFFLOAD else 1)
+
+socketio.start_background_task(monitor_loop_lag)
+socketio.start_background_task(monitor_load)
+
 @socketio.on('connect')
 def handle_connect():
     logger.info(f"Client connected: {request.sid}")
@@ -326,6 +143,47 @@ def handle_connect():
 @socketio.on('disconnect')
 def handle_disconnect():
     logger.info(f"Client disconnected: {request.sid}")
+    session = sessions.pop(request.sid, None)
+    if session is not None:
+        session['closed'] = True
+        if not session['busy']:
+            close_session(session)
+
+def close_session(session):
+    if session['context'] is not None:
+        session['context'].close()
+        session['context'] = None
+
+def infer(image_data, session, level=None):
+    """
+    Decode and predict one frame, unless it looks the same as the one the session's last
+    prediction came from. Runs on an inference thread unless offloading is off.
+    """
+    dedupe = session['dedupe']
+    if dedupe.near_duplicates:
+        image_data = frame_bytes(image_data)
+        prediction = dedupe.near(image_data)
+        if prediction is not None:
+            return prediction
+    if session['context'] is None:
+        session['context'] = model.tracking_context(session['profile'])
+    prediction = model.predict_image(image_data, session['context'], level, session['profile'], session['motion'])
+    dedupe.store(prediction)
+    return prediction
+
+def run_inference(image_data, session, level=None):
+    """Run infer() on the thread pool once admission gives the session a slot, and wait for it cooperatively."""
+    if not INFERENCE_OFFLOAD:
+        return infer(image_data, session, level)
+    waiter = Event()
+    if not admission.acquire(session, waiter):
+        waiter.wait()
+    try:
+        return tpool.execute(infer, image_data, session, level)
+    finally:
+        following = admission.release(session)
+        if following is not None:
+            following.send()
 
 @socketio.on('frame')
 def handle_frame(data):
@@ -344,30 +202,73 @@ def handle_frame(data):
             emit('error', {'message': 'Empty frame received'})
             return
             
-        # Decode base64 image
+        # Decode and run prediction
         try:
-            image_bytes = base64.b64decode(image_data)
-            
-            # Convert to image
-            image = Image.open(BytesIO(image_bytes))
-            
-            # Convert to OpenCV format if available
-            if cv2 is not None:
-                frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            else:
-                # Fallback if OpenCV not available
-                frame = np.array(image)
-                
-            # Run prediction
             if model.ready:
-                prediction = model.predict(frame)
+                if request.sid not in sessions:
+                    sessions[request.sid] = {'context': None, 'busy': False, 'closed': False, 'profile': None,
+                                             'motion': model.motion_tracker(), 'changes': None,
+                                             'binary': False, 'dedupe': FrameDeduper()}
+                session = sessions[request.sid]
+                reason = admission.admit(session, time.monotonic())
+                if reason:
+                    # Over the session's frame-rate ceiling: tell the client instead of dropping it silently
+                    timestamp = data.get('timestamp', time.time() * 1000)
+                    emit('throttled', admission.throttled_payload(session, reason, timestamp))
+                    return
+                if session['busy']:
+                    # Still working on this client's previous frame: skip this one rather than queue it
+                    stats['frames_dropped'] += 1
+                    return
+                profile = data.get('profile')
+                if profile and profile != session['profile']:
+                    # Switch the session's profile; its tracking context is rebuilt with the new settings
+                    get_profile(profile)
+                    close_session(session)
+                    session['profile'] = profile
+                emission = data.get('emission')
+                if emission and (check_mode(emission) == CHANGES) != (session['changes'] is not None):
+                    # Switch between a full prediction per frame and change-only emission
+                    session['changes'] = ChangeFilter() if emission == CHANGES else None
+                encoding = data.get('encoding')
+                if encoding and (check_encoding(encoding) == BINARY) != session['binary']:
+                    session['binary'] = encoding == BINARY
+                    if session['binary']:
+                        # Tables the binary messages index into, before the first one
+                        emit('encoding', codec.table())
+                if not degradation.admit(session):
+                    stats['frames_skipped'] += 1
+                    return
+                level, level_info = degradation.level, degradation.info()
+                # A frame byte-identical to the last one analysed gets its prediction again, without a slot
+                prediction = session['dedupe'].exact(image_data, (session['profile'], level.name))
+                if prediction is None:
+                    session['busy'] = True
+                    try:
+                        prediction = run_inference(image_data, session, level)
+                    finally:
+                        session['busy'] = False
+                        if session['closed']:
+                            close_session(session)
+                dedupe_stats.count(session['dedupe'].hit)
                 
-                # Send prediction back to client
-                emit('prediction', {
-                    'type': 'prediction',
-                    'prediction': prediction,
-                    'timestamp': data.get('timestamp', time.time() * 1000)
-                })
+                # Send prediction back to client (in change-only mode, only when the stable letter changes)
+                timestamp = data.get('timestamp', time.time() * 1000)
+                changes = session['changes']
+                decision = changes.update(prediction, time.monotonic()) if changes else 'prediction'
+                emission_stats.count(decision)
+                if decision == 'prediction':
+                    message = {
+                        'type': 'prediction',
+                        'prediction': prediction,
+                        'degradation': level_info,
+                        'profile': session['profile'] or model.profile.name,
+                        'timestamp': timestamp
+                    }
+                    encoded = codec.encode(message) if session['binary'] else None
+                    emit('prediction', message if encoded is None else encoded)
+                elif decision == 'heartbeat':
+                    emit('heartbeat', changes.heartbeat_payload(timestamp))
                 
                 # Update stats
                 stats['frames_processed'] += 1
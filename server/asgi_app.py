@@ -0,0 +1,351 @@
+"""
+ASGI variant of the sign language server, on python-socketio's AsyncServer.
+
+Same Socket.IO events (connect / frame / disconnect, replying with 'prediction' (or 'heartbeat'),
+'throttled', 'status' and 'error') and the same GET / status route as app.py, without eventlet
+or monkey-patching. SignLanguageModel.predict runs unchanged on a thread pool; the
+asyncio loop only moves bytes and awaits results.
+
+Differences from app.py:
+- 'frame' events may carry the image as raw bytes (a binary Socket.IO packet)
+  instead of base64 text; both are accepted.
+- Backpressure is latest-wins per session: while a client's frame is being
+  processed, a newer frame replaces any frame still waiting, so a slow client
+  gets the freshest prediction instead of a growing queue.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5002
+    python asgi_app.py
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import socketio
+
+from admission import MAX_IN_FLIGHT, AdmissionController
+from dedupe import DedupeStats, FrameDeduper, frame_bytes
+from degradation import LEVELS, DegradationController, UPDATE_INTERVAL
+from emission import CHANGES, ChangeFilter, EmissionStats, check_mode
+from prediction_codec import BINARY, PredictionCodec, check_encoding, table_letters
+from profiles import PROFILES, get_profile
+from sign_model import SignLanguageModel
+
+# Frames processed in parallel (one per session at most)
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', os.cpu_count() or 1))
+# How often the lag monitor wakes up, in seconds
+LAG_INTERVAL = 0.1
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+executor = ThreadPoolExecutor(INFERENCE_THREADS, thread_name_prefix='inference')
+
+# Frame processing statistics (same fields as app.py)
+stats = {
+    'frames_received': 0,
+    'frames_processed': 0,
+    'frames_dropped': 0,
+    'frames_skipped': 0,
+    'start_time': time.time(),
+    'processing_times': deque(maxlen=100),
+    'loop_lag': deque(maxlen=600),
+    'loop_lag_max': 0.0,
+}
+
+# Per-client state: tracking context, the frame waiting to be processed and whether one is in flight
+sessions = {}
+
+# Initialize the model
+model = SignLanguageModel()
+
+# Per-session frame-rate ceiling, and at most ADMISSION_MAX_IN_FLIGHT frames (default:
+# INFERENCE_THREADS) analysed at once, handed to waiting sessions in turn (see admission.py)
+admission = AdmissionController(MAX_IN_FLIGHT or INFERENCE_THREADS)
+
+# Steps processing quality down under load and back up when it passes (see degradation.py)
+degradation = DegradationController()
+
+# Binary prediction messages for sessions that ask for them (see prediction_codec.py)
+codec = PredictionCodec(table_letters(model.class_names), PROFILES, [level.name for level in LEVELS])
+
+# Prediction messages sent and suppressed (sessions in "changes" emission mode, see emission.py)
+emission_stats = EmissionStats()
+
+# Frames answered with the previous prediction because they were the same picture (see dedupe.py)
+dedupe_stats = DedupeStats()
+
+
+def status():
+    times = stats['processing_times']
+    lag = np.array(stats['loop_lag']) * 1000 if stats['loop_lag'] else np.zeros(1)
+    return {
+        'status': 'online',
+        'message': 'Sign Language Detection Server',
+        'stats': {
+            'uptime': time.time() - stats['start_time'],
+            'frames_received': stats['frames_received'],
+            'frames_processed': stats['frames_processed'],
+            'avg_processing_time': sum(times) / len(times) if times else 0,
+            'frames_dropped': stats['frames_dropped'],
+            'frames_skipped': stats['frames_skipped'],
+            'event_loop_lag_ms': {
+                'p50': round(float(np.percentile(lag, 50)), 2),
+                'p99': round(float(np.percentile(lag, 99)), 2),
+                'max': round(stats['loop_lag_max'] * 1000, 2),
+            },
+            'inference': {
+                'offload': True,
+                'threads': INFERENCE_THREADS,
+                'in_flight': admission.in_flight,
+                'sessions': len(sessions),
+            },
+            'degradation': degradation.summary(),
+            'profile': model.profile.name,
+            'profiles': list(PROFILES),
+            'motion': model.motion_summary(session['motion'] for session in sessions.values()),
+            'emission': emission_stats.summary(),
+            'admission': admission.summary(sessions),
+            'dedupe': dedupe_stats.summary(),
+        }
+    }
+
+
+async def http_app(scope, receive, send):
+    """Plain ASGI app for everything that isn't Socket.IO: GET / returns the status JSON."""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                asyncio.get_running_loop().create_task(monitor_loop_lag())
+                asyncio.get_running_loop().create_task(monitor_load())
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+    if scope['path'] == '/' and scope['method'] == 'GET':
+        code, body = 200, json.dumps(status()).encode()
+    else:
+        code, body = 404, b'{"error": "not found"}'
+    await send({'type': 'http.response.start', 'status': code,
+                'headers': [(b'content-type', b'application/json'), (b'access-control-allow-origin', b'*')]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+app = socketio.ASGIApp(sio, other_asgi_app=http_app)
+
+
+async def monitor_loop_lag():
+    """Sleep LAG_INTERVAL at a time and record how late the loop wakes us up."""
+    while True:
+        start = time.monotonic()
+        await asyncio.sleep(LAG_INTERVAL)
+        lag = max(0.0, time.monotonic() - start - LAG_INTERVAL)
+        stats['loop_lag'].append(lag)
+        stats['loop_lag_max'] = max(stats['loop_lag_max'], lag)
+
+
+async def monitor_load():
+    """Feed processing times and queue depth (sessions busy or with a frame waiting) to the degradation controller."""
+    while True:
+        await asyncio.sleep(UPDATE_INTERVAL)
+        busy = sum(s['busy'] or s['pending'] is not None for s in sessions.values())
+        degradation.update(stats['processing_times'], busy, INFERENCE_THREADS)
+
+
+def infer(image_data, session, level=None):
+    """
+    Decode and predict one frame on an inference thread, unless it looks the same as the
+    one the session's last prediction came from.
+    """
+    dedupe = session['dedupe']
+    if dedupe.near_duplicates:
+        image_data = frame_bytes(image_data)
+        prediction = dedupe.near(image_data)
+        if prediction is not None:
+            return prediction
+    if session['context'] is None:
+        session['context'] = model.tracking_context(session['profile'])
+    prediction = model.predict_image(image_data, session['context'], level, session['profile'], session['motion'])
+    dedupe.store(prediction)
+    return prediction
+
+
+def close_session(session):
+    if session['context'] is not None:
+        session['context'].close()
+        session['context'] = None
+
+
+@sio.event
+async def connect(sid, environ):
+    logger.info(f"Client connected: {sid}")
+    sessions[sid] = {'context': None, 'busy': False, 'pending': None, 'closed': False, 'profile': None,
+                     'motion': model.motion_tracker(), 'changes': None, 'binary': False,
+                     'dedupe': FrameDeduper()}
+    await sio.emit('status', {'status': 'connected', 'message': 'Connection established'}, to=sid)
+
+
+@sio.event
+async def disconnect(sid):
+    logger.info(f"Client disconnected: {sid}")
+    session = sessions.pop(sid, None)
+    if session is not None:
+        session['closed'] = True
+        if not session['busy']:
+            close_session(session)
+
+
+@sio.on('frame')
+async def handle_frame(sid, data):
+    stats['frames_received'] += 1
+    image_data = data.get('image') if isinstance(data, dict) else None
+    if not image_data:
+        logger.warning("Received empty frame")
+        await sio.emit('error', {'message': 'Empty frame received'}, to=sid)
+        return
+    if not model.ready:
+        await sio.emit('error', {'message': 'Model not ready'}, to=sid)
+        return
+    try:
+        get_profile(data.get('profile'))
+        if data.get('emission'):
+            check_mode(data['emission'])
+        if data.get('encoding'):
+            check_encoding(data['encoding'])
+    except ValueError as e:
+        await sio.emit('error', {'message': str(e)}, to=sid)
+        return
+
+    session = sessions.get(sid)
+    if session is None:
+        return
+    reason = admission.admit(session, time.monotonic())
+    if reason:
+        # Over the session's frame-rate ceiling: tell the client instead of dropping it silently
+        timestamp = data.get('timestamp', time.time() * 1000)
+        await sio.emit('throttled', admission.throttled_payload(session, reason, timestamp), to=sid)
+        return
+    if session['pending'] is not None:
+        # Latest wins: the frame that was waiting is now stale
+        stats['frames_dropped'] += 1
+    session['pending'] = data
+    if not session['busy']:
+        await process_session(sid, session)
+
+
+async def process_session(sid, session):
+    """Process the session's waiting frame, then any newer one that arrived meanwhile."""
+    loop = asyncio.get_running_loop()
+    session['busy'] = True
+    try:
+        while session['pending'] is not None and not session['closed']:
+            if not degradation.admit(session):
+                session['pending'] = None
+                stats['frames_skipped'] += 1
+                continue
+            data = session['pending']
+            if session['dedupe'].exact(data['image'], frame_key(session, data)) is not None:
+                # Byte-identical to the last frame analysed: answered from the cache, without a slot
+                await process_frame(sid, session)
+                continue
+            # Wait for the session's turn at a slot; a newer frame may still replace the waiting one
+            waiter = loop.create_future()
+            if not admission.acquire(session, waiter):
+                await waiter
+            try:
+                if session['closed']:
+                    break
+                if session['pending'] is not data:
+                    # A newer frame replaced the one looked up while waiting: look that one up instead
+                    data = session['pending']
+                    session['dedupe'].exact(data['image'], frame_key(session, data))
+                await process_frame(sid, session)
+            finally:
+                following = admission.release(session)
+                if following is not None:
+                    following.set_result(None)
+    finally:
+        session['busy'] = False
+        if session['closed']:
+            close_session(session)
+
+
+def frame_key(session, data):
+    """What besides the image a frame's prediction depends on: its profile and the degradation level."""
+    return (data.get('profile') or session['profile'], degradation.level.name)
+
+
+async def process_frame(sid, session):
+    """Analyse the session's waiting frame (or reuse the cached prediction) and send its prediction."""
+    data, session['pending'] = session['pending'], None
+    if data.get('profile') and data['profile'] != session['profile']:
+        # Switch the session's profile; its tracking context is rebuilt with the new settings
+        close_session(session)
+        session['profile'] = data['profile']
+    emission = data.get('emission')
+    if emission and (emission == CHANGES) != (session['changes'] is not None):
+        # Switch between a full prediction per frame and change-only emission
+        session['changes'] = ChangeFilter() if emission == CHANGES else None
+    encoding = data.get('encoding')
+    if encoding and (encoding == BINARY) != session['binary']:
+        session['binary'] = encoding == BINARY
+        if session['binary']:
+            # Tables the binary messages index into, before the first one
+            await sio.emit('encoding', codec.table(), to=sid)
+    level, level_info = degradation.level, degradation.info()
+    start_time = time.time()
+    dedupe = session['dedupe']
+    if dedupe.hit:
+        prediction = dedupe.prediction
+    else:
+        try:
+            prediction = await asyncio.get_running_loop().run_in_executor(executor, infer, data['image'], session, level)
+        except Exception as e:
+            logger.error(f"Error processing image data: {str(e)}")
+            await sio.emit('error', {'message': f'Error processing image data: {str(e)}'}, to=sid)
+            return
+    dedupe_stats.count(dedupe.hit)
+    # In change-only mode, only send when the stable letter changes
+    timestamp = data.get('timestamp', time.time() * 1000)
+    changes = session['changes']
+    decision = changes.update(prediction, time.monotonic()) if changes else 'prediction'
+    emission_stats.count(decision)
+    if decision == 'prediction':
+        message = {
+            'type': 'prediction',
+            'prediction': prediction,
+            'degradation': level_info,
+            'profile': session['profile'] or model.profile.name,
+            'timestamp': timestamp
+        }
+        encoded = codec.encode(message) if session['binary'] else None
+        await sio.emit('prediction', message if encoded is None else encoded, to=sid)
+    elif decision == 'heartbeat':
+        await sio.emit('heartbeat', changes.heartbeat_payload(timestamp), to=sid)
+
+    # Update stats
+    stats['frames_processed'] += 1
+    stats['processing_times'].append(time.time() - start_time)
+    if stats['frames_processed'] % 50 == 0:
+        avg_time = sum(stats['processing_times']) / len(stats['processing_times'])
+        logger.info(f"Processed {stats['frames_processed']} frames. Avg time: {avg_time*1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    # Get port from environment variable or use default
+    port = int(os.environ.get('PORT', 5002))
+    logger.info(f"Starting ASGI server on port {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,140 @@
+"""
+Load test for the Socket.IO server: event-loop responsiveness under inference load.
+
+Connects --clients Socket.IO clients that each stream a JPEG frame at --fps, like the
+web client does, while a probe polls the status route. Reports prediction round trip
+per client, status-route latency (what every other request sees while frames are being
+processed) and the server's own event-loop lag figures from GET /.
+
+Start the server with INFERENCE_OFFLOAD=0 and =1 to compare inline and thread-pool inference,
+or run it against asgi_app.py with the same --source to compare the two servers:
+
+    INFERENCE_OFFLOAD=0 python app.py &
+    python bench_event_loop.py --clients 4 --fps 15 --seconds 20
+    python bench_event_loop.py --source recordings/session1/ --binary
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import threading
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+import socketio
+
+
+def make_frame(path=None, width=640, height=480, quality=80, binary=False):
+    """JPEG (raw bytes, or base64 text like the web client sends) from an image file or smoothed noise."""
+    if path:
+        img = cv2.resize(cv2.imread(path), (width, height))
+    else:
+        img = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+        # Smoothed so it compresses about like a webcam frame
+        img = cv2.GaussianBlur(img, (0, 0), 3)
+    ok, jpeg = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return jpeg.tobytes() if binary else base64.b64encode(jpeg.tobytes()).decode('ascii')
+
+
+def load_workload(source=None, binary=False):
+    """Frames to send in order: every image in a directory (a recorded session), one image, or a synthetic frame."""
+    if source and os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, '*.jpg')) + glob.glob(os.path.join(source, '*.png')))
+        return [make_frame(p, binary=binary) for p in paths]
+    return [make_frame(source, binary=binary)]
+
+
+def get_status(url):
+    with urllib.request.urlopen(url + '/', timeout=30) as response:
+        return json.loads(response.read())
+
+
+def run_client(url, frames, fps, stop, latencies, counts):
+    sio = socketio.Client()
+
+    @sio.on('prediction')
+    def on_prediction(data):
+        latencies.append(time.time() * 1000 - data['timestamp'])
+        counts['predictions'] += 1
+        level = data.get('degradation', {}).get('name', 'full')
+        counts['levels'][level] = counts['levels'].get(level, 0) + 1
+
+    sio.connect(url, transports=['websocket'])
+    interval = 1.0 / fps
+    next_send = time.perf_counter()
+    while not stop.is_set():
+        sio.emit('frame', {'image': frames[counts['sent'] % len(frames)], 'timestamp': time.time() * 1000})
+        counts['sent'] += 1
+        next_send += interval
+        time.sleep(max(0, next_send - time.perf_counter()))
+    time.sleep(1.0)  # let in-flight predictions arrive
+    sio.disconnect()
+
+
+def probe_status(url, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        get_status(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.2)
+
+
+def percentiles(values):
+    if not values:
+        return "n/a"
+    values = np.array(values)
+    return f"p50 {np.percentile(values, 50):.1f} ms, p95 {np.percentile(values, 95):.1f} ms, max {values.max():.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop responsiveness of the server under frame load")
+    parser.add_argument("--url", default="http://localhost:5002")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=15.0, help="Frames per second per client")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--source", help="Directory of recorded frames or a single image (default: synthetic)")
+    parser.add_argument("--binary", action="store_true", help="Send frames as raw bytes instead of base64")
+    args = parser.parse_args()
+
+    frames = load_workload(args.source, args.binary)
+    before = get_status(args.url)['stats']
+    print(f"Server inference: {json.dumps(before.get('inference'))}")
+
+    stop = threading.Event()
+    prediction_latencies, status_latencies = [], []
+    counts = [{'sent': 0, 'predictions': 0, 'levels': {}} for _ in range(args.clients)]
+    threads = [threading.Thread(target=run_client, args=(args.url, frames, args.fps, stop, prediction_latencies, c))
+               for c in counts]
+    threads.append(threading.Thread(target=probe_status, args=(args.url, stop, status_latencies)))
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    after = get_status(args.url)['stats']
+    sent = sum(c['sent'] for c in counts)
+    received = sum(c['predictions'] for c in counts)
+    print(f"{args.clients} clients x {args.fps:g} fps for {args.seconds:g}s: {sent} frames sent, "
+          f"{received} predictions ({received / args.seconds:.1f}/s), "
+          f"{after['frames_dropped'] - before.get('frames_dropped', 0)} dropped by the server")
+    print(f"Prediction round trip: {percentiles(prediction_latencies)}")
+    print(f"Status route latency:  {percentiles(status_latencies)}")
+    print(f"Server event-loop lag: {json.dumps(after['event_loop_lag_ms'])}")
+    levels = {}
+    for c in counts:
+        for name, n in c['levels'].items():
+            levels[name] = levels.get(name, 0) + n
+    print(f"Predictions per degradation level: {json.dumps(levels)}")
+    if 'degradation' in after:
+        print(f"Server degradation: {json.dumps(after['degradation'])}, "
+              f"{after['frames_skipped'] - before.get('frames_skipped', 0)} frames skipped")
+
+
+if __name__ == "__main__":
+    main()
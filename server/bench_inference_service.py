@@ -0,0 +1,129 @@
+"""
+Throughput and latency of the inference service (inference_service.py) against running
+the detector in-process.
+
+Starts the service on a temporary socket, then runs the same frames (a recorded session
+directory, or synthetic frames) through:
+- the in-process handDetector, one frame at a time
+- InferenceClient, one request at a time (adds the socket round trip)
+- InferenceClient with --depth requests pipelined per client and --clients clients
+  (several web workers sharing the service)
+and checks that the service returns the same HandResults as the in-process detector.
+
+    python bench_inference_service.py --source recordings/session1/ --workers 2 --clients 2 --depth 4
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import sign_model
+from bench_event_loop import load_workload
+from inference_service import IMAGE, InferenceClient
+from main import handDetector
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_for_socket(path, timeout):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Inference service did not start on {path}")
+        time.sleep(0.1)
+
+
+def run_clients(path, frames, clients, depth):
+    """Each client keeps up to depth requests in flight; returns (seconds, latencies in ms)."""
+    latencies = []
+
+    def client():
+        remote = InferenceClient(path)
+        in_flight = []
+        for image in frames:
+            in_flight.append((time.perf_counter(), remote.submit(IMAGE, image)))
+            if len(in_flight) >= depth:
+                sent, future = in_flight.pop(0)
+                future.result()
+                latencies.append((time.perf_counter() - sent) * 1000)
+        for sent, future in in_flight:
+            future.result()
+            latencies.append((time.perf_counter() - sent) * 1000)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(name, frames, seconds, latencies):
+    print(f"{name:28s} {frames / seconds:7.1f} frames/s, latency p50 {np.percentile(latencies, 50):6.1f} ms, "
+          f"p95 {np.percentile(latencies, 95):6.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the inference service against in-process inference")
+    parser.add_argument("--source", help="Directory of recorded frames or a single image (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=60, help="Frames per client")
+    parser.add_argument("--workers", type=int, default=2, help="Service worker threads")
+    parser.add_argument("--clients", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=4, help="Pipelined requests per client")
+    args = parser.parse_args()
+
+    workload = load_workload(args.source, binary=True)
+    frames = [workload[i % len(workload)] for i in range(args.frames)]
+
+    path = os.path.join(tempfile.mkdtemp(), 'inference.sock')
+    service = subprocess.Popen([sys.executable, 'inference_service.py', '--socket', path,
+                                '--workers', str(args.workers)], cwd=SERVER_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # Let the service finish loading so it doesn't compete with the baseline for CPU
+        wait_for_socket(path, 120)
+
+        # In-process baseline (static-image mode, like session 0 on the service)
+        detector = handDetector(detectionCon=0.5, use_asl=False, headless=True)
+        if os.path.exists(sign_model.MODEL_PATH):
+            detector.asl_recognizer = sign_model.load_recognizer()
+            detector.use_asl = True
+        images = [sign_model.decode_frame(f) for f in frames]
+        detector.detect(images[0])
+        local, latencies = [], []
+        start = time.perf_counter()
+        for image in images:
+            t = time.perf_counter()
+            local.append(detector.detect(image))
+            latencies.append((time.perf_counter() - t) * 1000)
+        report("in-process", len(frames), time.perf_counter() - start, latencies)
+
+        remote = InferenceClient(path)
+        remote.detect_image(frames[0])
+        served, latencies = [], []
+        start = time.perf_counter()
+        for image in frames:
+            t = time.perf_counter()
+            served.append(remote.detect_image(image))
+            latencies.append((time.perf_counter() - t) * 1000)
+        report("service, 1 client, depth 1", len(frames), time.perf_counter() - start, latencies)
+        mismatches = sum(a.landmarks != b.landmarks or a.geometry_letter != b.geometry_letter
+                         or [l for l, _ in a.top_k] != [l for l, _ in b.top_k] for a, b in zip(local, served))
+        print(f"{'':28s} {mismatches} of {len(frames)} results differ from in-process")
+
+        seconds, latencies = run_clients(path, frames, args.clients, args.depth)
+        report(f"service, {args.clients} clients, depth {args.depth}", len(frames) * args.clients, seconds, latencies)
+    finally:
+        service.terminate()
+        service.wait(10)
+
+
+if __name__ == "__main__":
+    main()
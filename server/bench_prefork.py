@@ -0,0 +1,126 @@
+"""
+Memory and startup comparison: prefork.py with N workers vs N separate app.py processes.
+
+Measures the time from launch until every worker answers HTTP, then the memory of
+the whole process tree: summed RSS (counts shared pages once per process) and summed
+PSS (shared pages split between the processes sharing them, i.e. what the
+processes really cost together; Linux only).
+
+    python bench_prefork.py --workers 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+SEPARATE_CMD = 'import sys, app; app.socketio.run(app.app, host="127.0.0.1", port=int(sys.argv[1]))'
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=2) as response:
+        return json.loads(response.read())
+
+
+def descendants(pid):
+    """pid and every process below it (from /proc)."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    found, todo = [], [pid]
+    while todo:
+        p = todo.pop()
+        found.append(p)
+        todo.extend(children.get(p, []))
+    return found
+
+
+def memory_mb(pids):
+    """(summed RSS, summed PSS) in MB."""
+    rss = pss = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Rss:'):
+                        rss += int(line.split()[1])
+                    elif line.startswith('Pss:'):
+                        pss += int(line.split()[1])
+        except OSError:
+            pass
+    return rss / 1024, pss / 1024
+
+
+def wait_until(check, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return True
+        except OSError:
+            pass
+        time.sleep(0.1)
+    return False
+
+
+def run_prefork(workers, port, timeout):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, 'prefork.py', '--workers', str(workers), '--host', '127.0.0.1',
+                             '--port', str(port)], cwd=SERVER_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/workers'
+    ready = wait_until(lambda: sum(row['updated'] > 0 for row in get_json(url)) == workers, timeout)
+    elapsed = time.perf_counter() - start
+    time.sleep(1.0)
+    pids = descendants(proc.pid)
+    rss, pss = memory_mb(pids)
+    proc.terminate()
+    proc.wait(10)
+    return ready, elapsed, len(pids), rss, pss
+
+
+def run_separate(workers, port, timeout):
+    start = time.perf_counter()
+    procs = [subprocess.Popen([sys.executable, '-c', SEPARATE_CMD, str(port + i)], cwd=SERVER_DIR,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+             for i in range(workers)]
+    ready = all(wait_until(lambda i=i: 'status' in get_json(f'http://127.0.0.1:{port + i}/'), timeout)
+                for i in range(workers))
+    elapsed = time.perf_counter() - start
+    time.sleep(1.0)
+    pids = [p for proc in procs for p in descendants(proc.pid)]
+    rss, pss = memory_mb(pids)
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        proc.wait(10)
+    return ready, elapsed, len(pids), rss, pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prefork.py with separate app.py processes")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--timeout", type=float, default=180.0)
+    args = parser.parse_args()
+
+    for name, run in (('separate', run_separate), ('prefork', run_prefork)):
+        ready, elapsed, count, rss, pss = run(args.workers, args.port, args.timeout)
+        status = '' if ready else '  (not all workers ready before timeout)'
+        print(f"{name:9s} {args.workers} workers: ready in {elapsed:5.1f}s, {count} processes, "
+              f"RSS {rss:7.0f} MB, PSS {pss:7.0f} MB{status}")
+        time.sleep(2.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Learn the cascade's reliable geometry letters from recorded sessions, and report what
+cascade mode (ASL_CASCADE=1) saves and changes compared with always running both the
+CNN and the geometry rules.
+
+Each --source directory is replayed as one session: recorded frames in name order with
+one tracking context, or landmark shards from extract_landmarks.py (part-*.npz; MediaPipe
+is skipped and every detected row counts as a hand). For every hand, both the geometry-only result and the full result are worked
+out. A geometry letter is reliable if it was seen at least --min-support times and the
+always-both final letter agreed with it at least --min-precision of the time; letters a
+conflict rule can turn into something else are never reliable, since the CNN decides those.
+
+The report replays --eval directories (default: the --source ones) with the learned set:
+CNN invocations saved, time saved, and how many final letters differ from always-both.
+
+    python cascade_report.py --source recordings/session1/ recordings/session2/ --eval recordings/session3/
+    python cascade_report.py --source recordings/*/ --write
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from sign_model import CASCADE_PATH, SignLanguageModel
+
+
+def hands_in(model, directory):
+    """(normalised (21, 2) points, frame shape) of every hand in a session directory, in order."""
+    shards = sorted(glob.glob(os.path.join(directory, 'part-*.npz')))
+    for shard in shards:
+        data = np.load(shard)
+        for detected, landmarks, (w, h) in zip(data['detected'], data['landmarks'], data['image_size']):
+            if detected:
+                yield landmarks[:, :2].astype(np.float64), (int(h), int(w))
+    if shards:
+        return
+    paths = sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png')))
+    context = model.detector.tracking_context()
+    try:
+        for path in paths:
+            frame = cv2.imread(path)
+            handLms = model.detector.find_hand(frame, context)
+            if handLms is not None:
+                yield model.detector.hand_points(handLms), frame.shape
+    finally:
+        context.close()
+
+
+def replay(model, directory):
+    """(geometry letter, always-both letter, CNN ms) for every hand in the session."""
+    records = []
+    for points, shape in hands_in(model, directory):
+        geometry = model.detector.analyse_points(points, shape, top_k=()).geometry_letter
+        start = time.perf_counter()
+        hand = model.detector.analyse_points(points, shape)
+        cnn_ms = (time.perf_counter() - start) * 1000
+        records.append((geometry, model.hand_prediction(hand)['letter'], cnn_ms))
+    return records
+
+
+def learn(model, records, min_precision, min_support):
+    """{letter: agreement} of geometry letters the cascade can trust, and per-letter (frames, agreed)."""
+    seen = Counter(geometry for geometry, _, _ in records if geometry)
+    agreed = Counter(geometry for geometry, final, _ in records if geometry and final == geometry)
+    letters = {letter: round(agreed[letter] / count, 4) for letter, count in seen.items()
+               if count >= min_support and agreed[letter] / count >= min_precision}
+    model.cascade_letters = letters
+    # Drop letters that a conflict rule could still change
+    letters = {letter: agreement for letter, agreement in letters.items() if not model.needs_cnn(letter)}
+    model.cascade_letters = letters
+    return letters, {letter: (count, agreed[letter]) for letter, count in seen.items()}
+
+
+def evaluate(model, records):
+    """CNN calls and final letters with the model's current cascade set, against always-both."""
+    calls = changed = 0
+    saved_ms = 0.0
+    for geometry, final, cnn_ms in records:
+        if model.needs_cnn(geometry):
+            calls += 1
+        else:
+            saved_ms += cnn_ms
+            changed += geometry != final
+    return calls, changed, saved_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn and evaluate the geometry-first inference cascade")
+    parser.add_argument("--source", nargs='+', required=True, help="Recorded session directories to learn from")
+    parser.add_argument("--eval", nargs='+', help="Session directories to evaluate on (default: --source)")
+    parser.add_argument("--min-precision", type=float, default=0.95,
+                        help="Agreement with the always-both letter needed to trust a geometry letter")
+    parser.add_argument("--min-support", type=int, default=20, help="Frames a letter needs to be judged")
+    parser.add_argument("--write", action="store_true", help=f"Save the reliable set to {CASCADE_PATH}")
+    args = parser.parse_args()
+
+    model = SignLanguageModel(cascade=False)
+    if not model.ready or model.remote:
+        raise SystemExit("The report needs the model loaded in-process (unset INFERENCE_SOCKET)")
+
+    records = []
+    for directory in args.source:
+        records += replay(model, directory)
+    letters, per_letter = learn(model, records, args.min_precision, args.min_support)
+    learned_hands = len(records)
+
+    print(f"Learned from {len(records)} hands")
+    print("geometry  frames  agree  reliable")
+    for letter in sorted(per_letter):
+        count, agreed = per_letter[letter]
+        print(f"{letter:>8s}  {count:6d}  {agreed / count:5.0%}  {'yes' if letter in letters else ''}")
+    print(f"{'none':>8s}  {sum(1 for g, _, _ in records if not g):6d}")
+    print(f"Reliable set: {''.join(sorted(letters)) or '(empty)'}")
+
+    if args.eval:
+        records = []
+        for directory in args.eval:
+            records += replay(model, directory)
+    calls, changed, saved_ms = evaluate(model, records)
+    total = len(records)
+    if total:
+        print(f"Evaluated on {total} hands ({'--eval' if args.eval else 'training'} sessions):")
+        print(f"  CNN invocations: {total} always-both, {calls} cascade "
+              f"({(total - calls) / total:.0%} saved, {saved_ms / total:.2f} ms/frame)")
+        print(f"  Final letters changed: {changed} of {total} ({changed / total:.1%})")
+
+    if args.write:
+        with open(CASCADE_PATH, 'w') as f:
+            json.dump({'letters': letters, 'min_precision': args.min_precision,
+                       'min_support': args.min_support, 'hands': learned_hands}, f, indent=2)
+        print(f"Saved {CASCADE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Duplicate frame short-circuit for the Socket.IO servers (app.py, asgi_app.py).
+
+When a browser tab is in the background or the camera freezes, the client keeps
+sending the same picture, and each copy used to be decoded and run through MediaPipe.
+Each session has a FrameDeduper holding the last prediction it computed and what
+frame it came from:
+
+- exact: a fingerprint of the frame as received (BLAKE2b of the base64 text or the
+  JPEG bytes), checked on the event loop before the frame waits for an inference slot;
+  a byte-identical frame gets the cached prediction without decode or inference
+- near (optional, FRAME_DEDUPE_NEAR=1): on the inference thread, the JPEG is decoded at
+  1/8 scale in greyscale (a 40x30 thumbnail for 320x240 frames, a fraction of a full
+  decode) and compared with the thumbnail of the frame the cached prediction came from;
+  if no pixel differs by more than NEAR_TOLERANCE grey levels, the prediction is reused.
+  Comparing with that frame rather than the previous one keeps slow changes from
+  building up unnoticed
+
+The cached prediction is only reused with the same profile and degradation level, and
+never for an error. Reused frames don't update the session's motion tracker, so 'motion'
+stays as it was (a frozen picture doesn't move). DedupeStats counts frames, hits and the
+hit ratio over all sessions for the status route.
+
+Run this module to measure the checks against decoding and inference on a recorded
+session, with every frame sent as is, copied and re-encoded:
+
+    python dedupe.py --source recordings/session1/
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+EXACT = 'exact'
+NEAR = 'near'
+
+# Set FRAME_DEDUPE=0 to analyse every frame
+DEDUPE = os.environ.get('FRAME_DEDUPE', '1') != '0'
+# Also reuse predictions for visually identical frames (thumbnail comparison)
+NEAR_DUPLICATES = os.environ.get('FRAME_DEDUPE_NEAR', '0') == '1'
+# Largest grey-level difference of any thumbnail pixel for frames still to count as the same
+NEAR_TOLERANCE = int(os.environ.get('FRAME_DEDUPE_TOLERANCE', 10))
+
+
+def fingerprint(image_data):
+    """16-byte digest of a frame as received (base64 text or raw bytes)."""
+    if isinstance(image_data, str):
+        image_data = image_data.encode('ascii')
+    return hashlib.blake2b(image_data, digest_size=16).digest()
+
+
+def frame_bytes(image_data):
+    """The encoded image of a frame as received (base64 text is decoded)."""
+    if isinstance(image_data, (bytes, bytearray, memoryview)):
+        return bytes(image_data)
+    return base64.b64decode(image_data)
+
+
+def thumbnail(image_bytes):
+    """Greyscale thumbnail at 1/8 scale (JPEG decodes it without the full image), or None."""
+    if cv2 is None:
+        return None
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+
+
+class DedupeStats:
+    """Frame counters over all sessions, for the status route."""
+
+    def __init__(self, enabled=DEDUPE, near=NEAR_DUPLICATES):
+        self.enabled = enabled
+        self.near = near
+        self.frames = 0
+        self.hits = {EXACT: 0, NEAR: 0}
+
+    def count(self, hit):
+        self.frames += 1
+        if hit:
+            self.hits[hit] += 1
+
+    def summary(self):
+        hits = sum(self.hits.values())
+        return {
+            'enabled': self.enabled,
+            'near': self.near,
+            'frames': self.frames,
+            'exact_hits': self.hits[EXACT],
+            'near_hits': self.hits[NEAR],
+            'hit_ratio': round(hits / self.frames, 3) if self.frames else 0.0,
+        }
+
+
+class FrameDeduper:
+    """
+    One session's last prediction and the frame it came from. exact() runs on the event
+    loop, near() and store() on the inference thread; the servers never have two frames
+    of a session in flight, so they don't overlap.
+    """
+
+    def __init__(self, enabled=DEDUPE, near=NEAR_DUPLICATES, tolerance=NEAR_TOLERANCE):
+        self.enabled = enabled
+        self.near_duplicates = enabled and near and cv2 is not None
+        self.tolerance = tolerance
+        self.prediction = None
+        self.key = None
+        self.fingerprint = None
+        self.thumbnail = None
+        # The frame being looked up, kept for store()
+        self._key = None
+        self._fingerprint = None
+        self._thumbnail = None
+        # How the last frame was answered: EXACT, NEAR or None (analysed)
+        self.hit = None
+
+    def exact(self, image_data, key):
+        """
+        The cached prediction if image_data is byte-identical to the frame it came from
+        and key (profile, degradation level) is the same, else None.
+        """
+        self.hit = None
+        self._key = key
+        self._thumbnail = None
+        if not self.enabled:
+            return None
+        self._fingerprint = fingerprint(image_data)
+        if self.prediction is not None and key == self.key and self._fingerprint == self.fingerprint:
+            self.hit = EXACT
+            return self.prediction
+        return None
+
+    def near(self, image_bytes):
+        """
+        After a miss in exact(): the cached prediction if the frame (encoded image bytes)
+        looks the same as the one it came from, else None.
+        """
+        if not self.near_duplicates:
+            return None
+        self._thumbnail = thumbnail(image_bytes)
+        cached = self.thumbnail
+        if (self.prediction is None or self._key != self.key or self._thumbnail is None or cached is None
+                or self._thumbnail.shape != cached.shape):
+            return None
+        if int(np.abs(self._thumbnail.astype(np.int16) - cached).max()) > self.tolerance:
+            return None
+        # Later byte-identical copies of this frame are exact hits; the thumbnail stays the reference
+        self.fingerprint = self._fingerprint
+        self.hit = NEAR
+        return self.prediction
+
+    def store(self, prediction):
+        """Keep the prediction just computed for the frame looked up last."""
+        if not self.enabled:
+            return
+        if 'error' in prediction:
+            self.prediction = None
+            return
+        self.prediction = prediction
+        self.key = self._key
+        self.fingerprint = self._fingerprint
+        self.thumbnail = self._thumbnail
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the duplicate-frame checks against decode and inference")
+    parser.add_argument("--source", required=True, help="Recorded session directory (frames in name order)")
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=240)
+    args = parser.parse_args()
+
+    import glob
+    import time
+
+    from bench_event_loop import make_frame
+    from sign_model import SignLanguageModel
+
+    model = SignLanguageModel()
+    if not model.ready or model.remote:
+        raise SystemExit("The benchmark needs the model loaded in-process (unset INFERENCE_SOCKET)")
+    paths = sorted(glob.glob(os.path.join(args.source, '*.jpg')) + glob.glob(os.path.join(args.source, '*.png')))
+    # Each frame three times: as is, a byte-identical copy, and re-encoded at another JPEG
+    # quality (the same picture, different bytes)
+    stream = []
+    for path in paths:
+        frame = make_frame(path, args.width, args.height, quality=80)
+        stream += [frame, frame, make_frame(path, args.width, args.height, quality=75)]
+    key = (None, 'full')
+
+    def run(deduper):
+        stats = DedupeStats(deduper.enabled, deduper.near_duplicates)
+        context = model.tracking_context()
+        start = time.perf_counter()
+        try:
+            for frame in stream:
+                if deduper.exact(frame, key) is None:
+                    data = frame_bytes(frame)
+                    if deduper.near(data) is None:
+                        deduper.store(model.predict_image(data, context))
+                stats.count(deduper.hit)
+        finally:
+            context.close()
+        return (time.perf_counter() - start) / len(stream) * 1000, stats.summary()
+
+    def per_frame(f):
+        start = time.perf_counter()
+        for frame in stream:
+            f(frame)
+        return (time.perf_counter() - start) / len(stream) * 1e6
+
+    run(FrameDeduper(enabled=False))  # warm-up
+    print(f"{len(paths)} frames at {args.width}x{args.height}, each sent as is, copied, and re-encoded")
+    print(f"fingerprint      {per_frame(fingerprint):7.1f} us/frame")
+    print(f"thumbnail        {per_frame(lambda frame: thumbnail(frame_bytes(frame))):7.1f} us/frame (with base64 decode)")
+    print(f"full decode      {per_frame(lambda frame: cv2.imdecode(np.frombuffer(frame_bytes(frame), np.uint8), cv2.IMREAD_COLOR)):7.1f} us/frame")
+    print("checks          ms/frame  exact hits  near hits  hit ratio")
+    for name, deduper in (('off', FrameDeduper(enabled=False)), ('exact', FrameDeduper(near=False)),
+                          ('exact + near', FrameDeduper(near=True))):
+        ms, summary = run(deduper)
+        print(f"{name:14s} {ms:9.2f} {summary['exact_hits']:11d} {summary['near_hits']:10d} {summary['hit_ratio']:10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Load-aware graceful degradation for the Socket.IO servers (app.py, asgi_app.py).
+
+When the server is saturated, processing every frame at full quality makes every
+client's latency worse together. DegradationController watches the metrics the
+servers already keep -- the rolling processing time of recent frames and how many
+sessions have a frame in flight or waiting per inference slot -- and steps through
+LEVELS, one level at a time:
+
+    0 full                  full resolution, CNN + geometry
+    1 reduced_resolution    MediaPipe on a frame scaled by REDUCED_SCALE
+    2 geometry_only         as 1, and the CNN is skipped: geometry letter only
+    3 every_kth_frame       as 2, and each session only analyses every FRAME_STRIDE-th frame
+
+Hysteresis: the controller steps down after DOWN_AFTER consecutive checks with
+pressure above HIGH_PRESSURE, and back up only after UP_AFTER consecutive checks
+below LOW_PRESSURE, so a level that relieves the load isn't left at once.
+"""
+
+import logging
+import os
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Set DEGRADATION=0 to always process at full quality
+DEGRADATION = os.environ.get('DEGRADATION', '1') != '0'
+# Processing time (receive to prediction) per frame the server aims for, in seconds
+TARGET_PROCESSING_TIME = float(os.environ.get('DEGRADATION_TARGET_MS', 250)) / 1000
+# How often the servers call update(), in seconds
+UPDATE_INTERVAL = 1.0
+# Pressure is load relative to the target (1.0 = at the target)
+HIGH_PRESSURE = 1.0
+LOW_PRESSURE = 0.5
+DOWN_AFTER = 3
+UP_AFTER = 10
+# Recent frames the processing-time average covers
+WINDOW = 20
+
+REDUCED_SCALE = 0.5
+FRAME_STRIDE = 3
+
+Level = namedtuple('Level', ['name', 'scale', 'cnn', 'stride'])
+
+LEVELS = (
+    Level('full', 1.0, True, 1),
+    Level('reduced_resolution', REDUCED_SCALE, True, 1),
+    Level('geometry_only', REDUCED_SCALE, False, 1),
+    Level('every_kth_frame', REDUCED_SCALE, False, FRAME_STRIDE),
+)
+
+
+class DegradationController:
+    def __init__(self, target=TARGET_PROCESSING_TIME, enabled=DEGRADATION):
+        self.target = target
+        self.enabled = enabled
+        self.index = 0
+        self.pressure = 0.0
+        self.over = 0
+        self.under = 0
+        self.changes = 0
+
+    @property
+    def level(self):
+        return LEVELS[self.index]
+
+    def update(self, processing_times, busy, capacity):
+        """
+        One check: processing_times are recent per-frame times in seconds, busy the sessions
+        with a frame in flight or waiting, capacity the frames that can be processed at once.
+        """
+        recent = list(processing_times)[-WINDOW:]
+        latency = sum(recent) / len(recent) / self.target if recent else 0.0
+        self.pressure = max(latency, busy / max(1, capacity))
+        if not self.enabled:
+            return
+
+        if self.pressure > HIGH_PRESSURE:
+            self.over += 1
+            self.under = 0
+        elif self.pressure < LOW_PRESSURE:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= DOWN_AFTER and self.index < len(LEVELS) - 1:
+            self._step(1)
+        elif self.under >= UP_AFTER and self.index > 0:
+            self._step(-1)
+
+    def _step(self, direction):
+        self.index += direction
+        self.over = self.under = 0
+        self.changes += 1
+        logger.info(f"Degradation level {self.index} ({self.level.name}), pressure {self.pressure:.2f}")
+
+    def admit(self, session):
+        """Whether to analyse this frame of the session (every_kth_frame skips the others)."""
+        session['frame_count'] = session.get('frame_count', 0) + 1
+        return session['frame_count'] % self.level.stride == 0
+
+    def info(self):
+        """Current level for prediction payloads."""
+        return {'level': self.index, 'name': self.level.name}
+
+    def summary(self):
+        """Current level and controller state for the status route."""
+        return {
+            **self.info(),
+            'enabled': self.enabled,
+            'pressure': round(self.pressure, 2),
+            'changes': self.changes,
+            'levels': [level.name for level in LEVELS],
+        }
@@ -0,0 +1,127 @@
+"""
+Change-only prediction emission for the Socket.IO servers (app.py, asgi_app.py).
+
+By default every processed frame is sent back as a full 'prediction' event, even when
+the letter hasn't changed for seconds. A client that sends "emission": "changes" with
+its frames gets a ChangeFilter on its session instead, which debounces the fused letter
+(the motion letter when there is one, else the static letter):
+
+- stability window: a different letter (or no letter) only becomes the stable letter
+  after STABLE_FRAMES frames in a row
+- confidence buckets of BUCKET_WIDTH, with hysteresis: the bucket only changes once the
+  confidence is BUCKET_MARGIN past the edge of the current one
+- a 'prediction' event is sent when the stable letter or its bucket changes; otherwise a
+  small 'heartbeat' event ({letter, bucket, timestamp}) every HEARTBEAT_INTERVAL seconds
+  so the client knows the session is alive, and nothing in between
+
+EmissionStats counts the messages sent and suppressed over all sessions, in either mode.
+"""
+
+import os
+
+ALL = 'all'
+CHANGES = 'changes'
+MODES = (ALL, CHANGES)
+
+STABLE_FRAMES = int(os.environ.get('EMISSION_STABLE_FRAMES', 3))
+BUCKET_WIDTH = 0.2
+BUCKET_MARGIN = 0.05
+HEARTBEAT_INTERVAL = float(os.environ.get('EMISSION_HEARTBEAT', 2.0))
+
+
+def check_mode(mode):
+    """The emission mode; raises ValueError for unknown ones."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown emission mode '{mode}' (expected one of {', '.join(MODES)})")
+    return mode
+
+
+def fused(prediction):
+    """(letter, confidence) a prediction stands for: the motion letter (J / Z) if there is one, else the static letter."""
+    motion = prediction.get('motion')
+    if motion and motion.get('letter'):
+        return motion['letter'], float(motion['confidence'])
+    return prediction.get('letter'), float(prediction.get('confidence') or 0.0)
+
+
+class EmissionStats:
+    """Message counters over all sessions, for the status route."""
+
+    def __init__(self):
+        self.emitted = 0
+        self.heartbeats = 0
+        self.suppressed = 0
+
+    def count(self, decision):
+        if decision == 'prediction':
+            self.emitted += 1
+        elif decision == 'heartbeat':
+            self.heartbeats += 1
+        else:
+            self.suppressed += 1
+
+    def summary(self):
+        total = self.emitted + self.heartbeats + self.suppressed
+        return {
+            'emitted': self.emitted,
+            'heartbeats': self.heartbeats,
+            'suppressed': self.suppressed,
+            'suppressed_ratio': round(self.suppressed / total, 3) if total else 0.0,
+        }
+
+
+class ChangeFilter:
+    """One session's debouncing state. Only use from one task / thread at a time."""
+
+    def __init__(self, stable_frames=STABLE_FRAMES, heartbeat=HEARTBEAT_INTERVAL):
+        self.stable_frames = stable_frames
+        self.heartbeat = heartbeat
+        self.letter = None
+        self.bucket = 0
+        self.candidate = None
+        self.candidate_frames = 0
+        # Nothing sent yet: the first frame is always emitted
+        self.last_emit = None
+
+    def update(self, prediction, now):
+        """
+        What to send for this frame's prediction: 'prediction' (the full event),
+        'heartbeat', or None (suppressed). now is a monotonic time in seconds.
+        """
+        letter, confidence = fused(prediction)
+
+        changed = self.last_emit is None
+        if letter == self.letter:
+            self.candidate, self.candidate_frames = None, 0
+            changed |= self._update_bucket(confidence)
+        else:
+            if letter == self.candidate:
+                self.candidate_frames += 1
+            else:
+                self.candidate, self.candidate_frames = letter, 1
+            if self.candidate_frames >= self.stable_frames:
+                self.letter = letter
+                self.bucket = int(confidence / BUCKET_WIDTH)
+                self.candidate, self.candidate_frames = None, 0
+                changed = True
+
+        if changed:
+            decision = 'prediction'
+        elif now - self.last_emit >= self.heartbeat:
+            decision = 'heartbeat'
+        else:
+            decision = None
+        if decision:
+            self.last_emit = now
+        return decision
+
+    def _update_bucket(self, confidence):
+        """Move to confidence's bucket if it is BUCKET_MARGIN past the current one's edges."""
+        low = self.bucket * BUCKET_WIDTH
+        if low - BUCKET_MARGIN <= confidence < low + BUCKET_WIDTH + BUCKET_MARGIN:
+            return False
+        self.bucket = int(confidence / BUCKET_WIDTH)
+        return True
+
+    def heartbeat_payload(self, timestamp):
+        return {'type': 'heartbeat', 'letter': self.letter, 'bucket': self.bucket, 'timestamp': timestamp}
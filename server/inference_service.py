@@ -0,0 +1,451 @@
+"""
+Local inference service: one process owns the hand detectors and the ASL model and
+serves any number of web workers on the same host over a Unix domain socket.
+
+Protocol (all integers little-endian). Every message is a 16-byte header followed
+by payload_len bytes of payload:
+
+    header:     payload_len u32, request_id u32, session u32, kind u8, 3 pad bytes
+
+    IMAGE       encoded frame (JPEG / PNG), as received from the browser
+    RAW         height u16, width u16, channels u8, then height*width*channels BGR bytes
+    LANDMARKS   width u16, height u16, then 21 x (x, y) float32 normalised points;
+                skips MediaPipe and only runs the CNN and geometry rules
+    CLOSE       drop the session's tracking state (no reply)
+    RESULT      reply to request_id: see encode_result()
+    ERROR       reply to request_id: utf-8 error message
+
+session 0 means no tracking (every frame detected from scratch); any other value
+names a tracking session chosen by the client, scoped to its connection.
+
+Requests are pipelined: a client can send many before reading replies, which carry
+the request_id they answer. Frames of one session always go to the same worker
+thread (it owns that session's MediaPipe graph), so they are processed in order.
+Hands found by every worker go through one batcher thread that runs the CNN on up
+to --max-batch wireframes per call, waiting at most --max-wait ms to fill a batch.
+
+    python inference_service.py --socket /tmp/asl-inference.sock --workers 4
+    INFERENCE_SOCKET=/tmp/asl-inference.sock python app.py
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+import sign_model
+from sign_model import decode_frame
+from landmarks import HandLandmarks
+from main import HandResult, NO_HAND, handDetector
+
+logger = logging.getLogger('inference_service')
+
+DEFAULT_SOCKET = '/tmp/asl-inference.sock'
+
+HEADER = struct.Struct('<IIIB3x')
+IMAGE, RAW, LANDMARKS, CLOSE, RESULT, ERROR = 1, 2, 3, 4, 16, 17
+
+RAW_SHAPE = struct.Struct('<HHB')
+LANDMARKS_SIZE = struct.Struct('<HH')
+NUM_LANDMARKS = 21
+
+# Largest batch the CNN gets, and how long the batcher waits for one to fill (seconds)
+MAX_BATCH = 16
+MAX_WAIT = 0.002
+
+
+# ----------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------
+def recv_exact(sock, size):
+    """Read exactly size bytes, or None if the peer closed the connection."""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    while view:
+        n = sock.recv_into(view)
+        if n == 0:
+            return None
+        view = view[n:]
+    return buf
+
+
+def read_message(sock):
+    """(request_id, session, kind, payload), or None when the connection is closed."""
+    header = recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    payload_len, request_id, session, kind = HEADER.unpack(header)
+    payload = recv_exact(sock, payload_len) if payload_len else b''
+    if payload is None:
+        return None
+    return request_id, session, kind, payload
+
+
+def pack_message(request_id, session, kind, payload=b''):
+    return HEADER.pack(len(payload), request_id, session, kind) + payload
+
+
+def encode_result(hand):
+    """
+    HandResult as bytes: hand u8 (0 = no hand, nothing follows), k u8,
+    21 x (x, y) int16 pixel landmarks, bbox 4 x int16, k x (confidence f32,
+    name_len u8, name), geometry_len u8, geometry letter (0 bytes for None).
+    """
+    if not hand.landmarks:
+        return b'\x00'
+    parts = [struct.pack('<BB', 1, len(hand.top_k)),
+             hand.landmarks.pixels.astype('<i2').tobytes(),
+             struct.pack('<4h', *hand.bbox)]
+    for letter, confidence in hand.top_k:
+        name = str(letter).encode()
+        parts.append(struct.pack('<fB', confidence, len(name)) + name)
+    geometry = (hand.geometry_letter or '').encode()
+    parts.append(struct.pack('<B', len(geometry)) + geometry)
+    return b''.join(parts)
+
+
+def decode_result(data):
+    """Inverse of encode_result()."""
+    if not data or data[0] == 0:
+        return NO_HAND
+    k = data[1]
+    offset = 2
+    points = np.frombuffer(data, dtype='<i2', count=NUM_LANDMARKS * 2, offset=offset).reshape(NUM_LANDMARKS, 2)
+    offset += NUM_LANDMARKS * 4
+    landmarks = HandLandmarks.from_pixels(points)
+    bbox = struct.unpack_from('<4h', data, offset)
+    offset += 8
+    top_k = []
+    for _ in range(k):
+        confidence, length = struct.unpack_from('<fB', data, offset)
+        offset += 5
+        top_k.append((bytes(data[offset:offset + length]).decode(), confidence))
+        offset += length
+    length = data[offset]
+    geometry = bytes(data[offset + 1:offset + 1 + length]).decode() or None
+    return HandResult(landmarks, bbox, tuple(top_k), geometry)
+
+
+# ----------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------
+class Connection:
+    """One client connection: its socket and a lock so replies from different threads don't interleave."""
+
+    ids = itertools.count(1)
+
+    def __init__(self, sock):
+        self.id = next(Connection.ids)
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.open = True
+
+    def send(self, request_id, session, kind, payload=b''):
+        data = pack_message(request_id, session, kind, payload)
+        with self.lock:
+            if not self.open:
+                return
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.open = False
+
+    def reply(self, request_id, session, hand):
+        self.send(request_id, session, RESULT, encode_result(hand))
+
+    def error(self, request_id, session, message):
+        self.send(request_id, session, ERROR, str(message).encode())
+
+
+class Batcher(threading.Thread):
+    """Runs the CNN for hands found by all workers, several per model call, and sends the replies."""
+
+    def __init__(self, detector, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        super().__init__(name='batcher', daemon=True)
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, conn, request_id, session, points, shape):
+        self.queue.put((conn, request_id, session, points, shape))
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.process(batch)
+
+    def process(self, batch):
+        recognizer = self.detector.asl_recognizer
+        top_ks = [()] * len(batch)
+        if recognizer is not None:
+            try:
+                inputs = [self.detector.wireframe_input(points) for _, _, _, points, _ in batch]
+                top_ks = recognizer.predict_top_k_batch(inputs, k=3)
+            except Exception as e:
+                logger.error(f"Batch prediction failed: {e}")
+        self.batches += 1
+        self.items += len(batch)
+        for (conn, request_id, session, points, shape), top_k in zip(batch, top_ks):
+            try:
+                conn.reply(request_id, session, self.detector.analyse_points(points, shape, top_k))
+            except Exception as e:
+                conn.error(request_id, session, e)
+
+
+class Worker(threading.Thread):
+    """Runs MediaPipe for the sessions pinned to it; each session keeps its own tracking context here."""
+
+    def __init__(self, index, recognizer, batcher):
+        super().__init__(name=f'worker-{index}', daemon=True)
+        self.detector = handDetector(detectionCon=0.5, use_asl=False, headless=True)
+        self.detector.asl_recognizer = recognizer
+        self.batcher = batcher
+        self.queue = queue.Queue()
+        self.contexts = {}
+
+    def run(self):
+        while True:
+            conn, request_id, session, kind, payload = self.queue.get()
+            if kind == CLOSE:
+                self.close(conn.id, session)
+                continue
+            try:
+                if kind == IMAGE:
+                    frame = decode_frame(payload)
+                else:
+                    h, w, c = RAW_SHAPE.unpack_from(payload)
+                    frame = np.frombuffer(payload, dtype=np.uint8, offset=RAW_SHAPE.size).reshape(h, w, c)
+                context = None
+                if session:
+                    context = self.contexts.get((conn.id, session))
+                    if context is None:
+                        context = self.contexts[(conn.id, session)] = self.detector.tracking_context()
+                handLms = self.detector.find_hand(frame, context)
+                if handLms is None:
+                    conn.reply(request_id, session, NO_HAND)
+                else:
+                    self.batcher.submit(conn, request_id, session, self.detector.hand_points(handLms), frame.shape)
+            except Exception as e:
+                conn.error(request_id, session, e)
+
+    def close(self, conn_id, session=None):
+        """Drop one session's context, or all of a connection's when session is None."""
+        for key in [k for k in self.contexts if k[0] == conn_id and session in (None, k[1])]:
+            self.contexts.pop(key).close()
+
+
+class InferenceServer:
+    def __init__(self, path=DEFAULT_SOCKET, workers=2, max_batch=MAX_BATCH, max_wait=MAX_WAIT,
+                 model_path=sign_model.MODEL_PATH):
+        self.path = path
+        recognizer = sign_model.load_recognizer(model_path) if os.path.exists(model_path) else None
+        if recognizer is None:
+            logger.warning(f"No model at {model_path}; serving landmarks and geometry only")
+        self.batcher = Batcher(handDetector(use_asl=False, headless=True), max_batch, max_wait)
+        self.batcher.detector.asl_recognizer = recognizer
+        self.workers = [Worker(i, recognizer, self.batcher) for i in range(workers)]
+        self.static_turn = itertools.count()
+
+    def serve_forever(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(64)
+        self.batcher.start()
+        for worker in self.workers:
+            worker.start()
+        logger.info(f"Serving on {self.path} with {len(self.workers)} workers")
+        try:
+            while True:
+                sock, _ = listener.accept()
+                threading.Thread(target=self.handle, args=(Connection(sock),), daemon=True).start()
+        finally:
+            listener.close()
+            os.unlink(self.path)
+
+    def worker_for(self, conn, session):
+        if session == 0:
+            # No tracking state: any worker will do
+            return self.workers[next(self.static_turn) % len(self.workers)]
+        return self.workers[hash((conn.id, session)) % len(self.workers)]
+
+    def handle(self, conn):
+        """Reader for one connection: route each request to its worker (or straight to the batcher)."""
+        try:
+            while True:
+                message = read_message(conn.sock)
+                if message is None:
+                    break
+                request_id, session, kind, payload = message
+                if kind == LANDMARKS:
+                    try:
+                        w, h = LANDMARKS_SIZE.unpack_from(payload)
+                        points = np.frombuffer(payload, dtype='<f4', count=NUM_LANDMARKS * 2,
+                                               offset=LANDMARKS_SIZE.size).reshape(NUM_LANDMARKS, 2)
+                        self.batcher.submit(conn, request_id, session, points.astype(np.float64), (h, w))
+                    except Exception as e:
+                        conn.error(request_id, session, e)
+                elif kind in (IMAGE, RAW, CLOSE):
+                    self.worker_for(conn, session).queue.put((conn, request_id, session, kind, payload))
+                else:
+                    conn.error(request_id, session, f"Unknown message kind {kind}")
+        except OSError:
+            pass
+        finally:
+            with conn.lock:
+                conn.open = False
+            conn.sock.close()
+            for worker in self.workers:
+                worker.queue.put((conn, 0, None, CLOSE, b''))
+
+
+# ----------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------
+class RemoteContext:
+    """A tracking session on the inference service (counterpart of main.TrackingContext)."""
+
+    def __init__(self, client, session):
+        self.client = client
+        self.session = session
+
+    def close(self):
+        self.client.close_session(self.session)
+
+
+class InferenceClient:
+    """
+    Thread-safe client for the inference service, with the same detect() / tracking_context()
+    calls as handDetector. Requests from all threads share one connection and are pipelined;
+    submit() returns a Future instead of waiting. Reconnects on the next request if the
+    service goes away (tracking sessions then start over).
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=10.0):
+        self.path = path
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.sock = None
+        self.pending = {}
+        self.request_ids = itertools.count(1)
+        self.sessions = itertools.count(1)
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        self.sock = sock
+        threading.Thread(target=self._read, args=(sock,), name='inference-client', daemon=True).start()
+
+    def _read(self, sock):
+        try:
+            while True:
+                message = read_message(sock)
+                if message is None:
+                    break
+                request_id, _, kind, payload = message
+                future = self.pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if kind == RESULT:
+                    future.set_result(decode_result(payload))
+                else:
+                    future.set_exception(RuntimeError(bytes(payload).decode(errors='replace')))
+        except OSError:
+            pass
+        with self.lock:
+            if self.sock is sock:
+                self.sock = None
+            failed = list(self.pending.values())
+            self.pending.clear()
+        sock.close()
+        for future in failed:
+            if not future.done():
+                future.set_exception(ConnectionError("Inference service connection closed"))
+
+    def submit(self, kind, payload, session=0):
+        """Send one request; returns a Future for its HandResult (None for CLOSE)."""
+        future = Future()
+        with self.lock:
+            if self.sock is None:
+                self._connect()
+            request_id = next(self.request_ids)
+            if kind != CLOSE:
+                self.pending[request_id] = future
+            try:
+                self.sock.sendall(pack_message(request_id, session, kind, payload))
+            except OSError as e:
+                self.pending.pop(request_id, None)
+                self.sock.close()
+                self.sock = None
+                raise ConnectionError(f"Inference service unavailable: {e}")
+        if kind == CLOSE:
+            future.set_result(None)
+        return future
+
+    @staticmethod
+    def _session(context):
+        return context.session if context is not None else 0
+
+    def tracking_context(self):
+        return RemoteContext(self, next(self.sessions))
+
+    def close_session(self, session):
+        try:
+            self.submit(CLOSE, b'', session)
+        except ConnectionError:
+            pass
+
+    def detect(self, img, context=None):
+        """HandResult for a BGR frame (sent uncompressed)."""
+        h, w = img.shape[:2]
+        c = img.shape[2] if img.ndim == 3 else 1
+        payload = RAW_SHAPE.pack(h, w, c) + np.ascontiguousarray(img, dtype=np.uint8).tobytes()
+        return self.submit(RAW, payload, self._session(context)).result(self.timeout)
+
+    def detect_image(self, image_bytes, context=None):
+        """HandResult for an encoded (JPEG / PNG) frame."""
+        return self.submit(IMAGE, bytes(image_bytes), self._session(context)).result(self.timeout)
+
+    def detect_landmarks(self, points, shape, context=None):
+        """HandResult for normalised (21, 2) points in a frame of the given shape (no MediaPipe)."""
+        h, w = shape[:2]
+        payload = LANDMARKS_SIZE.pack(w, h) + np.asarray(points, dtype='<f4').reshape(NUM_LANDMARKS, 2).tobytes()
+        return self.submit(LANDMARKS, payload, self._session(context)).result(self.timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ASL inference service on a Unix domain socket")
+    parser.add_argument("--socket", default=os.environ.get('INFERENCE_SOCKET', DEFAULT_SOCKET))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="MediaPipe worker threads")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT * 1000, help="Batch fill wait in ms")
+    parser.add_argument("--model", default=sign_model.MODEL_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = InferenceServer(args.socket, args.workers, args.max_batch, args.max_wait / 1000, args.model)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
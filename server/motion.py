@@ -0,0 +1,324 @@
+"""
+Incremental recognition of the motion letters J and Z.
+
+The CNN classifies single frames, so class_names.txt has no J or Z: both letters are
+defined by how the hand moves. Each session gets a MotionTracker, fed the first hand
+of every processed frame, which runs a small temporal convolution network over the
+last `window` frames:
+
+    per-frame features (FEATURES) -> Conv1D(kernel, channels, relu) -> mean over the window
+    -> Dense(softmax over classes, e.g. J, Z, none)
+
+A frame costs the same whatever the window length: the new conv output only needs the
+last `kernel` feature rows, and the window mean is a running sum (add the newest conv
+output, subtract the one leaving the ring). State per session is two fixed-size rings
+(MotionTracker.nbytes), reported on the status route.
+
+Weights come from models/motion_model.npz, written by `python motion.py train`
+(Keras, like the CNN). Without that file motion recognition is off and predictions
+carry no 'motion' field. The model is trained on windows of frames at the rate the
+recordings were made; serve it at a similar client frame rate.
+
+    python motion.py train --source motion_recordings/ --window 16
+    python motion.py bench
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+
+# Wrist, index fingertip and pinky fingertip: the points whose movement is tracked
+TRACKED = [0, 8, 20]
+# 21 wrist-relative (x, y), movement of the TRACKED points, hand present
+FEATURES = 21 * 2 + len(TRACKED) * 2 + 1
+
+WINDOW = 16
+KERNEL = 3
+CHANNELS = 32
+# Probability a motion letter needs to be reported
+THRESHOLD = float(os.environ.get('MOTION_THRESHOLD', 0.6))
+# Class for windows that are neither J nor Z
+NONE_CLASS = 'none'
+
+
+def frame_features(pixels, previous=None):
+    """
+    Features of one frame: the 21 landmarks relative to the wrist in palm lengths (wrist to
+    middle-finger knuckle), how far the TRACKED points moved since the previous frame in
+    the same unit, and 1 for a hand. All zeros without a hand (pixels None).
+    Independent of the frame size, so pixel landmarks from any source work.
+    """
+    features = np.zeros(FEATURES, dtype=np.float32)
+    if pixels is None:
+        return features
+    pixels = np.asarray(pixels, dtype=np.float32)
+    scale = float(np.hypot(*(pixels[9] - pixels[0]))) or 1.0
+    features[:42] = ((pixels - pixels[0]) / scale).ravel()
+    if previous is not None:
+        features[42:-1] = ((pixels[TRACKED] - previous[TRACKED]) / scale).ravel()
+    features[-1] = 1
+    return features
+
+
+class MotionModel:
+    """Weights of the temporal network, shared by every session's MotionTracker."""
+
+    def __init__(self, conv_w, conv_b, dense_w, dense_b, classes, window):
+        # conv_w is Keras' Conv1D kernel, (kernel, FEATURES, channels)
+        self.kernel, _, self.channels = conv_w.shape
+        self.conv_w = conv_w.reshape(-1, self.channels).astype(np.float32)
+        self.conv_b = conv_b.astype(np.float32)
+        self.dense_w = dense_w.astype(np.float64)
+        self.dense_b = dense_b.astype(np.float64)
+        self.classes = [str(c) for c in classes]
+        self.window = int(window)
+        # Conv outputs the window mean covers ('valid' convolution)
+        self.outputs = self.window - self.kernel + 1
+        # Input ring rows oldest to newest, for each position of the next write
+        self.orders = [(start + np.arange(self.kernel)) % self.kernel for start in range(self.kernel)]
+
+    @classmethod
+    def load(cls, path):
+        """The model saved at path, or None if there is none."""
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        return cls(data['conv_w'], data['conv_b'], data['dense_w'], data['dense_b'],
+                   data['classes'], data['window'])
+
+    def save(self, path):
+        np.savez(path, conv_w=self.conv_w.reshape(self.kernel, FEATURES, self.channels), conv_b=self.conv_b,
+                 dense_w=self.dense_w, dense_b=self.dense_b, classes=np.array(self.classes),
+                 window=self.window)
+
+    def probabilities(self, pooled):
+        logits = pooled @ self.dense_w + self.dense_b
+        exp = np.exp(logits - logits.max())
+        return exp / exp.sum()
+
+    def classify(self, features):
+        """Class probabilities for a whole (window, FEATURES) window, computed from scratch."""
+        rows = np.lib.stride_tricks.sliding_window_view(features, (self.kernel, FEATURES))[:, 0]
+        conv = np.maximum(rows.reshape(len(rows), -1) @ self.conv_w + self.conv_b, 0)
+        return self.probabilities(conv.mean(axis=0, dtype=np.float64))
+
+    def result(self, probabilities):
+        """{'letter', 'confidence'} for class probabilities; letter is None unless a motion letter is likely."""
+        best = int(np.argmax(probabilities))
+        letter = self.classes[best]
+        confidence = float(probabilities[best])
+        if letter == NONE_CLASS or confidence < THRESHOLD:
+            letter = None
+        return {'letter': letter, 'confidence': confidence}
+
+    def tracker(self):
+        return MotionTracker(self)
+
+    @property
+    def session_nbytes(self):
+        return MotionTracker(self).nbytes
+
+    def summary(self, trackers):
+        """Model settings and session memory for the status route."""
+        trackers = [tracker for tracker in trackers if tracker is not None]
+        return {
+            'enabled': True,
+            'classes': self.classes,
+            'window': self.window,
+            'bytes_per_session': self.session_nbytes,
+            'sessions': len(trackers),
+            'bytes': sum(tracker.nbytes for tracker in trackers),
+        }
+
+
+class MotionTracker:
+    """
+    One session's rings and running sum. update() costs O(kernel * FEATURES * channels)
+    per frame, independent of the window. Only use from one thread at a time.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.inputs = np.zeros((model.kernel, FEATURES), dtype=np.float32)
+        self.conv = np.zeros((model.outputs, model.channels), dtype=np.float32)
+        self.sum = np.zeros(model.channels, dtype=np.float64)
+        self.previous = np.zeros((21, 2), dtype=np.float32)
+        self.has_previous = False
+        self.frames = 0
+        # Handedness of the hand being followed, so two-hand frames keep feeding the same one
+        self.handedness = None
+
+    @property
+    def nbytes(self):
+        return self.inputs.nbytes + self.conv.nbytes + self.sum.nbytes + self.previous.nbytes
+
+    def update(self, pixels, handedness=None):
+        """
+        Add a frame's (21, 2) pixel landmarks (None without a hand). Returns the model's
+        result for the last `window` frames, or None until that many have been seen.
+        """
+        model = self.model
+        self.inputs[self.frames % model.kernel] = frame_features(
+            pixels, self.previous if self.has_previous else None)
+        if pixels is not None:
+            self.previous[:] = pixels
+            self.handedness = handedness
+        self.has_previous = pixels is not None
+        self.frames += 1
+        if self.frames < model.kernel:
+            return None
+
+        rows = self.inputs[model.orders[self.frames % model.kernel]]
+        conv = np.maximum(rows.reshape(-1) @ model.conv_w + model.conv_b, 0)
+        done = self.frames - model.kernel
+        slot = done % model.outputs
+        if done >= model.outputs:
+            self.sum -= self.conv[slot]
+        self.conv[slot] = conv
+        self.sum += conv
+        if slot == model.outputs - 1:
+            # Start each lap of the ring from an exact sum, so rounding can't build up
+            self.sum = self.conv.sum(axis=0, dtype=np.float64)
+        if done + 1 < model.outputs:
+            return None
+        return model.result(model.probabilities(self.sum / model.outputs))
+
+
+def sequence_features(detector, paths):
+    """(frames, FEATURES) features of one recorded sequence, through a tracking context."""
+    import cv2
+
+    context = detector.tracking_context()
+    features, previous = [], None
+    try:
+        for path in paths:
+            hand = detector.detect(cv2.imread(path), context)
+            pixels = hand.landmarks.pixels if hand.landmarks else None
+            features.append(frame_features(pixels, previous))
+            previous = pixels
+    finally:
+        context.close()
+    return np.array(features).reshape(-1, FEATURES)
+
+
+def windows(features, window):
+    """Every window of a sequence (stride 1); sequences shorter than a window are padded with no-hand frames."""
+    if len(features) < window:
+        features = np.concatenate([np.zeros((window - len(features), FEATURES), dtype=np.float32), features])
+    return np.lib.stride_tricks.sliding_window_view(features, (window, FEATURES))[:, 0]
+
+
+def train(args):
+    """Train on source/<class>/<sequence>/ frame directories (classes such as J, Z and none)."""
+    from tensorflow.keras import layers, models
+    from sklearn.model_selection import train_test_split
+
+    from sign_model import MOTION_PATH, SignLanguageModel
+
+    model = SignLanguageModel()
+    if not model.ready:
+        raise SystemExit("Model not ready")
+    classes = sorted(d for d in os.listdir(args.source) if os.path.isdir(os.path.join(args.source, d)))
+    if NONE_CLASS not in classes:
+        print(f"Warning: no '{NONE_CLASS}' class; every window will be called a motion letter")
+
+    # One (windows, labels) pair per recorded sequence
+    sequences = []
+    for label, name in enumerate(classes):
+        count = 0
+        for sequence in sorted(glob.glob(os.path.join(args.source, name, '*', ''))):
+            paths = sorted(glob.glob(os.path.join(sequence, '*.jpg')) + glob.glob(os.path.join(sequence, '*.png')))
+            if paths:
+                sequence_windows = windows(sequence_features(model.detector, paths), args.window)
+                sequences.append((sequence_windows, np.full(len(sequence_windows), label)))
+                count += len(sequence_windows)
+        print(f"{name}: {count} windows")
+    # Split by sequence, so overlapping windows of one recording don't end up on both sides
+    train_sequences, test_sequences = train_test_split(sequences, test_size=0.2, random_state=42)
+    X_train, y_train = (np.concatenate(part) for part in zip(*train_sequences))
+    X_test, y_test = (np.concatenate(part) for part in zip(*test_sequences))
+
+    network = models.Sequential([
+        layers.Conv1D(args.channels, args.kernel, activation='relu', input_shape=(args.window, FEATURES)),
+        layers.GlobalAveragePooling1D(),
+        layers.Dense(len(classes), activation='softmax'),
+    ])
+    network.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    network.fit(X_train, y_train, epochs=args.epochs, batch_size=64, validation_data=(X_test, y_test))
+
+    conv_w, conv_b = network.layers[0].get_weights()
+    dense_w, dense_b = network.layers[2].get_weights()
+    motion = MotionModel(conv_w, conv_b, dense_w, dense_b, classes, args.window)
+    motion.save(args.output or MOTION_PATH)
+    print(f"Saved {args.output or MOTION_PATH} ({motion.session_nbytes} bytes of state per session)")
+
+
+def bench(args):
+    """Per-frame cost of the incremental update against re-running the whole window, and that they agree."""
+    from sign_model import MOTION_PATH
+
+    motion = MotionModel.load(args.model or MOTION_PATH)
+    if motion is None:
+        # Timing and agreement don't depend on the weights
+        print("No trained model; using random weights")
+        rng = np.random.default_rng(0)
+        motion = MotionModel(rng.normal(0, 0.1, (KERNEL, FEATURES, CHANNELS)), rng.normal(0, 0.1, CHANNELS),
+                             rng.normal(0, 0.5, (CHANNELS, 3)), np.zeros(3), ['J', 'Z', NONE_CLASS], args.window)
+    rng = np.random.default_rng(1)
+    stream = [None if rng.random() < 0.1 else rng.uniform(0, 480, (21, 2)).astype(np.float32)
+              for _ in range(args.frames)]
+
+    tracker = motion.tracker()
+    start = time.perf_counter()
+    incremental = [tracker.update(pixels) for pixels in stream]
+    incremental_us = (time.perf_counter() - start) / len(stream) * 1e6
+
+    features, previous = [], None
+    for pixels in stream:
+        features.append(frame_features(pixels, previous))
+        previous = pixels
+    features = np.array(features)
+    start = time.perf_counter()
+    full = [motion.result(motion.classify(features[i + 1 - motion.window:i + 1])) if i + 1 >= motion.window else None
+            for i in range(len(features))]
+    full_us = (time.perf_counter() - start) / len(stream) * 1e6
+
+    differ = 0
+    for a, b in zip(incremental, full):
+        if (a is None) != (b is None):
+            differ += 1
+        elif a is not None and (a['letter'] != b['letter'] or abs(a['confidence'] - b['confidence']) > 1e-4):
+            differ += 1
+    print(f"window {motion.window}, kernel {motion.kernel}, {motion.channels} channels, {len(stream)} frames")
+    print(f"incremental update  {incremental_us:7.1f} us/frame (features included)")
+    print(f"whole window        {full_us:7.1f} us/frame (features excluded)")
+    print(f"results differing   {differ}")
+    print(f"state per session   {tracker.nbytes} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or benchmark the J / Z motion model")
+    commands = parser.add_subparsers(dest='command', required=True)
+    train_parser = commands.add_parser('train', help="Train on recorded sequences")
+    train_parser.add_argument("--source", required=True, help="Directory of <class>/<sequence>/ frame directories")
+    train_parser.add_argument("--window", type=int, default=WINDOW, help="Frames per window")
+    train_parser.add_argument("--kernel", type=int, default=KERNEL)
+    train_parser.add_argument("--channels", type=int, default=CHANNELS)
+    train_parser.add_argument("--epochs", type=int, default=30)
+    train_parser.add_argument("--output", help="Where to save the model (default: models/motion_model.npz)")
+    bench_parser = commands.add_parser('bench', help="Time the incremental update against the whole window")
+    bench_parser.add_argument("--model", help="Model to time (default: the deployed one, or random weights)")
+    bench_parser.add_argument("--window", type=int, default=WINDOW, help="Window for random weights")
+    bench_parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+    if args.command == 'train':
+        train(args)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Compact binary encoding of 'prediction' messages.
+
+A client that sends "encoding": "binary" with its frames is first sent an 'encoding'
+event with the tables the binary messages index into (PredictionCodec.table()), then
+gets each 'prediction' as bytes (a binary Socket.IO attachment) instead of a JSON dict.
+Little-endian layout, version 1:
+
+    header   u8 version, u8 flags, u8 degradation level, u8 profile, f64 timestamp (ms)
+    hands    u8 count, then per hand:
+             u8 handedness, u8 letter, u8 confidence, u8 geometry letter, u8 k,
+             k x (u8 letter, u8 confidence)
+    motion   u8 letter, u8 confidence (only if flags has MOTION)
+
+Letters are indices into table()['letters'] -- the CNN's class_names, then the rest of
+A-Z -- with 255 for none; confidences are quantised to 0-255. The top-level prediction
+is the first hand's, as in the JSON message. Handedness, profile and level index their
+own tables. Messages this can't represent (an 'error' prediction, a letter missing from
+the table) are sent as JSON as before.
+
+src/lib/webcamStreaming.ts has the matching decoder. Run this module to compare bytes
+per message and encode time with the JSON path:
+
+    python prediction_codec.py --messages 10000
+"""
+
+import argparse
+import string
+import struct
+import time
+
+JSON = 'json'
+BINARY = 'binary'
+ENCODINGS = (JSON, BINARY)
+
+VERSION = 1
+NONE = 255
+
+# flags
+MOTION = 1                  # the prediction has a 'motion' field
+MOTION_RESULT = 2           # ... that isn't None (the tracker's window is full)
+
+HEADER = struct.Struct('<BBBBd')
+HAND = struct.Struct('<BBBBB')
+PAIR = struct.Struct('<BB')
+
+HANDEDNESS = ['Left', 'Right']
+
+
+def check_encoding(encoding):
+    """The message encoding; raises ValueError for unknown ones."""
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}' (expected one of {', '.join(ENCODINGS)})")
+    return encoding
+
+
+def quantise(confidence):
+    return min(255, max(0, int(round(float(confidence) * 255))))
+
+
+def table_letters(class_names):
+    """Letters binary messages can name: class_names in order, then the letters of A-Z not among them (J, Z)."""
+    letters = list(class_names)
+    for letter in string.ascii_uppercase:
+        if letter not in letters:
+            letters.append(letter)
+    return letters[:NONE]
+
+
+class PredictionCodec:
+    def __init__(self, letters, profiles, levels):
+        self.letters = list(letters)
+        self.profiles = list(profiles)
+        self.levels = list(levels)
+        self._letter = {letter: i for i, letter in enumerate(self.letters)}
+        self._letter[None] = NONE
+        self._profile = {name: i for i, name in enumerate(self.profiles)}
+        self._handedness = {name: i for i, name in enumerate(HANDEDNESS)}
+        self._handedness[None] = NONE
+
+    def table(self):
+        """Payload of the 'encoding' event sent when a client switches to binary."""
+        return {
+            'format': 'binary',
+            'version': VERSION,
+            'letters': self.letters,
+            'handedness': HANDEDNESS,
+            'profiles': self.profiles,
+            'levels': self.levels,
+        }
+
+    def encode(self, message):
+        """
+        A 'prediction' message ({prediction, degradation, profile, timestamp}) as bytes,
+        or None if it can't be encoded (send it as JSON).
+        """
+        prediction = message['prediction']
+        if 'error' in prediction:
+            return None
+        try:
+            hands = prediction.get('hands', [])
+            flags = 0
+            if 'motion' in prediction:
+                flags |= MOTION
+                if prediction['motion'] is not None:
+                    flags |= MOTION_RESULT
+            parts = [HEADER.pack(VERSION, flags, message['degradation']['level'],
+                                 self._profile[message['profile']], float(message['timestamp'])),
+                     bytes((len(hands),))]
+            for hand in hands:
+                alternatives = hand.get('alternatives', [])
+                parts.append(HAND.pack(self._handedness[hand.get('handedness')], self._letter[hand['letter']],
+                                       quantise(hand['confidence']), self._letter[hand.get('geometry_letter')],
+                                       len(alternatives)))
+                parts.extend(PAIR.pack(self._letter[alt['letter']], quantise(alt['confidence']))
+                             for alt in alternatives)
+            if flags & MOTION_RESULT:
+                motion = prediction['motion']
+                parts.append(PAIR.pack(self._letter[motion['letter']], quantise(motion['confidence'])))
+        except KeyError:
+            return None
+        return b''.join(parts)
+
+    def decode(self, data):
+        """Inverse of encode() (with quantised confidences); the reference for the TypeScript decoder."""
+        version, flags, level, profile, timestamp = HEADER.unpack_from(data, 0)
+        if version != VERSION:
+            raise ValueError(f"Unsupported prediction encoding version {version}")
+        offset = HEADER.size
+        letter = lambda i: None if i == NONE else self.letters[i]
+        count = data[offset]
+        offset += 1
+        hands = []
+        for _ in range(count):
+            handedness, letter_i, confidence, geometry, k = HAND.unpack_from(data, offset)
+            offset += HAND.size
+            alternatives = []
+            for _ in range(k):
+                alt_letter, alt_confidence = PAIR.unpack_from(data, offset)
+                offset += PAIR.size
+                alternatives.append({'letter': letter(alt_letter), 'confidence': alt_confidence / 255})
+            hand = {'letter': letter(letter_i), 'confidence': confidence / 255, 'alternatives': alternatives,
+                    'handedness': None if handedness == NONE else HANDEDNESS[handedness]}
+            if geometry != NONE:
+                hand['geometry_letter'] = letter(geometry)
+            hands.append(hand)
+        prediction = dict(hands[0]) if hands else {'letter': None, 'confidence': 0, 'alternatives': []}
+        prediction['hands'] = hands
+        if flags & MOTION:
+            prediction['motion'] = None
+            if flags & MOTION_RESULT:
+                motion_letter, motion_confidence = PAIR.unpack_from(data, offset)
+                prediction['motion'] = {'letter': letter(motion_letter), 'confidence': motion_confidence / 255}
+        return {
+            'type': 'prediction',
+            'prediction': prediction,
+            'degradation': {'level': level, 'name': self.levels[level]},
+            'profile': self.profiles[profile],
+            'timestamp': timestamp,
+        }
+
+
+def sample_messages(codec, count, seed=0):
+    """Prediction messages shaped like the servers' (one or two hands, some without a letter)."""
+    import random
+
+    rng = random.Random(seed)
+    letters = [letter for letter in codec.letters if letter not in 'JZ']
+    messages = []
+    for _ in range(count):
+        hands = []
+        for handedness in rng.sample(HANDEDNESS, rng.choice((0, 1, 1, 1, 2))):
+            alternatives = [{'letter': letter, 'confidence': rng.random()} for letter in rng.sample(letters, 3)]
+            hands.append({'letter': alternatives[0]['letter'], 'confidence': alternatives[0]['confidence'],
+                          'alternatives': alternatives, 'geometry_letter': rng.choice(letters),
+                          'handedness': handedness})
+        prediction = dict(hands[0]) if hands else {'letter': None, 'confidence': 0, 'alternatives': []}
+        prediction['hands'] = hands
+        messages.append({'type': 'prediction', 'prediction': prediction,
+                         'degradation': {'level': 0, 'name': codec.levels[0]},
+                         'profile': codec.profiles[-1], 'timestamp': time.time() * 1000})
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare binary and JSON prediction messages")
+    parser.add_argument("--messages", type=int, default=10000)
+    args = parser.parse_args()
+
+    from socketio import packet
+
+    from degradation import LEVELS
+    from profiles import PROFILES
+    from sign_model import read_class_names
+
+    codec = PredictionCodec(table_letters(read_class_names()), PROFILES, [level.name for level in LEVELS])
+    messages = sample_messages(codec, args.messages)
+
+    # What Socket.IO puts on the wire for each: a JSON event, or a binary event plus its attachment
+    wire = lambda encoded: sum(len(part) for part in (encoded if isinstance(encoded, list) else [encoded]))
+    start = time.perf_counter()
+    json_packets = [packet.Packet(packet.EVENT, data=['prediction', message]).encode() for message in messages]
+    json_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    binary_packets = [packet.Packet(packet.EVENT, data=['prediction', codec.encode(message)]).encode()
+                      for message in messages]
+    binary_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for message in messages:
+        codec.encode(message)
+    encode_seconds = time.perf_counter() - start
+
+    json_bytes = sum(wire(p) for p in json_packets) / len(messages)
+    binary_bytes = sum(wire(p) for p in binary_packets) / len(messages)
+    payload_bytes = sum(len(p[1]) for p in binary_packets) / len(messages)
+    print(f"{len(messages)} messages")
+    print(f"JSON     {json_bytes:6.1f} bytes/message  {json_seconds / len(messages) * 1e6:5.1f} us/message (packet encode)")
+    print(f"binary   {binary_bytes:6.1f} bytes/message  {binary_seconds / len(messages) * 1e6:5.1f} us/message "
+          f"(packet encode; payload {payload_bytes:.1f} bytes, {encode_seconds / len(messages) * 1e6:.1f} us)")
+
+    # Round trip: letters exact, confidences within quantisation
+    worst = 0.0
+    for message in messages:
+        decoded = codec.decode(codec.encode(message))
+        for a, b in zip(message['prediction']['hands'], decoded['prediction']['hands']):
+            assert a['letter'] == b['letter'] and a['handedness'] == b['handedness']
+            assert [x['letter'] for x in a['alternatives']] == [x['letter'] for x in b['alternatives']]
+            worst = max(worst, abs(a['confidence'] - b['confidence']))
+    print(f"round trip OK, largest confidence error {worst:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Pre-forking launcher for the Socket.IO server (app.py) on several cores.
+
+The parent process imports the heavy modules (OpenCV, MediaPipe, NumPy, the
+secret-sauce detector) and loads the ASL model once, from the compiled model
+cache, then forks --workers children. The children share those pages
+copy-on-write and only create what can't cross a fork themselves: their
+MediaPipe graphs, eventlet hub and inference threads.
+
+All workers accept connections from one listening socket opened by the parent.
+Workers only allow the websocket transport (the web client already uses only
+that), so each Socket.IO session is a single TCP connection and stays on the
+worker that accepted it, together with its tracking context.
+
+Each worker publishes its load (sessions, frames, in-flight work) to a shared
+array every second; GET /workers on any worker returns every worker's row.
+Workers that die are restarted.
+
+    python prefork.py --workers 4 --port 5002
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from multiprocessing import RawArray, get_context
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('prefork')
+
+# One row of the shared load table per worker
+LOAD_FIELDS = ('pid', 'sessions', 'in_flight', 'frames_received', 'frames_processed',
+               'frames_dropped', 'avg_processing_ms', 'updated')
+# How often workers publish their load, in seconds
+PUBLISH_INTERVAL = 1.0
+
+
+def preload():
+    """
+    Import and load everything the workers can share. The model is only loaded here if the
+    compiled cache is usable: loading the .h5 with Keras would start TensorFlow's thread
+    pools, which don't survive a fork, so in that case each worker loads its own.
+    """
+    import sign_model
+    import model_cache
+
+    model_path = sign_model.MODEL_PATH
+    if os.path.exists(model_path) and not model_cache.is_fresh(model_path):
+        # Build the cache in a separate interpreter so TensorFlow is never imported here
+        logger.info("Compiling model cache before forking")
+        process = get_context('spawn').Process(target=model_cache.load_or_compile, args=(model_path,))
+        process.start()
+        process.join()
+
+    if model_cache.is_fresh(model_path):
+        sign_model.load_recognizer()
+        logger.info("Model loaded in the parent; workers will share it")
+    else:
+        logger.warning("No usable compiled model cache; each worker will load the model itself")
+
+
+def read_load(load, num_workers):
+    """The shared load table as a list of dicts, one per worker."""
+    width = len(LOAD_FIELDS)
+    rows = []
+    for index in range(num_workers):
+        row = load[index * width:(index + 1) * width]
+        rows.append({'worker': index, **{name: row[i] for i, name in enumerate(LOAD_FIELDS)}})
+    for row in rows:
+        for name in ('pid', 'sessions', 'in_flight', 'frames_received', 'frames_processed', 'frames_dropped'):
+            row[name] = int(row[name])
+    return rows
+
+
+def publish_load(index, load, server):
+    """Greenthread in each worker: write this worker's row of the load table."""
+    import eventlet
+
+    width = len(LOAD_FIELDS)
+    while True:
+        stats = server.stats
+        times = stats['processing_times']
+        row = (os.getpid(), len(server.sessions), server.admission.in_flight, stats['frames_received'],
+               stats['frames_processed'], stats['frames_dropped'],
+               sum(times) / len(times) * 1000 if times else 0.0, time.time())
+        load[index * width:(index + 1) * width] = row
+        eventlet.sleep(PUBLISH_INTERVAL)
+
+
+def worker_main(index, listener, load, num_workers):
+    """Run app.py's server on the inherited listening socket."""
+    import eventlet
+    import eventlet.wsgi
+    from flask import jsonify
+
+    import app as server
+
+    # One TCP connection per session, so a session never moves between workers
+    server.socketio.server.eio.transports = ['websocket']
+    server.app.add_url_rule('/workers', 'workers', lambda: jsonify(read_load(load, num_workers)))
+    eventlet.spawn(publish_load, index, load, server)
+
+    logger.info(f"Worker {index} (pid {os.getpid()}) serving")
+    eventlet.wsgi.server(eventlet.greenio.GreenSocket(listener), server.app, log_output=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forking multi-worker Socket.IO server")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get('PORT', 5002)))
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    preload()
+    logger.info(f"Preloaded in {time.perf_counter() - start:.1f}s")
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(128)
+    load = RawArray('d', args.workers * len(LOAD_FIELDS))
+
+    children = {}
+    stopping = False
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                worker_main(index, listener, load, args.workers)
+            except Exception:
+                logger.exception(f"Worker {index} failed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(args.workers):
+        spawn(index)
+    logger.info(f"Started {args.workers} workers on {args.host}:{args.port}")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.warning(f"Worker {index} (pid {pid}) exited with status {status}; restarting")
+        time.sleep(1.0)
+        spawn(index)
+    listener.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Named latency profiles for the hand tracker and classifier.
+
+A profile bundles the MediaPipe settings (landmark model complexity, number of hands,
+detection / tracking confidence), the processing resolution (frames wider than
+max_width are scaled down before MediaPipe) and the classifier backend ('cnn': CNN +
+geometry rules, 'geometry': geometry rules only). The CNN input stays 64x64 whatever
+the profile; the model is trained at that size.
+
+    fast       lite landmark model, 1 hand, 320 px wide, geometry rules only
+    balanced   lite landmark model, 1 hand, 480 px wide, CNN + geometry
+    accurate   full landmark model, 2 hands, full resolution, CNN + geometry (the original settings)
+
+The deployment default comes from ASL_PROFILE (default: accurate); clients can pick
+another per session by sending 'profile' with their frames.
+
+Run this module to sweep every profile over a recorded corpus and compare latency per
+frame (decode excluded) and letter agreement with the accurate profile:
+
+    python profiles.py --source recordings/session1/ recordings/session2/
+"""
+
+import argparse
+import glob
+import os
+import time
+from collections import namedtuple
+
+Profile = namedtuple('Profile', ['name', 'model_complexity', 'max_hands', 'detection_con', 'tracking_con',
+                                 'max_width', 'classifier'])
+
+PROFILES = {
+    'fast': Profile('fast', 0, 1, 0.5, 0.5, 320, 'geometry'),
+    'balanced': Profile('balanced', 0, 1, 0.5, 0.5, 480, 'cnn'),
+    'accurate': Profile('accurate', 1, 2, 0.5, 0.5, None, 'cnn'),
+}
+
+DEFAULT_PROFILE = os.environ.get('ASL_PROFILE', 'accurate')
+
+
+def get_profile(name=None):
+    """The named profile (the deployment default for None). Raises ValueError for unknown names."""
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown profile '{name}' (expected one of {', '.join(PROFILES)})")
+    return PROFILES[name]
+
+
+def profile_scale(profile, shape):
+    """Factor frames of this shape are scaled by before MediaPipe (1.0 = full resolution)."""
+    width = shape[1]
+    if profile.max_width and width > profile.max_width:
+        return profile.max_width / width
+    return 1.0
+
+
+def sweep_session(model, profile, paths):
+    """Run one recorded session through a profile: (letters, per-frame ms)."""
+    import cv2
+
+    context = model.tracking_context(profile.name)
+    letters, times = [], []
+    try:
+        for path in paths:
+            frame = cv2.imread(path)
+            start = time.perf_counter()
+            prediction = model.predict(frame, context, profile=profile.name)
+            times.append((time.perf_counter() - start) * 1000)
+            letters.append(prediction.get('letter'))
+    finally:
+        context.close()
+    return letters, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure latency and agreement of every profile on recorded sessions")
+    parser.add_argument("--source", nargs='+', required=True, help="Recorded session directories (frames in name order)")
+    parser.add_argument("--reference", default='accurate', help="Profile the others are compared with")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    from sign_model import SignLanguageModel
+
+    model = SignLanguageModel()
+    if not model.ready or model.remote:
+        raise SystemExit("The sweep needs the model loaded in-process (unset INFERENCE_SOCKET)")
+
+    sessions = []
+    for directory in args.source:
+        paths = sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png')))
+        sessions.append(paths)
+    frames = sum(len(paths) for paths in sessions)
+
+    results = {}
+    for name, profile in PROFILES.items():
+        letters, times = [], []
+        for paths in sessions:
+            # One warm-up frame per session (graph start-up)
+            sweep_session(model, profile, paths[:1])
+            session_letters, session_times = sweep_session(model, profile, paths)
+            letters += session_letters
+            times += session_times
+        results[name] = (letters, np.array(times))
+
+    reference = results[args.reference][0]
+    print(f"{frames} frames in {len(sessions)} sessions; agreement is with '{args.reference}'")
+    print("profile     p50 ms  p95 ms  with letter  agreement")
+    for name, (letters, times) in results.items():
+        predicted = sum(letter is not None for letter in letters)
+        # Agreement over frames where either profile gave a letter (frames without a hand in both don't count)
+        compared = [(a, b) for a, b in zip(letters, reference) if a is not None or b is not None]
+        agreement = f"{sum(a == b for a, b in compared) / len(compared):8.1%}" if compared else "     n/a"
+        print(f"{name:10s} {np.percentile(times, 50):7.1f} {np.percentile(times, 95):7.1f} "
+              f"{predicted:12d}  {agreement}")
+
+
+if __name__ == "__main__":
+    main()
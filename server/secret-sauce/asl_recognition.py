@@ -1,24 +1,26 @@
 import os
 import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras import layers, models
-from sklearn.model_selection import train_test_split
-import matplotlib.pyplot as plt
-from sklearn.metrics import confusion_matrix, classification_report
-import seaborn as sns
+
+import model_cache
+
+# TensorFlow, scikit-learn and the plotting libraries are only needed to build,
+# train or evaluate a model. They are imported where they are used so that a
+# process serving from the compiled model cache doesn't pay for importing them.
 
 class ASLRecognizer:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, use_cache=True):
         self.model = None
         self.class_names = []
         if model_path and os.path.exists(model_path):
-            self.load_model(model_path)
+            self.load_model(model_path, use_cache=use_cache)
         else:
             self.build_model()
     
     def build_model(self):
         """Build CNN model architecture"""
+        from tensorflow.keras import layers, models
+
         model = models.Sequential([
             layers.Conv2D(32, (3, 3), activation='relu', input_shape=(64, 64, 1)),
             layers.MaxPooling2D((2, 2)),
@@ -72,6 +74,8 @@ class ASLRecognizer:
     
     def preprocess_data(self, images, labels):
         """Preprocess the data and split into train/test sets"""
+        from sklearn.model_selection import train_test_split
+
         # Reshape for CNN input
         images = images.reshape(images.shape[0], 64, 64, 1)
         
@@ -82,45 +86,101 @@ class ASLRecognizer:
         
         return X_train, X_test, y_train, y_test
     
-    def train(self, dataset_path, epochs=15, batch_size=32, save_path=None):
-        """Train the model on the ASL dataset"""
-        # Load and preprocess data
-        print("Loading data...")
-        images, labels = self.load_data(dataset_path)
-        print(f"Loaded {len(images)} images across {len(self.class_names)} classes")
-        
-        X_train, X_test, y_train, y_test = self.preprocess_data(images, labels)
-        
-        # Data augmentation
-        datagen = tf.keras.preprocessing.image.ImageDataGenerator(
-            rotation_range=10,
-            zoom_range=0.1,
-            width_shift_range=0.1,
-            height_shift_range=0.1
+    def train(self, dataset_path, epochs=15, batch_size=32, save_path=None, cache_dir=None):
+        """
+        Train the model on the ASL dataset.
+        Images are streamed through the tf.data pipeline in input_pipeline.py; decoded
+        samples are cached under cache_dir (default: <dataset_path>/.tfcache) after the first epoch.
+        dataset_path may also be a directory produced by packed_dataset.py, in which case
+        batches are sliced straight out of its memory map and its saved split is used.
+        """
+        from sklearn.model_selection import train_test_split
+        from input_pipeline import list_dataset_files, make_dataset, make_array_dataset, cache_prefix
+        from packed_dataset import PackedDataset, is_packed
+
+        if is_packed(dataset_path):
+            packed = PackedDataset(dataset_path)
+            self.class_names = packed.class_names
+            X_train, y_train = packed.split('train')
+            X_test, y_test = packed.split('test')
+            print(f"Opened packed dataset: {len(y_train)} train / {len(y_test)} test images")
+            train_ds = make_array_dataset(X_train, y_train, batch_size=batch_size, training=True, augment=True)
+            test_ds = make_array_dataset(X_test, y_test, batch_size=batch_size)
+            return self._fit_and_evaluate(train_ds, test_ds, np.asarray(y_test), len(y_train), epochs, save_path)
+
+        # List files once; nothing is decoded until the pipeline runs
+        print("Listing data...")
+        paths, labels, self.class_names = list_dataset_files(dataset_path)
+        print(f"Found {len(paths)} images across {len(self.class_names)} classes")
+        
+        train_paths, test_paths, y_train, y_test = train_test_split(
+            paths, labels, test_size=0.2, random_state=42, stratify=labels
         )
         
+        cache_dir = cache_dir or os.path.join(dataset_path, '.tfcache')
+        train_ds = make_dataset(train_paths, y_train, batch_size=batch_size, training=True, augment=True,
+                                cache_path=cache_prefix(cache_dir, train_paths, 64, 'train'))
+        test_ds = make_dataset(test_paths, y_test, batch_size=batch_size,
+                               cache_path=cache_prefix(cache_dir, test_paths, 64, 'test'))
+        
+        return self._fit_and_evaluate(train_ds, test_ds, y_test, len(train_paths), epochs, save_path)
+    
+    def train_from_landmarks(self, landmark_dir, epochs=15, batch_size=32, save_path=None):
+        """
+        Train on a landmark dataset written by extract_landmarks.py.
+        Wireframes are rasterised on the fly and augmented in landmark space (rotation, zoom,
+        shift, mirroring and joint jitter), so no *_flipped folders or pre-rendered images are needed.
+        """
+        from sklearn.model_selection import train_test_split
+        from extract_landmarks import load_landmarks
+        from input_pipeline import make_landmark_dataset
+
+        store = load_landmarks(landmark_dir)
+        detected = store['detected']
+        points = store['landmarks'][detected][:, :, :2]
+        letters = store['label'][detected]
+        self.class_names = sorted(set(letters.tolist()))
+        labels = np.array([self.class_names.index(letter) for letter in letters], dtype=np.int32)
+        print(f"Loaded {len(labels)} hands across {len(self.class_names)} classes")
+        
+        X_train, X_test, y_train, y_test = train_test_split(
+            points, labels, test_size=0.2, random_state=42, stratify=labels
+        )
+        train_ds = make_landmark_dataset(X_train, y_train, batch_size=batch_size, training=True)
+        test_ds = make_landmark_dataset(X_test, y_test, batch_size=batch_size)
+        return self._fit_and_evaluate(train_ds, test_ds, y_test, len(y_train), epochs, save_path)
+    
+    def _fit_and_evaluate(self, train_ds, test_ds, y_test, num_train, epochs, save_path):
+        """Fit on train_ds, report on test_ds (which must yield samples in y_test order) and save plots/model."""
+        import tensorflow as tf
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        from sklearn.metrics import confusion_matrix, classification_report
+        from input_pipeline import PipelineStats
+
         # Train model
         print("Training model...")
         history = self.model.fit(
-            datagen.flow(X_train, y_train, batch_size=batch_size),
+            train_ds,
             epochs=epochs,
-            validation_data=(X_test, y_test),
+            validation_data=test_ds,
             callbacks=[
                 tf.keras.callbacks.EarlyStopping(
                     monitor='val_accuracy', 
                     patience=5,
                     restore_best_weights=True
-                )
+                ),
+                PipelineStats(num_train)
             ]
         )
         
         # Evaluate model
         print("Evaluating model...")
-        test_loss, test_acc = self.model.evaluate(X_test, y_test)
+        test_loss, test_acc = self.model.evaluate(test_ds)
         print(f"Test accuracy: {test_acc:.4f}")
         
         # Generate classification report
-        y_pred = np.argmax(self.model.predict(X_test), axis=1)
+        y_pred = np.argmax(self.model.predict(test_ds), axis=1)
         print("\nClassification Report:")
         report = classification_report(y_test, y_pred, target_names=self.class_names)
         print(report)
@@ -170,8 +230,22 @@ class ASLRecognizer:
         
         return history
     
-    def load_model(self, model_path):
-        """Load a pre-trained model"""
+    def load_model(self, model_path, use_cache=True):
+        """
+        Load a pre-trained model.
+        By default the .h5 is compiled once into a memory-mapped cache file next to it
+        (see model_cache.py) and later loads reuse that file instead of rebuilding the Keras graph.
+        """
+        if use_cache:
+            compiled = model_cache.load_or_compile(model_path)
+            if compiled is not None:
+                self.model = compiled
+                self.class_names = list(compiled.class_names)
+                print(f"Model loaded from cache {compiled.path} ({len(self.class_names)} class names)")
+                return
+
+        from tensorflow.keras import models
+
         self.model = models.load_model(model_path)
         print(f"Model loaded from {model_path}")
         
@@ -235,6 +309,30 @@ class ASLRecognizer:
         top_k_list = [(self.class_names[idx], float(predictions[idx])) for idx in top_k_indices]
         return top_k_list
     
+    def predict_top_k_batch(self, images, k=3):
+        """
+        predict_top_k for several images in one model call.
+        images: sequence of (64, 64) grayscale (or BGR) images. Returns one top-k list per image.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded or trained")
+        
+        if len(self.class_names) == 0:
+            raise ValueError("Class names not available")
+        
+        batch = np.empty((len(images), 64, 64, 1), dtype=np.float64)
+        for i, image in enumerate(images):
+            # Same preprocessing as predict_top_k
+            processed_img = cv2.resize(image, (64, 64))
+            if len(processed_img.shape) == 3:
+                processed_img = cv2.cvtColor(processed_img, cv2.COLOR_BGR2GRAY)
+            batch[i, :, :, 0] = processed_img / 255.0
+        
+        predictions = self.model.predict(batch, verbose=0)
+        top_k_indices = np.argsort(predictions, axis=1)[:, -k:][:, ::-1]
+        return [[(self.class_names[idx], float(row[idx])) for idx in indices]
+                for row, indices in zip(predictions, top_k_indices)]
+    
     def save_class_names(self, save_dir):
         """Save class names to a file"""
         if not os.path.exists(save_dir):
@@ -0,0 +1,100 @@
+"""
+Throughput comparison of the augmentation paths used for training.
+
+    image-generator  the original ImageDataGenerator.flow over pre-rendered float images
+    image-layers     in-pipeline Keras preprocessing layers on uint8 images (input_pipeline.make_array_dataset)
+    landmarks        landmark-space affine + jitter, then batch rasterisation (landmark_augment.py)
+
+Every path starts from the same hands, so the numbers only differ in how augmentation is done.
+
+    python bench_augmentation.py --landmarks landmarks/ --batches 100
+    python bench_augmentation.py            # synthetic hands if no landmark set is available
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from landmark_augment import render_wireframes, wireframe_batches
+
+
+def synthetic_hands(n, seed=0):
+    """Random but hand-shaped landmark sets: a fixed open-hand template plus noise and placement."""
+    template = np.array([
+        [0.50, 0.80], [0.42, 0.74], [0.37, 0.66], [0.33, 0.59], [0.30, 0.53],
+        [0.44, 0.55], [0.43, 0.45], [0.43, 0.39], [0.43, 0.33],
+        [0.50, 0.54], [0.50, 0.43], [0.50, 0.36], [0.50, 0.30],
+        [0.56, 0.55], [0.57, 0.45], [0.57, 0.39], [0.57, 0.34],
+        [0.62, 0.58], [0.64, 0.51], [0.65, 0.46], [0.66, 0.42],
+    ], dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    hands = template[None] + rng.normal(0, 0.02, (n, 21, 2))
+    hands += rng.uniform(-0.15, 0.15, (n, 1, 2))
+    return np.clip(hands, 0, 1).astype(np.float32), rng.integers(0, 24, n).astype(np.int32)
+
+
+def _timed(name, batches, batch_size, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = batches * batch_size / max(elapsed, 1e-9)
+    print(f"{name:16s} {rate:10.1f} samples/s  ({elapsed * 1000 / batches:.2f} ms/batch)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare augmentation throughput")
+    parser.add_argument("--landmarks", help="Directory written by extract_landmarks.py (default: synthetic hands)")
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    n = args.batches * args.batch_size
+    if args.landmarks:
+        from extract_landmarks import load_landmarks
+
+        store = load_landmarks(args.landmarks)
+        points = store['landmarks'][store['detected']][:, :, :2]
+        points = np.resize(points, (n, 21, 2))
+        labels = np.zeros(n, dtype=np.int32)
+    else:
+        points, labels = synthetic_hands(n)
+
+    # Pre-rendered images for the pixel-space paths (rendering cost not counted against them)
+    images = render_wireframes(points)
+    print(f"{n} samples, batch size {args.batch_size}")
+
+    results = {}
+
+    import tensorflow as tf
+    from input_pipeline import make_array_dataset
+
+    generator_cls = getattr(getattr(tf.keras, 'preprocessing', None), 'image', None)
+    generator_cls = getattr(generator_cls, 'ImageDataGenerator', None)
+    if generator_cls is not None:
+        datagen = generator_cls(rotation_range=10, zoom_range=0.1, width_shift_range=0.1, height_shift_range=0.1)
+        flow = datagen.flow(images[..., None] / 255.0, labels, batch_size=args.batch_size, shuffle=True)
+
+        def run_generator():
+            for _ in range(args.batches):
+                next(flow)
+        results['image-generator'] = _timed('image-generator', args.batches, args.batch_size, run_generator)
+    else:
+        print("image-generator  skipped (ImageDataGenerator not available in this Keras)")
+
+    ds = make_array_dataset(images, labels, batch_size=args.batch_size, training=True, augment=True)
+    results['image-layers'] = _timed('image-layers', args.batches, args.batch_size,
+                                     lambda: [None for _ in ds])
+
+    rng = np.random.default_rng(0)
+    results['landmarks'] = _timed('landmarks', args.batches, args.batch_size,
+                                  lambda: [None for _ in wireframe_batches(points, labels, args.batch_size, rng=rng)])
+
+    baseline = results.get('image-generator', results['image-layers'])
+    print(f"landmark path speed-up vs {'image-generator' if 'image-generator' in results else 'image-layers'}: "
+          f"{results['landmarks'] / baseline:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-frame cost of the server's detector path with and without headless mode.
+
+Runs what SignLanguageModel.predict does for one frame -- findHands, findPosition,
+wireframe + CNN top-3 -- once with the old annotated setup (frame.copy(), landmarks
+drawn, top-3 labels put on the image) and once with handDetector(headless=True).
+
+MediaPipe's own inference is the same in both modes, so by default it is replaced
+by a fixed hand (the detector's Hands graph returns the same result every frame)
+and only the work that differs is timed. --mediapipe times the full path on
+random frames instead, for scale.
+
+    python bench_headless.py --model models/asl_model.h5 --frames 500
+"""
+
+import argparse
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from bench_augmentation import synthetic_hands
+from main import handDetector
+
+
+class FixedHands:
+    """Stands in for mp.solutions.hands.Hands: always reports the same single hand."""
+
+    def __init__(self, points):
+        hand = landmark_pb2.NormalizedLandmarkList(
+            landmark=[landmark_pb2.NormalizedLandmark(x=float(x), y=float(y), z=0.0) for x, y in points])
+        self.result = SimpleNamespace(multi_hand_landmarks=[hand])
+
+    def process(self, img):
+        return self.result
+
+    def close(self):
+        pass
+
+
+def make_detector(headless, model_path, fixed_points):
+    detector = handDetector(detectionCon=0.5, use_asl=False, headless=headless)
+    if model_path:
+        # Same fallback as app.py: load the recognizer explicitly
+        from asl_recognition import ASLRecognizer
+
+        detector.asl_recognizer = ASLRecognizer(model_path)
+        detector.use_asl = True
+    if fixed_points is not None:
+        detector.hands.close()
+        detector.hands = FixedHands(fixed_points)
+    return detector
+
+
+def run(name, detector, frames, copy):
+    # One warm-up frame (model load, first-call allocations)
+    detector.findPosition(detector.findHands(frames[0].copy()), draw=False)
+    start = time.perf_counter()
+    for frame in frames:
+        img = detector.findHands(frame.copy() if copy else frame)
+        detector.findPosition(img, draw=False)
+        detector.get_asl_top3()
+    per_frame = (time.perf_counter() - start) * 1000 / len(frames)
+    print(f"{name:10s} {per_frame:7.3f} ms/frame")
+    return per_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare annotated and headless detector cost per frame")
+    parser.add_argument("--model", default=os.path.join("models", "asl_model.h5"),
+                        help="ASL model for the top-3 path (skipped if missing)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--mediapipe", action="store_true",
+                        help="Run real MediaPipe on random frames instead of a fixed hand")
+    args = parser.parse_args()
+
+    model_path = args.model if os.path.exists(args.model) else None
+    if model_path is None:
+        print(f"No model at {args.model}; timing without the CNN top-3")
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8) for _ in range(args.frames)]
+    fixed_points = None if args.mediapipe else synthetic_hands(1)[0][0]
+
+    annotated = run('annotated', make_detector(False, model_path, fixed_points), frames, copy=True)
+    headless = run('headless', make_detector(True, model_path, fixed_points), frames, copy=False)
+    print(f"saved {annotated - headless:.3f} ms/frame ({(1 - headless / annotated) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Listing of the wireframe image dataset, shared by the training pipeline and the packer.
+
+Kept apart from input_pipeline.py so packed_dataset.py can walk the dataset folders
+without importing TensorFlow.
+"""
+
+import os
+
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def list_dataset_files(dataset_path):
+    """
+    Walk the dataset folders once.
+    Returns (paths, labels, class_names); flipped folders share their letter's label.
+    """
+    class_names = sorted(c for c in os.listdir(dataset_path) if c.isalpha() and len(c) == 1)
+    paths = []
+    labels = []
+    for idx, class_name in enumerate(class_names):
+        for suffix in ['', '_flipped']:
+            class_path = os.path.join(dataset_path, f"{class_name}{suffix}")
+            if not os.path.isdir(class_path):
+                continue
+            with os.scandir(class_path) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        paths.append(entry.path)
+                        labels.append(idx)
+    return paths, np.array(labels, dtype=np.int32), class_names
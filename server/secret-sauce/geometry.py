@@ -0,0 +1,146 @@
+"""
+Geometry-based letter recognition from hand landmarks.
+
+These are the hand-written finger-position rules from main.py, kept apart from the
+detector so they can be called on any landmark list without touching detector state.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Landmarks of the index, middle, ring and little fingers, as in main.py
+FINGER_DIP = (6, 10, 14, 18)
+FINGER_PIP = (7, 11, 15, 19)
+FINGER_TIP = (8, 12, 16, 20)
+
+
+def pixel_columns(lmList):
+    """Pixel x and y of the landmarks as two lists, from an lmList, HandLandmarks or (21, 3) array."""
+    if hasattr(lmList, 'columns'):
+        return lmList.columns()
+    if hasattr(lmList, 'tolist'):
+        return lmList[:, 1:].T.tolist()
+    _, x, y = zip(*lmList)
+    return x, y
+
+
+def finger_states(x, y):
+    """
+    main.py's per-finger values (0.25, 0, 1 or 0.5, the first pattern that matches) for
+    pixel columns x, y of the 21 landmarks. A finger that matches no pattern is left out,
+    as in main.py's fingers list.
+    """
+    fingers = []
+    for tip, dip, pip in zip(FINGER_TIP, FINGER_DIP, FINGER_PIP):
+        if x[tip] + 25 < x[dip] and y[16] < y[20]:
+            fingers.append(0.25)
+        elif y[tip] > y[dip]:
+            fingers.append(0)
+        elif y[tip] < y[pip]:
+            fingers.append(1)
+        elif x[tip] > x[pip] and x[tip] > x[dip]:
+            fingers.append(0.5)
+    return fingers
+
+
+def geometry_letter(lmList):
+    """
+    Letter guessed from landmark geometry, or None.
+    lmList: 21 [id, x, y] pixel entries as returned by handDetector.findPosition, or a
+    HandLandmarks / (21, 3) array of them. The rules read the x and y pixel columns, taken
+    out of the array in one conversion: on 21 landmarks, single comparisons on Python ints
+    are quicker than NumPy calls.
+    """
+    try:
+        # If no landmarks are detected, return None
+        if lmList is None or len(lmList) < 21:
+            return None
+        x, y = pixel_columns(lmList)
+        fingers = finger_states(x, y)
+        
+        # Check for each letter pattern using EXACT conditions from main.py
+        result = ""
+        # Check for each letter pattern using EXACT conditions from main.py
+        result = ""
+        if(y[3] > y[4]) and (x[3] > x[6])and (y[4] < y[6]) and fingers.count(0) == 4:
+            result = "A"
+            
+        elif(x[3] > x[4]) and fingers.count(1) == 4:
+            result = "B"
+        
+        elif(x[3] > x[6]) and fingers.count(0.5) >= 1 and (y[4]> y[8]):
+            result = "C"
+            
+        elif(fingers[0]==1) and fingers.count(0) == 3 and (x[3] > x[4]):
+            result = "D"
+        
+        elif (x[3] < x[6]) and fingers.count(0) == 4 and y[12]<y[4]:
+            result = "E"
+
+        elif (fingers.count(1) == 3) and (fingers[0]==0) and (y[3] > y[4]):
+            result = "F"
+
+        elif(fingers[0]==0.25) and fingers.count(0) == 3:
+            result = "G"
+
+        elif(fingers[0]==0.25) and(fingers[1]==0.25) and fingers.count(0) == 2:
+            result = "H"
+        
+        elif (x[4] < x[6]) and fingers.count(0) == 3:
+            if (len(fingers)==4 and fingers[3] == 1):
+                result = "I"
+        
+        elif (x[4] < x[6] and x[4] > x[10] and fingers.count(1) == 2):
+            result = "K"
+            
+        elif(fingers[0]==1) and fingers.count(0) == 3 and (x[3] < x[4]):
+            result = "L"
+        
+        elif (x[4] < x[16]) and fingers.count(0) == 4:
+            result = "M"
+        
+        elif (x[4] < x[12]) and fingers.count(0) == 4:
+            result = "N"
+            
+        elif (x[4] > x[12]) and y[4]<y[6] and fingers.count(0) == 4:
+            result = "T"
+
+        elif (x[4] > x[12]) and y[4]<y[12] and fingers.count(0) == 4:
+            result = "S"
+            
+        elif(y[4] < y[8]) and (y[4] < y[12]) and (y[4] < y[16]) and (y[4] < y[20]):
+            result = "O"
+        
+        elif(fingers[2] == 0) and (y[4] < y[12]) and (y[4] > y[6]):
+            if (len(fingers)==4 and fingers[3] == 0):
+                result = "P"
+        
+        elif(fingers[1] == 0) and (fingers[2] == 0) and (fingers[3] == 0) and (y[8] > y[5]) and (y[4] < y[1]):
+            result = "Q"
+            
+        elif(x[8] < x[12]) and (fingers.count(1) == 2) and (x[9] > x[4]):
+            result = "R"
+            
+        elif (x[4] < x[6] and x[4] < x[10] and fingers.count(1) == 2 and y[3] > y[4] and (x[8] - x[11]) <= 50):
+            result = "U"
+            
+        elif (x[4] < x[6] and x[4] < x[10] and fingers.count(1) == 2 and y[3] > y[4]):
+            result = "V"
+        
+        elif (x[4] < x[6] and x[4] < x[10] and fingers.count(1) == 3):
+            result = "W"
+        
+        elif (fingers[0] == 0.5 and fingers.count(0) == 3 and x[4] > x[6]):
+            result = "X"
+        
+        elif(fingers.count(0) == 3) and (x[3] < x[4]):
+            if (len(fingers)==4 and fingers[3] == 1):
+                result = "Y"
+        
+        return result if result else None
+        
+    except Exception as e:
+        logger.error(f"Error in geometry prediction: {e}")
+        return None
+
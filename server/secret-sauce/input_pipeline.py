@@ -0,0 +1,205 @@
+"""
+Streaming tf.data input pipeline for training the ASL wireframe CNN.
+
+ASLRecognizer.load_data reads every image serially, converts it to float64 and
+keeps the whole corpus in a Python list. The pipeline here instead:
+
+- lists the dataset folders once (including the *_flipped folders),
+- reads, decodes and resizes files in parallel,
+- keeps samples as uint8 until the batch is handed to the model,
+- caches the decoded tensors to disk during the first epoch,
+- runs the rotation / zoom / shift augmentation inside the pipeline,
+- prefetches batches so input work overlaps with training.
+
+Run it directly to measure input throughput without training:
+
+    python input_pipeline.py src/aslwireframemodified --epochs 2
+"""
+
+import argparse
+import hashlib
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from dataset_files import list_dataset_files
+
+
+def cache_prefix(cache_dir, paths, img_size, name):
+    """
+    Cache file prefix for a list of files.
+    The name includes a fingerprint of the file list so a changed dataset never reads a stale cache.
+    """
+    digest = hashlib.sha1(str(img_size).encode())
+    for path in paths:
+        digest.update(path.encode())
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{name}-{img_size}-{digest.hexdigest()[:12]}")
+
+
+def build_augmenter(rotation_range=10, zoom_range=0.1, shift_range=0.1):
+    """Same augmentation as the old ImageDataGenerator setup, as Keras preprocessing layers."""
+    return tf.keras.Sequential([
+        tf.keras.layers.RandomRotation(rotation_range / 360.0, fill_mode='nearest'),
+        tf.keras.layers.RandomZoom(zoom_range, fill_mode='nearest'),
+        tf.keras.layers.RandomTranslation(shift_range, shift_range, fill_mode='nearest'),
+    ])
+
+
+def _decode(img_size):
+    def decode(path, label):
+        img = tf.io.decode_image(tf.io.read_file(path), channels=1, expand_animations=False)
+        img = tf.image.resize(img, (img_size, img_size))
+        # Back to uint8 straight away: 1 byte per pixel in the cache and shuffle buffer
+        return tf.saturate_cast(tf.round(img), tf.uint8), label
+    return decode
+
+
+def make_dataset(paths, labels, batch_size=32, img_size=64, training=False, augment=False,
+                 cache_path=None, shuffle_seed=None):
+    """
+    Build a batched tf.data.Dataset of (float32 images in [0, 1], int labels).
+    If cache_path is given, decoded samples are written there on the first pass and read back afterwards.
+    """
+    ds = tf.data.Dataset.from_tensor_slices((list(paths), np.asarray(labels, dtype=np.int32)))
+    ds = ds.map(_decode(img_size), num_parallel_calls=tf.data.AUTOTUNE, deterministic=not training)
+    if cache_path:
+        ds = ds.cache(cache_path)
+    if training:
+        ds = ds.shuffle(len(paths), seed=shuffle_seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size, num_parallel_calls=tf.data.AUTOTUNE)
+    return _to_model_input(ds, augment)
+
+
+def make_array_dataset(images, labels, batch_size=32, training=False, augment=False, shuffle_seed=None):
+    """
+    Build the same batched dataset from uint8 arrays, e.g. slices of a PackedDataset memory map.
+    Batches are gathered straight from the arrays, so only the current batch is ever resident.
+    """
+    n = len(labels)
+    img_size = images.shape[1]
+    rng = np.random.default_rng(shuffle_seed)
+
+    def batches():
+        order = rng.permutation(n) if training else None
+        for start in range(0, n, batch_size):
+            if order is None:
+                rows = slice(start, start + batch_size)
+            else:
+                # Sorted indices keep the gather sequential within the memory map
+                rows = np.sort(order[start:start + batch_size])
+            yield images[rows][..., np.newaxis], np.asarray(labels[rows], dtype=np.int32)
+
+    ds = tf.data.Dataset.from_generator(
+        batches,
+        output_signature=(
+            tf.TensorSpec(shape=(None, img_size, img_size, 1), dtype=tf.uint8),
+            tf.TensorSpec(shape=(None,), dtype=tf.int32),
+        ),
+    )
+    return _to_model_input(ds, augment)
+
+
+def make_landmark_dataset(points, labels, batch_size=32, training=False, shuffle_seed=None):
+    """
+    Build batches by rendering wireframes from (N, 21, 2) normalised landmarks.
+    When training, augmentation is done on the landmarks before rasterising (see landmark_augment.py)
+    instead of on the rendered pixels.
+    """
+    from landmark_augment import wireframe_batches
+
+    rng = np.random.default_rng(shuffle_seed)
+    ds = tf.data.Dataset.from_generator(
+        lambda: wireframe_batches(points, labels, batch_size=batch_size, augment=training,
+                                  shuffle=training, rng=rng),
+        output_signature=(
+            tf.TensorSpec(shape=(None, 64, 64, 1), dtype=tf.uint8),
+            tf.TensorSpec(shape=(None,), dtype=tf.int32),
+        ),
+    )
+    return _to_model_input(ds, augment=False)
+
+
+def _to_model_input(ds, augment):
+    # Model boundary: convert to float only once per batch
+    ds = ds.map(lambda x, y: (tf.cast(x, tf.float32) * (1.0 / 255.0), y),
+                num_parallel_calls=tf.data.AUTOTUNE)
+    if augment:
+        augmenter = build_augmenter()
+        ds = ds.map(lambda x, y: (augmenter(x, training=True), y), num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def peak_memory_mb():
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class PipelineStats(tf.keras.callbacks.Callback):
+    """Print samples per second and peak memory at the end of every epoch."""
+
+    def __init__(self, num_samples):
+        super().__init__()
+        self.num_samples = num_samples
+        self.epoch_start = None
+        self.history = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self.epoch_start
+        samples_per_sec = self.num_samples / max(elapsed, 1e-9)
+        self.history.append({'epoch': epoch, 'samples_per_sec': samples_per_sec, 'peak_mb': peak_memory_mb()})
+        print(f"Epoch {epoch + 1}: {samples_per_sec:.1f} samples/s, peak memory {peak_memory_mb():.0f} MB")
+
+
+def benchmark(ds, num_samples, epochs=2):
+    """Iterate a dataset without a model and report input throughput per epoch."""
+    results = []
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        for _ in ds:
+            pass
+        elapsed = time.perf_counter() - start
+        results.append(num_samples / max(elapsed, 1e-9))
+        print(f"Epoch {epoch + 1}: {results[-1]:.1f} samples/s, peak memory {peak_memory_mb():.0f} MB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tf.data input pipeline throughput")
+    parser.add_argument("dataset_path", help="Image-folder dataset or a directory made by packed_dataset.py")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--cache-dir", default=None, help="Where to cache decoded samples (default: <dataset>/.tfcache)")
+    parser.add_argument("--no-augment", action="store_true")
+    args = parser.parse_args()
+
+    from packed_dataset import PackedDataset, is_packed
+
+    if is_packed(args.dataset_path):
+        images, labels = PackedDataset(args.dataset_path).split('all')
+        print(f"Opened packed dataset with {len(labels)} images")
+        ds = make_array_dataset(images, labels, batch_size=args.batch_size, training=True,
+                                augment=not args.no_augment)
+        benchmark(ds, len(labels), epochs=args.epochs)
+        return
+
+    paths, labels, class_names = list_dataset_files(args.dataset_path)
+    print(f"Found {len(paths)} images across {len(class_names)} classes")
+    cache_dir = args.cache_dir or os.path.join(args.dataset_path, '.tfcache')
+    ds = make_dataset(paths, labels, batch_size=args.batch_size, training=True,
+                      augment=not args.no_augment,
+                      cache_path=cache_prefix(cache_dir, paths, 64, 'benchmark'))
+    benchmark(ds, len(paths), epochs=args.epochs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Landmark-space augmentation and batch wireframe rasterisation.
+
+The CNN's inputs are wireframes rendered from the 21 MediaPipe landmarks, so
+the rotation / zoom / shift augmentation that used to be applied to every
+pixel of every image can be applied to the landmarks instead: a 2x3 affine per
+sample on a (21, 2) array, followed by drawing the wireframe. Mirroring the
+x axis replaces the *_flipped folders, and a small per-joint jitter adds the
+kind of noise MediaPipe produces frame to frame.
+
+draw_wireframe() is the renderer used at inference time by
+handDetector._extract_wireframe, so training and serving draw identical images.
+"""
+
+import cv2
+import numpy as np
+
+# Same edges as mediapipe.solutions.hands.HAND_CONNECTIONS
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def draw_wireframe(points, img_size=256):
+    """
+    Draw one hand on a black (img_size x img_size) canvas.
+    points: (21, 2) normalised x, y in [0, 1] image coordinates.
+    """
+    wireframe = np.zeros((img_size, img_size), dtype=np.uint8)
+    # int() truncation, as in the original per-landmark loop
+    pixels = np.trunc(np.asarray(points, dtype=np.float64)[:, :2] * (img_size - 1)).astype(np.int32)
+    pts = [tuple(p) for p in pixels.tolist()]
+
+    for start_idx, end_idx in HAND_CONNECTIONS:
+        cv2.line(wireframe, pts[start_idx], pts[end_idx], (255), 2)
+    for p in pts:
+        cv2.circle(wireframe, p, 4, (255), cv2.FILLED)
+    return wireframe
+
+
+def render_wireframes(points, img_size=256, out_size=64, out=None):
+    """
+    Rasterise a batch of hands to the CNN input size.
+    points: (N, 21, 2) normalised coordinates. Returns (N, out_size, out_size) uint8.
+    """
+    points = np.asarray(points)
+    if out is None:
+        out = np.empty((len(points), out_size, out_size), dtype=np.uint8)
+    for i, hand in enumerate(points):
+        out[i] = cv2.resize(draw_wireframe(hand, img_size), (out_size, out_size), interpolation=cv2.INTER_AREA)
+    return out
+
+
+def augment_landmarks(points, rng, rotation_range=10, zoom_range=0.1, shift_range=0.1,
+                      mirror_prob=0.5, jitter_std=0.003):
+    """
+    Randomly transform a batch of normalised landmarks.
+    points: (N, 21, 2). Rotation (degrees) and zoom are about the image centre, shift is a
+    fraction of the image size, mirroring flips x. Returns a new (N, 21, 2) float32 array.
+    """
+    points = np.asarray(points, dtype=np.float32)[..., :2]
+    n = len(points)
+
+    theta = np.deg2rad(rng.uniform(-rotation_range, rotation_range, n))
+    scale = rng.uniform(1 - zoom_range, 1 + zoom_range, n)
+    shift = rng.uniform(-shift_range, shift_range, (n, 2))
+    mirror = np.where(rng.random(n) < mirror_prob, -1.0, 1.0)
+
+    cos, sin = np.cos(theta) * scale, np.sin(theta) * scale
+    # (N, 2, 2) linear part; the mirror flips x before rotating
+    linear = np.stack([
+        np.stack([cos * mirror, -sin], axis=-1),
+        np.stack([sin * mirror, cos], axis=-1),
+    ], axis=1).astype(np.float32)
+
+    centred = points - 0.5
+    out = np.einsum('nij,nkj->nki', linear, centred) + 0.5 + shift[:, None, :]
+    if jitter_std:
+        out += rng.normal(0, jitter_std, out.shape)
+    return out.astype(np.float32)
+
+
+def wireframe_batches(points, labels, batch_size=32, augment=True, shuffle=True, rng=None, **augment_kwargs):
+    """
+    Yield (uint8 images (B, 64, 64, 1), labels) batches rendered from landmarks, one pass over the data.
+    Call again (with the same rng) for another epoch.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    n = len(labels)
+    order = rng.permutation(n) if shuffle else np.arange(n)
+    for start in range(0, n, batch_size):
+        rows = order[start:start + batch_size]
+        batch = points[rows, :, :2]
+        if augment:
+            batch = augment_landmarks(batch, rng, **augment_kwargs)
+        yield render_wireframes(batch)[..., np.newaxis], np.asarray(labels[rows], dtype=np.int32)
@@ -0,0 +1,277 @@
+"""
+Compiled artifact cache for the ASL wireframe CNN.
+
+Loading asl_model.h5 through Keras means importing TensorFlow, parsing HDF5
+and rebuilding the graph on every process start. This module freezes the
+trained network into a single flat file that sits next to the .h5:
+
+    [ magic (8 bytes) | header length (uint32) | JSON header | padding | weights ]
+
+The JSON header holds the SHA-256 of the source artifacts (.h5 + class_names.txt),
+the class names, the input spec and, for every layer, the offset and shape of
+its float32 tensors. Each tensor starts on a 64-byte boundary, so the file is
+opened with a read-only np.memmap and the weights are used in place: several
+worker processes loading the same cache share the same physical pages through
+the OS page cache.
+
+The forward pass is plain NumPy and supports the layers used by
+ASLRecognizer.build_model (Conv2D, MaxPooling2D, Flatten, Dropout, Dense).
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MAGIC = b"ASLCNN\x00\x01"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+SUPPORTED_LAYERS = ("InputLayer", "Conv2D", "MaxPooling2D", "Flatten", "Dropout", "Dense")
+SUPPORTED_ACTIVATIONS = (None, "linear", "relu", "softmax")
+
+
+def cache_path_for(model_path):
+    """Return the cache file path used for a given .h5 model."""
+    return os.path.splitext(model_path)[0] + ".cache"
+
+
+def source_hash(model_path, class_names_path=None):
+    """SHA-256 over the model file and (if present) its class names file."""
+    digest = hashlib.sha256()
+    for path in (model_path, class_names_path):
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def compile_model(keras_model, class_names, src_hash, out_path):
+    """
+    Freeze a Keras Sequential model into a cache file.
+    Raises NotImplementedError if the model uses a layer or activation the NumPy runtime can't execute.
+    """
+    layer_specs = []
+    tensors = []
+    for layer in keras_model.layers:
+        kind = layer.__class__.__name__
+        if kind not in SUPPORTED_LAYERS:
+            raise NotImplementedError(f"Layer type {kind} is not supported by the compiled cache")
+        config = layer.get_config()
+        if (config.get("data_format") or "channels_last") != "channels_last":
+            raise NotImplementedError("Only channels_last models can be compiled")
+
+        activation = config.get("activation", "linear")
+        if activation not in SUPPORTED_ACTIVATIONS:
+            raise NotImplementedError(f"Activation {activation} is not supported by the compiled cache")
+        spec = {"type": kind, "activation": activation, "weights": []}
+        if kind == "Conv2D":
+            spec["strides"] = list(config.get("strides", (1, 1)))
+            spec["padding"] = config.get("padding", "valid")
+            if tuple(config.get("dilation_rate", (1, 1))) != (1, 1):
+                raise NotImplementedError("Dilated convolutions are not supported")
+        elif kind == "MaxPooling2D":
+            pool_size = list(config.get("pool_size", (2, 2)))
+            strides = list(config.get("strides") or pool_size)
+            if strides != pool_size or config.get("padding", "valid") != "valid":
+                raise NotImplementedError("Only non-overlapping 'valid' max pooling is supported")
+            spec["pool_size"] = pool_size
+
+        for weight in layer.get_weights():
+            tensors.append(np.ascontiguousarray(weight, dtype=np.float32))
+            spec["weights"].append({"shape": list(weight.shape)})
+        layer_specs.append(spec)
+
+    input_shape = [int(d) for d in keras_model.input_shape[1:]]
+    header = {
+        "format": FORMAT_VERSION,
+        "source_sha256": src_hash,
+        "class_names": list(class_names),
+        "input": {"shape": input_shape, "dtype": "float32", "scale": 1.0 / 255.0},
+        "layers": layer_specs,
+    }
+
+    # Offsets depend on the header size, and the header contains the offsets,
+    # so lay the weights out relative to a data section that starts aligned.
+    offset = 0
+    flat_specs = [w for spec in layer_specs for w in spec["weights"]]
+    for weight_spec, tensor in zip(flat_specs, tensors):
+        offset = _align(offset)
+        weight_spec["offset"] = offset
+        offset += tensor.nbytes
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    # Write to a temporary file and rename so readers never see a partial cache
+    tmp_path = f"{out_path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for weight_spec, tensor in zip(flat_specs, tensors):
+            f.seek(data_start + weight_spec["offset"])
+            f.write(tensor.tobytes())
+        f.truncate(data_start + _align(offset))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def read_header(path):
+    """Return (header dict, data section start) for a cache file, or (None, None) if it isn't one."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None, None
+        length = f.read(4)
+        if len(length) < 4:
+            return None, None
+        (header_len,) = struct.unpack("<I", length)
+        try:
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        except ValueError:
+            # Truncated or corrupt header
+            return None, None
+    if not isinstance(header, dict) or header.get("format") != FORMAT_VERSION:
+        return None, None
+    return header, _align(len(MAGIC) + 4 + header_len)
+
+
+class CompiledModel:
+    """
+    Inference-only view of a compiled cache file.
+    Exposes predict() with the same call shape ASLRecognizer uses on Keras models.
+    """
+
+    def __init__(self, path):
+        header, data_start = read_header(path)
+        if header is None:
+            raise ValueError(f"{path} is not a compiled ASL model cache")
+        self.path = path
+        self.source_hash = header["source_sha256"]
+        self.class_names = header["class_names"]
+        self.input_spec = header["input"]
+        self.input_shape = (None,) + tuple(self.input_spec["shape"])
+
+        # Read-only mapping: pages are shared between every process using this file
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        self.layers = []
+        for spec in header["layers"]:
+            weights = []
+            for weight_spec in spec["weights"]:
+                start = data_start + weight_spec["offset"]
+                count = int(np.prod(weight_spec["shape"]))
+                weights.append(
+                    self._buffer[start:start + count * 4].view(np.float32).reshape(weight_spec["shape"])
+                )
+            self.layers.append((spec, weights))
+
+    @property
+    def nbytes(self):
+        return self._buffer.nbytes
+
+    def predict(self, x, batch_size=None, verbose=0):
+        """Run the forward pass on a float batch shaped like the model input."""
+        x = np.asarray(x, dtype=np.float32)
+        for spec, weights in self.layers:
+            kind = spec["type"]
+            if kind == "Conv2D":
+                x = _conv2d(x, weights[0], weights[1] if len(weights) > 1 else None,
+                            spec["strides"], spec["padding"])
+            elif kind == "MaxPooling2D":
+                x = _max_pool(x, spec["pool_size"])
+            elif kind == "Flatten":
+                x = x.reshape(x.shape[0], -1)
+            elif kind == "Dense":
+                x = x @ weights[0]
+                if len(weights) > 1:
+                    x = x + weights[1]
+            # InputLayer and Dropout are identity at inference time
+            x = _activate(x, spec.get("activation", "linear"))
+        return x
+
+    __call__ = predict
+
+
+def _conv2d(x, kernel, bias, strides, padding):
+    kh, kw = kernel.shape[:2]
+    if padding == "same":
+        pad_h, pad_w = kh - 1, kw - 1
+        x = np.pad(x, ((0, 0), (pad_h // 2, pad_h - pad_h // 2), (pad_w // 2, pad_w - pad_w // 2), (0, 0)))
+    # (N, H', W', C, kh, kw) view over the input, no copy
+    windows = sliding_window_view(x, (kh, kw), axis=(1, 2))
+    if strides[0] != 1 or strides[1] != 1:
+        windows = windows[:, ::strides[0], ::strides[1]]
+    out = np.tensordot(windows, kernel.transpose(2, 0, 1, 3), axes=([3, 4, 5], [0, 1, 2]))
+    if bias is not None:
+        out += bias
+    return out
+
+
+def _max_pool(x, pool_size):
+    ph, pw = pool_size
+    n, h, w, c = x.shape
+    h, w = h // ph * ph, w // pw * pw
+    return x[:, :h, :w].reshape(n, h // ph, ph, w // pw, pw, c).max(axis=(2, 4))
+
+
+def _activate(x, activation):
+    if activation == "relu":
+        return np.maximum(x, 0)
+    if activation == "softmax":
+        e = np.exp(x - x.max(axis=-1, keepdims=True))
+        return e / e.sum(axis=-1, keepdims=True)
+    if activation in (None, "linear"):
+        return x
+    raise NotImplementedError(f"Activation {activation} is not supported")
+
+
+def is_fresh(model_path, class_names_path=None):
+    """True if model_path has a cache built from the current .h5 and class names (no TensorFlow needed)."""
+    if class_names_path is None:
+        class_names_path = os.path.join(os.path.dirname(model_path), "class_names.txt")
+    cache_path = cache_path_for(model_path)
+    if not os.path.exists(cache_path) or not os.path.exists(model_path):
+        return False
+    header, _ = read_header(cache_path)
+    return header is not None and header.get("source_sha256") == source_hash(model_path, class_names_path)
+
+
+def load_or_compile(model_path, class_names_path=None):
+    """
+    Return a CompiledModel for model_path, building the cache on first use.
+    Returns None if the cache can't be produced (e.g. unsupported layers), so the
+    caller can fall back to loading the .h5 with Keras.
+    """
+    if class_names_path is None:
+        class_names_path = os.path.join(os.path.dirname(model_path), "class_names.txt")
+    cache_path = cache_path_for(model_path)
+    if is_fresh(model_path, class_names_path):
+        try:
+            return CompiledModel(cache_path)
+        except ValueError as e:
+            # Weights cut short (e.g. a partial copy): build the cache again
+            print(f"Ignoring unreadable model cache {cache_path}: {e}")
+    src_hash = source_hash(model_path, class_names_path)
+
+    # Cache missing or stale: parse the .h5 once and write a fresh one
+    try:
+        from tensorflow.keras import models
+
+        keras_model = models.load_model(model_path)
+        class_names = []
+        if os.path.exists(class_names_path):
+            with open(class_names_path, "r") as f:
+                class_names = [line.strip() for line in f.readlines()]
+        compile_model(keras_model, class_names, src_hash, cache_path)
+        print(f"Compiled model cache written to {cache_path}")
+    except (NotImplementedError, OSError, ImportError, ValueError) as e:
+        print(f"Could not build compiled model cache: {e}")
+        return None
+    return CompiledModel(cache_path)
@@ -0,0 +1,173 @@
+"""
+Packed, memory-mapped copy of the wireframe dataset.
+
+The aslwireframemodified corpus is thousands of small PNGs across the X and
+X_flipped folders, and every training run pays for directory walks and PNG
+decoding again. pack() converts it once into a directory holding:
+
+    images.u8    raw uint8 array of shape (N, img_size, img_size), C order
+    labels.npy   int32 label per sample
+    paths.txt    source file of each sample, one per line
+    split.npz    train_idx / test_idx arrays
+    meta.json    shape, class names and split sizes
+
+Samples are written train split first, then test split, so both splits are
+contiguous ranges of images.u8 and PackedDataset.split() returns plain slices
+of the memory map (no copy, nothing read until it's touched).
+
+    python packed_dataset.py src/aslwireframemodified src/aslwireframe_packed
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+IMAGES_FILE = 'images.u8'
+
+
+def is_packed(path):
+    """True if path is a directory produced by pack()."""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def _load_image(path, img_size):
+    img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return None
+    return cv2.resize(img, (img_size, img_size))
+
+
+def pack(dataset_path, out_dir, img_size=64, test_size=0.2, random_state=42, workers=None):
+    """Convert an image-folder dataset into the packed format. Returns a PackedDataset."""
+    from sklearn.model_selection import train_test_split
+    from dataset_files import list_dataset_files
+
+    paths, labels, class_names = list_dataset_files(dataset_path)
+    if not paths:
+        raise ValueError(f"No images found in {dataset_path}")
+    print(f"Packing {len(paths)} images across {len(class_names)} classes")
+
+    # Same stratified split as ASLRecognizer.train; stored order is train then test
+    indices = np.arange(len(paths))
+    train_idx, test_idx = train_test_split(
+        indices, test_size=test_size, random_state=random_state, stratify=labels
+    )
+    order = np.concatenate([train_idx, test_idx])
+
+    os.makedirs(out_dir, exist_ok=True)
+    images = np.memmap(os.path.join(out_dir, IMAGES_FILE), dtype=np.uint8, mode='w+',
+                       shape=(len(paths), img_size, img_size))
+
+    # cv2 releases the GIL while decoding, so threads are enough to decode in parallel
+    keep = np.ones(len(paths), dtype=bool)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        decoded = pool.map(lambda i: _load_image(paths[i], img_size), order)
+        for row, img in enumerate(decoded):
+            if img is None:
+                keep[row] = False
+                continue
+            images[row] = img
+    images.flush()
+    if not keep.any():
+        del images
+        os.remove(os.path.join(out_dir, IMAGES_FILE))
+        raise ValueError(f"None of the {len(paths)} images in {dataset_path} could be read")
+
+    num_train = int(keep[:len(train_idx)].sum())
+    if not keep.all():
+        # Drop unreadable files by compacting the rows that follow them
+        print(f"Skipped {int((~keep).sum())} unreadable images")
+        rows = np.flatnonzero(keep)
+        for dst, src in enumerate(rows):
+            if dst != src:
+                images[dst] = images[src]
+        images.flush()
+        order = order[keep]
+    del images
+    with open(os.path.join(out_dir, IMAGES_FILE), 'r+b') as f:
+        f.truncate(len(order) * img_size * img_size)
+
+    np.save(os.path.join(out_dir, 'labels.npy'), labels[order].astype(np.int32))
+    np.savez(os.path.join(out_dir, 'split.npz'),
+             train_idx=np.arange(num_train), test_idx=np.arange(num_train, len(order)))
+    with open(os.path.join(out_dir, 'paths.txt'), 'w') as f:
+        for i in order:
+            f.write(f"{paths[i]}\n")
+    with open(os.path.join(out_dir, META_FILE), 'w') as f:
+        json.dump({
+            'format': FORMAT_VERSION,
+            'shape': [len(order), img_size, img_size],
+            'dtype': 'uint8',
+            'class_names': class_names,
+            'num_train': num_train,
+            'num_test': len(order) - num_train,
+            'source': os.path.abspath(dataset_path),
+        }, f, indent=2)
+
+    print(f"Packed {len(order)} images into {out_dir} ({num_train} train / {len(order) - num_train} test)")
+    return PackedDataset(out_dir)
+
+
+class PackedDataset:
+    """Read-only view over a packed dataset directory."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE), 'r') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported packed dataset format in {path}")
+        self.path = path
+        self.class_names = self.meta['class_names']
+        self.num_train = self.meta['num_train']
+        self.images = np.memmap(os.path.join(path, IMAGES_FILE), dtype=np.uint8, mode='r',
+                                shape=tuple(self.meta['shape']))
+        self.labels = np.load(os.path.join(path, 'labels.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def img_size(self):
+        return self.images.shape[1]
+
+    def split(self, name):
+        """Return (images, labels) for 'train', 'test' or 'all' as zero-copy slices."""
+        if name == 'train':
+            rows = slice(0, self.num_train)
+        elif name == 'test':
+            rows = slice(self.num_train, len(self))
+        elif name == 'all':
+            rows = slice(0, len(self))
+        else:
+            raise ValueError(f"Unknown split {name!r}")
+        return self.images[rows], self.labels[rows]
+
+    def split_indices(self):
+        """Train/test indices as saved next to the data."""
+        split = np.load(os.path.join(self.path, 'split.npz'))
+        return split['train_idx'], split['test_idx']
+
+    def source_paths(self):
+        with open(os.path.join(self.path, 'paths.txt'), 'r') as f:
+            return [line.rstrip('\n') for line in f]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack an ASL image dataset into a memory-mapped array")
+    parser.add_argument("dataset_path", help="Folder with one sub-folder per letter (and *_flipped)")
+    parser.add_argument("out_dir")
+    parser.add_argument("--img-size", type=int, default=64)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    pack(args.dataset_path, args.out_dir, img_size=args.img_size, test_size=args.test_size, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Frame transport benchmark: pickled frames through multiprocessing.Queue vs FrameRing slots.
+
+The worker only touches one pixel per frame (standing in for in-place annotation), so the
+numbers isolate the cost of moving frames between processes, not hand detection.
+
+    python bench_frame_ring.py --frames 2000 --in-flight 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from process_webcam import FrameProcessor, FrameRing, SLOT_CONSUMER
+
+
+def queue_worker(input_queue, output_queue):
+    while True:
+        msg = input_queue.get()
+        if msg is None:
+            break
+        frame = msg['frame']
+        frame[0, 0, 0] ^= 1
+        output_queue.put({'frame': frame, 'letter': '', 'confidence': 0})
+
+
+def ring_worker(input_queue, output_queue, ring):
+    while True:
+        msg = input_queue.get()
+        if msg is None:
+            break
+        frame = ring.view(msg['slot'], msg['shape'])
+        frame[0, 0, 0] ^= 1
+        ring.hand_over(msg['slot'], SLOT_CONSUMER)
+        output_queue.put({'slot': msg['slot'], 'shape': msg['shape'], 'letter': '', 'confidence': 0})
+
+
+def run(mode, num_frames, in_flight, shape):
+    input_queue, output_queue = Queue(), Queue()
+    ring = FrameRing(in_flight, shape) if mode == 'ring' else None
+    if ring is None:
+        process = Process(target=queue_worker, args=(input_queue, output_queue), daemon=True)
+    else:
+        process = Process(target=ring_worker, args=(input_queue, output_queue, ring), daemon=True)
+    process.start()
+    processor = FrameProcessor(input_queue, output_queue, None, ring)
+    processor.processes.append(process)
+
+    frames = [np.random.randint(0, 255, shape, dtype=np.uint8) for _ in range(in_flight)]
+    latencies = []
+    sent_at = {}
+    sent = received = 0
+    start = time.perf_counter()
+    while received < num_frames:
+        # Keep up to in_flight frames outstanding
+        while sent < num_frames and sent - received < in_flight:
+            frame = frames[sent % in_flight]
+            if not processor.submit(frame):
+                break
+            sent_at[sent] = time.perf_counter()
+            sent += 1
+        result = processor.get_result()
+        latencies.append(time.perf_counter() - sent_at.pop(received))
+        _ = result['frame'][0, 0, 0]
+        processor.release(result)
+        received += 1
+    elapsed = time.perf_counter() - start
+
+    input_queue.put(None)
+    process.join(5)
+    processor.close()
+    latencies = np.array(latencies) * 1000
+    print(f"{mode:5s}  {num_frames / elapsed:8.1f} frames/s  "
+          f"latency p50 {np.percentile(latencies, 50):.2f} ms  p99 {np.percentile(latencies, 99):.2f} ms")
+    return num_frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare queue and shared-memory frame transport")
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--in-flight", type=int, default=4)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    shape = (args.height, args.width, 3)
+    print(f"{args.frames} frames of {shape}, {args.in_flight} in flight")
+    queue_fps = run('queue', args.frames, args.in_flight, shape)
+    ring_fps = run('ring', args.frames, args.in_flight, shape)
+    print(f"ring speed-up: {ring_fps / queue_fps:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
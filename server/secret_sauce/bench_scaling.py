@@ -0,0 +1,59 @@
+"""
+Worker scaling benchmark for the webcam processor.
+
+Replays the same frames through start_processor() with 1, 2, ... N workers as fast
+as the ring allows and reports throughput, latency and how far results arrived out
+of submission order before the reorder buffer put them back.
+
+    python bench_scaling.py --source recordings/session1.mp4 --max-workers 4
+    python bench_scaling.py --source synthetic --frames 300
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from replay import load_frames, replay
+
+
+def run(frames, num_workers, ordering, warmup_seconds):
+    from process_webcam import start_processor, stop_processor
+
+    input_queue, output_queue, running, processor = start_processor(num_workers=num_workers, ordering=ordering)
+    try:
+        time.sleep(warmup_seconds)
+        return replay(processor, frames, fps=0)
+    finally:
+        stop_processor(input_queue, running, processor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the webcam processor with 1..N workers")
+    parser.add_argument("--source", default="synthetic", help="Image directory, video file or 'synthetic'")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--ordering", choices=['ordered', 'latest'], default='ordered')
+    parser.add_argument("--warmup-seconds", type=float, default=3.0, help="Time for the workers to load their models")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, limit=args.frames)
+    if not frames:
+        print(f"No frames loaded from {args.source}")
+        return
+    print(f"{len(frames)} frames from {args.source}, {os.cpu_count()} CPUs, ordering={args.ordering}")
+
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        stats = run(frames, workers, args.ordering, args.warmup_seconds)
+        baseline = baseline or stats['fps']
+        print(f"{workers:2d} workers  {stats['fps']:7.1f} fps ({stats['fps'] / baseline:.2f}x)  "
+              f"latency p50 {stats['latency_p50_ms']:.1f} ms  p95 {stats['latency_p95_ms']:.1f} ms  "
+              f"CPU {stats['worker_cpu'] * 100 if stats['worker_cpu'] is not None else float('nan'):.0f}%  "
+              f"out of order {stats['out_of_order']} (up to {stats['max_reorder']} behind)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Extract MediaPipe hand landmarks from a folder of raw hand photos.
+
+The training set today is pre-rendered wireframe images, so any change to
+handDetector._extract_wireframe means regenerating images by hand. This tool
+runs MediaPipe Hands (static_image_mode) once over the raw photos, spread over
+a process pool with one Hands graph per worker, and stores the result as a
+small columnar dataset that wireframes, geometry features or landmark-vector
+models can be rebuilt from in seconds.
+
+Output is a directory of shards, part-00000.npz, part-00001.npz, ... each with
+one row per image and the columns:
+
+    path              source image path (str)
+    label             letter folder the image came from, *_flipped stripped (str)
+    detected          whether a hand was found (bool)
+    landmarks         (21, 3) float32 normalised x, y, z (NaN if not detected)
+    handedness        0 = Left, 1 = Right, -1 = none (int8)
+    handedness_score  MediaPipe handedness confidence (float32)
+    image_size        (width, height) of the source image (int32)
+
+Shards are written atomically, so an interrupted run loses at most the shard
+in progress; re-running the same command skips every image already stored.
+
+    python extract_landmarks.py raw_photos/ landmarks/ --workers 8
+"""
+
+import argparse
+import glob
+import os
+import time
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+NUM_LANDMARKS = 21
+HANDEDNESS = {'Left': 0, 'Right': 1}
+
+# Per-worker MediaPipe graph, created once by _init_worker
+_hands = None
+
+
+def _init_worker(min_detection_confidence, model_complexity):
+    global _hands
+    import mediapipe as mp
+
+    _hands = mp.solutions.hands.Hands(
+        static_image_mode=True,
+        max_num_hands=1,
+        model_complexity=model_complexity,
+        min_detection_confidence=min_detection_confidence,
+    )
+
+
+def _extract(path):
+    """Run MediaPipe on one image. Returns a row dict."""
+    row = {
+        'path': path,
+        'detected': False,
+        'landmarks': np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32),
+        'handedness': -1,
+        'handedness_score': 0.0,
+        'image_size': (0, 0),
+    }
+    img = cv2.imread(path)
+    if img is None:
+        return row
+    h, w = img.shape[:2]
+    row['image_size'] = (w, h)
+
+    results = _hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    if results.multi_hand_landmarks:
+        hand = results.multi_hand_landmarks[0]
+        row['detected'] = True
+        row['landmarks'] = np.array([(lm.x, lm.y, lm.z) for lm in hand.landmark], dtype=np.float32)
+        if results.multi_handedness:
+            classification = results.multi_handedness[0].classification[0]
+            row['handedness'] = HANDEDNESS.get(classification.label, -1)
+            row['handedness_score'] = classification.score
+    return row
+
+
+def label_for(path):
+    """Letter label from the image's parent folder (A, A_flipped -> A)."""
+    folder = os.path.basename(os.path.dirname(path))
+    return folder[:-len('_flipped')] if folder.endswith('_flipped') else folder
+
+
+def list_images(input_dir):
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def shard_paths(out_dir):
+    return sorted(glob.glob(os.path.join(out_dir, 'part-*.npz')))
+
+
+def load_landmarks(out_dir):
+    """Load every shard in out_dir and return the columns concatenated into one dict of arrays."""
+    shards = [np.load(p) for p in shard_paths(out_dir)]
+    if not shards:
+        raise FileNotFoundError(f"No landmark shards found in {out_dir}")
+    return {key: np.concatenate([s[key] for s in shards]) for key in shards[0].files}
+
+
+def write_shard(out_dir, index, rows):
+    """Write rows as one columnar shard, atomically."""
+    columns = {
+        'path': np.array([r['path'] for r in rows]),
+        'label': np.array([label_for(r['path']) for r in rows]),
+        'detected': np.array([r['detected'] for r in rows], dtype=bool),
+        'landmarks': np.stack([r['landmarks'] for r in rows]).astype(np.float32),
+        'handedness': np.array([r['handedness'] for r in rows], dtype=np.int8),
+        'handedness_score': np.array([r['handedness_score'] for r in rows], dtype=np.float32),
+        'image_size': np.array([r['image_size'] for r in rows], dtype=np.int32),
+    }
+    final_path = os.path.join(out_dir, f"part-{index:05d}.npz")
+    # Not matched by the part-*.npz glob, so a half-written shard is never read back
+    tmp_path = os.path.join(out_dir, f"tmp-part-{index:05d}.npz")
+    np.savez_compressed(tmp_path, **columns)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def extract(input_dir, out_dir, workers=None, shard_size=512, min_detection_confidence=0.5, model_complexity=1):
+    """Extract landmarks for every image under input_dir that isn't already in out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    existing = shard_paths(out_dir)
+    done = set()
+    for shard in existing:
+        done.update(np.load(shard)['path'].tolist())
+
+    todo = [p for p in list_images(input_dir) if p not in done]
+    print(f"{len(done)} images already extracted, {len(todo)} to go")
+    if not todo:
+        return
+
+    next_index = len(existing)
+    rows = []
+    detected = 0
+    start = time.perf_counter()
+    with Pool(workers, initializer=_init_worker, initargs=(min_detection_confidence, model_complexity)) as pool:
+        for i, row in enumerate(pool.imap_unordered(_extract, todo, chunksize=8), start=1):
+            rows.append(row)
+            detected += row['detected']
+            if len(rows) >= shard_size:
+                write_shard(out_dir, next_index, rows)
+                next_index += 1
+                rows = []
+            if i % 500 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{i}/{len(todo)} images ({i / elapsed:.1f} img/s, {detected} hands)")
+    if rows:
+        write_shard(out_dir, next_index, rows)
+
+    elapsed = time.perf_counter() - start
+    print(f"Extracted {len(todo)} images in {elapsed:.1f}s ({len(todo) / max(elapsed, 1e-9):.1f} img/s), "
+          f"hands found in {detected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract hand landmarks from raw photos into a columnar dataset")
+    parser.add_argument("input_dir", help="Folder of hand photos, one sub-folder per letter")
+    parser.add_argument("out_dir", help="Where to write part-*.npz shards (re-run to resume)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=512)
+    parser.add_argument("--min-detection-confidence", type=float, default=0.5)
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1])
+    args = parser.parse_args()
+    extract(args.input_dir, args.out_dir, workers=args.workers, shard_size=args.shard_size,
+            min_detection_confidence=args.min_detection_confidence, model_complexity=args.model_complexity)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compact array-backed landmarks for one hand.
+
+HandLandmarks keeps a hand's 21 landmarks in two contiguous (21, 3) arrays instead of
+a list of 21 [id, x, y] lists:
+- array: int32 (id, x, y) pixel rows, the layout of findPosition's lmList
+- normalised: float32 (x, y, z) as MediaPipe reports them (None when only pixels are
+  known, e.g. results decoded from the inference service)
+Pixel positions are worked out for all landmarks in one array operation, and the
+bounding box from two columns of it.
+
+It still behaves like the tuple of (id, x, y) tuples HandResult.landmarks used to be
+(len(), indexing, iteration, ==), and tolist() gives the legacy [[id, x, y], ...] list
+for code written against lmList.
+"""
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# (id, 0, 0) rows, copied to start each array
+_ID_ROWS = np.zeros((NUM_LANDMARKS, 3), dtype=np.int32)
+_ID_ROWS[:, 0] = np.arange(NUM_LANDMARKS)
+
+
+def _pixel_rows(points, shape):
+    """(21, 3) int32 (id, x, y) rows for normalised points in a frame of the given shape."""
+    h, w = shape[:2]
+    array = _ID_ROWS.copy()
+    # Truncated like the int(x * w) of the per-landmark loop this replaces (the float64
+    # product, so landmarks MediaPipe gives as float32 land on the same pixels)
+    array[:, 1:] = points[:, :2] * np.array((w, h), dtype=np.float64)
+    return array
+
+
+class HandLandmarks:
+    __slots__ = ('array', 'normalised')
+
+    def __init__(self, array, normalised=None):
+        array.setflags(write=False)
+        if normalised is not None:
+            normalised.setflags(write=False)
+        self.array = array
+        self.normalised = normalised
+
+    @classmethod
+    def from_normalised(cls, points, shape):
+        """Landmarks from normalised (21, 2) or (21, 3) points in a frame of the given shape."""
+        points = np.asarray(points)
+        normalised = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        normalised[:, :points.shape[1]] = points
+        return cls(_pixel_rows(points, shape), normalised)
+
+    @classmethod
+    def from_mediapipe(cls, handLms, shape):
+        """Landmarks from one hand of MediaPipe's multi_hand_landmarks, z included."""
+        normalised = np.array([(lm.x, lm.y, lm.z) for lm in handLms.landmark], dtype=np.float32)
+        return cls(_pixel_rows(normalised, shape), normalised)
+
+    @classmethod
+    def from_pixels(cls, pixels):
+        """Landmarks from (21, 2) pixel (x, y) only; normalised is None."""
+        array = _ID_ROWS.copy()
+        array[:, 1:] = pixels
+        return cls(array)
+
+    @property
+    def pixels(self):
+        """(21, 2) int32 pixel (x, y), a view of array."""
+        return self.array[:, 1:]
+
+    @property
+    def points(self):
+        """(21, 2) float32 normalised (x, y), a view of normalised (None if unknown)."""
+        return None if self.normalised is None else self.normalised[:, :2]
+
+    @property
+    def bbox(self):
+        """(xmin, ymin, xmax, ymax) in pixels."""
+        x, y = self.columns()
+        return (min(x), min(y), max(x), max(y))
+
+    @property
+    def key(self):
+        """The pixel landmarks as bytes, for dict / cache keys."""
+        return self.array.tobytes()
+
+    def columns(self):
+        """Pixel x and y as two lists, converted from the array in one go."""
+        return self.array[:, 1:].T.tolist()
+
+    def tolist(self):
+        """Legacy [[id, x, y], ...] list (findPosition's lmList)."""
+        return self.array.tolist()
+
+    def __len__(self):
+        return NUM_LANDMARKS
+
+    def __iter__(self):
+        return iter([tuple(row) for row in self.array.tolist()])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(tuple(row) for row in self.array[index].tolist())
+        return tuple(self.array[index].tolist())
+
+    def __eq__(self, other):
+        if isinstance(other, HandLandmarks):
+            return np.array_equal(self.array, other.array)
+        if isinstance(other, (tuple, list)):
+            return tuple(self) == tuple(tuple(row) for row in other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"HandLandmarks({self.tolist()})"
@@ -159,22 +159,74 @@ import time
 import os
 import mediapipe as mp
 import math
+import threading
+from collections import namedtuple
 import numpy as np
 
 # Import the ASLRecognizer class (make sure asl_recognition.py is in the same folder or installed as a module)
 from asl_recognition import ASLRecognizer
+from geometry import geometry_letter
+from landmark_augment import draw_wireframe
+from landmarks import HandLandmarks
+
+
+class HandResult(namedtuple('HandResult', ['landmarks', 'bbox', 'top_k', 'geometry_letter', 'handedness'],
+                            defaults=(None,))):
+    """
+    Immutable result of handDetector.detect() for one frame (or one hand of detect_all()).
+    landmarks: HandLandmarks (() if no hand), bbox: (xmin, ymin, xmax, ymax) or (),
+    top_k: ((letter, confidence), ...) from the CNN, geometry_letter: rule-based guess or None,
+    handedness: 'Left' / 'Right' as MediaPipe reports it (detect_all() only), or None.
+    """
+    __slots__ = ()
+
+    @property
+    def best(self):
+        """The CNN's best guess as (letter, confidence), or (None, 0.0)."""
+        return self.top_k[0] if self.top_k else (None, 0.0)
+
+
+NO_HAND = HandResult((), (), (), None)
+
+
+class TrackingContext:
+    """
+    A MediaPipe Hands graph in video mode, for tracking one stream across frames.
+    Graphs are not safe to share between threads, so give each stream (session,
+    camera) its own context and only use it from one thread at a time.
+    """
+
+    def __init__(self, maxHands=2, detectionCon=0.5, trackCon=0.5, modelComplexity=1):
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=maxHands,
+            model_complexity=modelComplexity,
+            min_detection_confidence=detectionCon,
+            min_tracking_confidence=trackCon
+        )
+
+    def close(self):
+        self.hands.close()
+
 
 class handDetector():
-    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5, use_asl=True):
+    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5, use_asl=True, headless=False,
+                 modelComplexity=1):
         self.mode = mode
         self.maxHands = maxHands
         self.detectionCon = detectionCon
         self.trackCon = trackCon
+        # MediaPipe hand landmark model: 0 = lite (faster), 1 = full
+        self.modelComplexity = modelComplexity
+        # Headless (server) mode: never draw on the input image, whatever draw= says,
+        # so callers can pass frames in without copying them first
+        self.headless = headless
         
         self.mpHands = mp.solutions.hands
         self.hands = self.mpHands.Hands(
             static_image_mode=self.mode,
             max_num_hands=self.maxHands,
+            model_complexity=self.modelComplexity,
             min_detection_confidence=self.detectionCon,
             min_tracking_confidence=self.trackCon
         )
@@ -194,6 +246,12 @@ class handDetector():
         self.asl_letter = None
         self.asl_confidence = 0.0
         
+        # Everything findPosition worked out for the last frame, as a HandResult
+        self.last_result = NO_HAND
+        
+        # Per-thread static-image graphs for detect() calls without a TrackingContext
+        self._local = threading.local()
+        
         if use_asl:
             self._init_asl_recognizer()
     
@@ -210,20 +268,144 @@ class handDetector():
             print("Please train or provide a model before using ASL recognition.")
             self.use_asl = False
 
+    # ----------------------------------------------------------------
+    # Reentrant API: no per-call state is kept on the detector
+    # ----------------------------------------------------------------
+    def tracking_context(self):
+        """New TrackingContext with this detector's settings."""
+        return TrackingContext(self.maxHands, self.detectionCon, self.trackCon, self.modelComplexity)
+
+    def _static_hands(self):
+        hands = getattr(self._local, 'hands', None)
+        if hands is None:
+            hands = self.mpHands.Hands(
+                static_image_mode=True,
+                max_num_hands=self.maxHands,
+                model_complexity=self.modelComplexity,
+                min_detection_confidence=self.detectionCon
+            )
+            self._local.hands = hands
+        return hands
+
+    def detect(self, img, context=None, handNo=0):
+        """
+        Detect a hand in a BGR frame and recognise it. Returns a HandResult.
+        Safe to call concurrently as long as each caller uses its own context;
+        without one, each thread gets its own graph in static-image mode (no tracking).
+        The frame is never drawn on.
+        """
+        handLms = self.find_hand(img, context, handNo)
+        if handLms is None:
+            return NO_HAND
+        return self._analyse_hand(handLms, img.shape)
+
+    def find_hand(self, img, context=None, handNo=0):
+        """MediaPipe landmarks of one hand in a BGR frame, or None. Same threading rules as detect()."""
+        hands = context.hands if context is not None else self._static_hands()
+        results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks or handNo >= len(results.multi_hand_landmarks):
+            return None
+        return results.multi_hand_landmarks[handNo]
+
+    def find_hands(self, img, context=None):
+        """(landmarks, handedness) of every hand MediaPipe finds in a BGR frame. Same threading rules as detect()."""
+        hands = context.hands if context is not None else self._static_hands()
+        results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            return []
+        handedness = [h.classification[0].label for h in (results.multi_handedness or [])]
+        return [(handLms, handedness[i] if i < len(handedness) else None)
+                for i, handLms in enumerate(results.multi_hand_landmarks)]
+
+    def detect_all(self, img, context=None, shape=None, classify=None):
+        """
+        detect() for every hand MediaPipe tracks (up to maxHands): a tuple of HandResults with
+        handedness, in MediaPipe's order (the first is the hand detect() returns).
+        All hands' wireframes go through the CNN as one batch.
+        shape: shape of the frame to map landmarks to, if img is a scaled-down copy of it.
+        classify(geometry_letter) -> bool: which hands the CNN runs on (default: all).
+        """
+        found = self.find_hands(img, context)
+        if not found:
+            return ()
+        shape = shape or img.shape
+        hands = [HandLandmarks.from_mediapipe(handLms, shape) for handLms, _ in found]
+        letters = [geometry_letter(hand) for hand in hands]
+        top_ks = [()] * len(found)
+        if self.use_asl and self.asl_recognizer:
+            todo = [i for i, letter in enumerate(letters) if classify is None or classify(letter)]
+            if todo:
+                for i, top_k in zip(todo, self._predict_top_k_batch([hands[i].points for i in todo])):
+                    top_ks[i] = top_k
+        return tuple(HandResult(hand, hand.bbox, top_k, letter, handedness)
+                     for (_, handedness), hand, top_k, letter in zip(found, hands, top_ks, letters))
+
+    @staticmethod
+    def hand_points(handLms):
+        """Normalised (x, y) of the 21 landmarks as a (21, 2) float64 array."""
+        return np.array([(lm.x, lm.y) for lm in handLms.landmark], dtype=np.float64)
+
+    def analyse_points(self, points, shape, top_k=None):
+        """
+        HandResult for one hand given as normalised (21, 2) points in a frame of the given shape.
+        Pass top_k to use predictions made elsewhere (e.g. batched), otherwise the CNN runs here.
+        """
+        return self.analyse_landmarks(HandLandmarks.from_normalised(points, shape), top_k)
+
+    def analyse_landmarks(self, landmarks, top_k=None):
+        """analyse_points() for a HandLandmarks (with normalised points if the CNN is to run)."""
+        if top_k is None:
+            top_k = ()
+            if self.use_asl and self.asl_recognizer:
+                top_k = self._predict_top_k(landmarks.points)
+        return HandResult(landmarks, landmarks.bbox, tuple(top_k), geometry_letter(landmarks))
+
+    def _analyse_hand(self, handLms, shape):
+        """Landmarks, bbox, top-3 and geometry letter for one MediaPipe hand."""
+        return self.analyse_landmarks(HandLandmarks.from_mediapipe(handLms, shape))
+
+    @staticmethod
+    def wireframe_input(points):
+        """The CNN's 64x64 wireframe input for normalised (21, 2) points."""
+        wireframe_img = draw_wireframe(points, img_size=256)
+        return cv2.resize(wireframe_img, (64, 64), interpolation=cv2.INTER_AREA)
+
+    def _predict_top_k(self, points, k=3):
+        """Top-k CNN predictions for one hand's wireframe, as a tuple. Empty on error."""
+        try:
+            wireframe_resized = self.wireframe_input(points)
+            return tuple((letter, conf) for letter, conf in self.asl_recognizer.predict_top_k(wireframe_resized, k=k))
+        except Exception as e:
+            print(f"ASL wireframe recognition error: {e}")
+            return ()
+
+    def _predict_top_k_batch(self, points, k=3):
+        """_predict_top_k for several hands' (21, 2) points in one CNN call."""
+        try:
+            inputs = [self.wireframe_input(hand) for hand in points]
+            return [tuple((letter, conf) for letter, conf in top_k)
+                    for top_k in self.asl_recognizer.predict_top_k_batch(inputs, k=k)]
+        except Exception as e:
+            print(f"ASL wireframe recognition error: {e}")
+            return [()] * len(points)
+
+    # ----------------------------------------------------------------
+    # Stateful API (one caller at a time): wrappers over the above that
+    # keep the last frame's results on the detector
+    # ----------------------------------------------------------------
     def findHands(self, img, draw=True):
         """Find hands and optionally draw landmarks."""
         imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         self.results = self.hands.process(imgRGB)
 
-        if self.results.multi_hand_landmarks and draw:
+        if self.results.multi_hand_landmarks and draw and not self.headless:
             for handLms in self.results.multi_hand_landmarks:
                 self.mpDraw.draw_landmarks(img, handLms, self.mpHands.HAND_CONNECTIONS)
         return img
 
     def findPosition(self, img, handNo=0, draw=True):
         """Find landmark positions of the specified hand."""
-        xList = []
-        yList = []
+        draw = draw and not self.headless
         bbox = []
         self.lmList = []
         
@@ -234,27 +416,19 @@ class handDetector():
             except IndexError:
                 return self.lmList, bbox
             
-            for id, lm in enumerate(myHand.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                xList.append(cx)
-                yList.append(cy)
-                self.lmList.append([id, cx, cy])
-                
-                if draw:
-                    cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
+            self.last_result = self._analyse_hand(myHand, img.shape)
+            self.lmList = self.last_result.landmarks.tolist()
+            bbox = self.last_result.bbox
             
-            xmin, xmax = min(xList), max(xList)
-            ymin, ymax = min(yList), max(yList)
-            bbox = (xmin, ymin, xmax, ymax)
-
             if draw:
+                for _, cx, cy in self.lmList:
+                    cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
                 cv2.rectangle(img, (bbox[0] - 20, bbox[1] - 20),
                               (bbox[2] + 20, bbox[3] + 20), (0, 255, 0), 2)
                 
-            # If ASL recognition is enabled, generate wireframe and run the model
+            # If ASL recognition is enabled, keep (and show) the model's top 3
             if self.use_asl and self.asl_recognizer:
-                self._recognize_asl_gesture_wireframe(myHand, img, bbox)
+                self._recognize_asl_gesture_wireframe(myHand, img, bbox, self.last_result.top_k)
                 
         return self.lmList, bbox
 
@@ -263,43 +437,29 @@ class handDetector():
         Create a black canvas of size (img_size x img_size).
         Draw the 21 landmarks in white, connecting them via Mediapipe's HAND_CONNECTIONS.
         """
-        wireframe = np.zeros((img_size, img_size), dtype=np.uint8)
-        points = []
-        
-        for lm in handLms.landmark:
-            x = int(lm.x * (img_size - 1))
-            y = int(lm.y * (img_size - 1))
-            points.append((x, y))
-        
-        # Draw the connections
-        for connection in self.mpHands.HAND_CONNECTIONS:
-            start_idx, end_idx = connection
-            x1, y1 = points[start_idx]
-            x2, y2 = points[end_idx]
-            cv2.line(wireframe, (x1, y1), (x2, y2), (255), 2)
-        
-        # Draw the points
-        for (x, y) in points:
-            cv2.circle(wireframe, (x, y), 4, (255), cv2.FILLED)
-        
-        return wireframe
+        # Shared with training (landmark_augment.py) so both render identical wireframes
+        points = np.array([(lm.x, lm.y) for lm in handLms.landmark], dtype=np.float32)
+        return draw_wireframe(points, img_size=img_size)
     
-    def _recognize_asl_gesture_wireframe(self, handLms, img, bbox):
+    def _recognize_asl_gesture_wireframe(self, handLms, img, bbox, top_k=None):
         """
         Generate a wireframe image for the hand,
         then get the top 3 ASL predictions and store them internally (self.asl_top3).
         """
         try:
-            # 1) Extract wireframe
-            wireframe_img = self._extract_wireframe(handLms, img_size=256)
-            # 2) Resize to 64x64
-            wireframe_resized = cv2.resize(wireframe_img, (64, 64), interpolation=cv2.INTER_AREA)
-            # 3) Get top-3 predictions
-            self.asl_top3 = self.asl_recognizer.predict_top_k(wireframe_resized, k=3)
+            # findPosition passes the top-k it already has; only recognise again if called on its own
+            if top_k is None:
+                top_k = self._predict_top_k(self.hand_points(handLms))
+            if not top_k:
+                return
+            self.asl_top3 = list(top_k)
             
             # The best guess is the first of the top 3
             self.asl_letter, self.asl_confidence = self.asl_top3[0]
             
+            if self.headless:
+                return
+            
             # Display them above the bounding box
             for i, (letter, conf) in enumerate(self.asl_top3):
                 y_offset = 30 * i
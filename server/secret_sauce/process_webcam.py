@@ -5,7 +5,9 @@ import sys
 import json
 import mediapipe as mp
 import numpy as np
-from multiprocessing import Process, Queue, Value
+from multiprocessing import Event, Process, Queue, Value, shared_memory
+from collections import deque
+import queue
 import logging
 
 # Set up logging
@@ -23,9 +25,260 @@ except Exception as e:
     logger.error(f"Error importing handDetector: {e}")
     sys.exit(1)
 
-def process_frame(input_queue, output_queue, running):
-    """Process frames from input_queue and put results in output_queue"""
+
+# How often a blocked worker re-checks the running flag, in seconds
+GET_TIMEOUT = 0.5
+# How long stop_processor waits for the worker to acknowledge before terminating it
+STOP_TIMEOUT = 5.0
+# How long an ordered consumer waits for a missing frame before skipping past it
+REORDER_TIMEOUT = 1.0
+# Autoscaling: seconds between checks, and empty-queue checks in a row before removing a worker
+SCALE_INTERVAL = 0.5
+SCALE_DOWN_CHECKS = 6
+
+# 'frame': annotated frame in every result; 'results': compact record only (see process_frame)
+OUTPUT_MODES = ('frame', 'results')
+
+# Slot ownership states for FrameRing
+SLOT_FREE, SLOT_PRODUCER, SLOT_WORKER, SLOT_CONSUMER = 0, 1, 2, 3
+
+class FrameRing:
+    """
+    Preallocated frame slots in shared memory, so frames don't have to be pickled through the queues.
+
+    Each slot is owned by exactly one party at a time and ownership only moves forward:
+    FREE -> PRODUCER (acquire) -> WORKER (submitted) -> CONSUMER (result returned) -> FREE (release).
+    Only slot indices and small result dicts cross the queues. The free list lives in the
+    parent process, so a slot can't be handed out again, and overwritten, until the consumer
+    has released it. The per-slot state is kept in shared memory so the worker can check it
+    owns the slot before touching the pixels.
+    """
+
+    def __init__(self, num_slots=8, frame_shape=(480, 640, 3)):
+        self.num_slots = num_slots
+        self.frame_shape = tuple(frame_shape)
+        self.slot_bytes = int(np.prod(self.frame_shape))
+        # Frames first, then one state byte per slot
+        self._shm = shared_memory.SharedMemory(create=True, size=num_slots * self.slot_bytes + num_slots)
+        self._owner = True
+        self._map()
+        self.states[:] = SLOT_FREE
+        self._free = deque(range(num_slots))
+
+    def _map(self):
+        self.frames = np.ndarray((self.num_slots,) + self.frame_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self.states = np.ndarray((self.num_slots,), dtype=np.uint8, buffer=self._shm.buf,
+                                 offset=self.num_slots * self.slot_bytes)
+
+    def __getstate__(self):
+        # Sent to worker processes by name; the worker attaches to the same segment
+        return {'name': self._shm.name, 'num_slots': self.num_slots, 'frame_shape': self.frame_shape}
+
+    def __setstate__(self, state):
+        self.num_slots = state['num_slots']
+        self.frame_shape = state['frame_shape']
+        self.slot_bytes = int(np.prod(self.frame_shape))
+        try:
+            self._shm = shared_memory.SharedMemory(name=state['name'], track=False)
+        except TypeError:
+            # Python < 3.13: attaching registers the segment with the resource tracker,
+            # which would unlink it when this process exits. Only the creator should unlink.
+            from multiprocessing import resource_tracker
+            self._shm = shared_memory.SharedMemory(name=state['name'])
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self._owner = False
+        self._free = None
+        self._map()
+
+    def acquire(self):
+        """Take a free slot for writing. Returns None if every slot is still in flight."""
+        if not self._free:
+            return None
+        slot = self._free.popleft()
+        self.states[slot] = SLOT_PRODUCER
+        return slot
+
+    def fits(self, frame):
+        """Whether a frame fits in a slot."""
+        h, w = frame.shape[:2]
+        return h <= self.frame_shape[0] and w <= self.frame_shape[1] and frame.shape[2:] == self.frame_shape[2:]
+
+    def write(self, slot, frame):
+        """Copy a frame into a slot owned by the producer. Returns the stored shape."""
+        if not self.fits(frame):
+            raise ValueError(f"Frame of shape {frame.shape} does not fit ring slots of {self.frame_shape}")
+        h, w = frame.shape[:2]
+        self.frames[slot, :h, :w] = frame
+        return frame.shape
+
+    def view(self, slot, shape):
+        """Zero-copy view of the frame stored in a slot."""
+        return self.frames[slot, :shape[0], :shape[1]]
+
+    def hand_over(self, slot, state):
+        self.states[slot] = state
+
+    def owned_by(self, slot, state):
+        return self.states[slot] == state
+
+    def release(self, slot):
+        """Return a slot to the free list once the consumer is done with its frame."""
+        self.states[slot] = SLOT_FREE
+        self._free.append(slot)
+
+    def in_flight(self):
+        return self.num_slots - len(self._free)
+
+    def close(self):
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+def recognize_letter(lmList):
+    """Geometry-based letter recognition on a landmark list. Returns (letter, confidence)."""
+    letter = ""
+    confidence = 0
+    try:
+        # --- Similar logic to main.py ---
+        finger_mcp = [5, 9, 13, 17]
+        finger_dip = [6, 10, 14, 18]
+        finger_pip = [7, 11, 15, 19]
+        finger_tip = [8, 12, 16, 20]
+
+        fingers = []
+        for i in range(4):
+            if len(lmList) > finger_tip[i] and len(lmList) > finger_dip[i]:
+                if (lmList[finger_tip[i]][1] + 25 < lmList[finger_dip[i]][1]
+                    and lmList[16][2] < lmList[20][2]):
+                    fingers.append(0.25)
+                elif (lmList[finger_tip[i]][2] > lmList[finger_dip[i]][2]):
+                    fingers.append(0)
+                elif (lmList[finger_tip[i]][2] < lmList[finger_pip[i]][2]):
+                    fingers.append(1)
+                elif (lmList[finger_tip[i]][1] > lmList[finger_pip[i]][1]
+                    and lmList[finger_tip[i]][1] > lmList[finger_dip[i]][1]):
+                    fingers.append(0.5)
+
+        # Hand geometry based recognition
+        if len(lmList) > 6 and len(fingers) == 4:
+            if (lmList[3][2] > lmList[4][2]) and (lmList[3][1] > lmList[6][1]) and (lmList[4][2] < lmList[6][2]) and fingers.count(0) == 4:
+                letter = "A"
+            elif (lmList[3][1] > lmList[4][1]) and fingers.count(1) == 4:
+                letter = "B"
+            elif(lmList[3][1] > lmList[6][1]) and fingers.count(0.5) >= 1 and (lmList[4][2]> lmList[8][2]):
+                letter = "C"
+            elif(fingers[0]==1) and fingers.count(0) == 3 and (lmList[3][1] > lmList[4][1]):
+                letter = "D"
+            elif (lmList[3][1] < lmList[6][1]) and fingers.count(0) == 4 and lmList[12][2]<lmList[4][2]:
+                letter = "E"
+            elif (fingers.count(1) == 3) and (fingers[0]==0) and (lmList[3][2] > lmList[4][2]):
+                letter = "F"
+            elif(fingers[0]==0.25) and fingers.count(0) == 3:
+                letter = "G"
+            elif(fingers[0]==0.25) and(fingers[1]==0.25) and fingers.count(0) == 2:
+                letter = "H"
+            elif (lmList[4][1] < lmList[6][1]) and fingers.count(0) == 3:
+                if (len(fingers)==4 and fingers[3] == 1):
+                    letter = "I"
+            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] > lmList[10][1] and fingers.count(1) == 2):
+                letter = "K"
+            elif(fingers[0]==1) and fingers.count(0) == 3 and (lmList[3][1] < lmList[4][1]):
+                letter = "L"
+            elif (lmList[4][1] < lmList[16][1]) and fingers.count(0) == 4:
+                letter = "M"
+            elif (lmList[4][1] < lmList[12][1]) and fingers.count(0) == 4:
+                letter = "N"
+            elif(lmList[3][1] > lmList[6][1]) and (lmList[3][2] < lmList[6][2]) and fingers.count(0.5) >= 1:
+                letter = "O"
+            elif (lmList[4][1] > lmList[12][1]) and lmList[4][2]<lmList[6][2] and fingers.count(0) == 4:
+                letter = "T"
+            elif (lmList[4][1] > lmList[12][1]) and lmList[4][2]<lmList[12][2] and fingers.count(0) == 4:
+                letter = "S"
+            elif(lmList[4][2] < lmList[8][2]) and (lmList[4][2] < lmList[12][2]) and (lmList[4][2] < lmList[16][2]) and (lmList[4][2] < lmList[20][2]):
+                letter = "O"
+            elif(fingers[2] == 0)  and (lmList[4][2] < lmList[12][2]) and (lmList[4][2] > lmList[6][2]):
+                if (len(fingers)==4 and fingers[3] == 0):
+                    letter = "P"
+            elif(fingers[1] == 0) and (fingers[2] == 0) and (fingers[3] == 0) and (lmList[8][2] > lmList[5][2]) and (lmList[4][2] < lmList[1][2]):
+                letter = "Q"
+            elif(lmList[8][1] < lmList[12][1]) and (fingers.count(1) == 2) and (lmList[9][1] > lmList[4][1]):
+                letter = "R"
+            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 2 and lmList[3][2] > lmList[4][2] and (lmList[8][1] - lmList[11][1]) <= 50):
+                letter = "U"
+            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 2 and lmList[3][2] > lmList[4][2]):
+                letter = "V"
+            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 3):
+                letter = "W"
+            elif (fingers[0] == 0.5 and fingers.count(0) == 3 and lmList[4][1] > lmList[6][1]):
+                letter = "X"
+            elif(fingers.count(0) == 3) and (lmList[3][1] < lmList[4][1]):
+                if (len(fingers)==4 and fingers[3] == 1):
+                    letter = "Y"
+
+            confidence = 0.95  # Placeholder confidence value
+    
+    except Exception as e:
+        logger.error(f"Error in ASL detection logic: {e}")
+    
+    return letter, confidence
+
+def compact_result(lmList):
+    """Landmarks as a (21, 2) int16 pixel array plus their (x_min, y_min, x_max, y_max) bbox."""
+    if not lmList:
+        return None, None
+    points = np.clip(np.array(lmList, dtype=np.int32)[:, 1:3], -32768, 32767).astype(np.int16)
+    x_min, y_min = points.min(axis=0)
+    x_max, y_max = points.max(axis=0)
+    return points, (int(x_min), int(y_min), int(x_max), int(y_max))
+
+def draw_result(frame, result, landmarks=True, letter=True):
+    """
+    Consumer-side drawing for 'results' mode: the hand skeleton from result['landmarks'] and
+    the letter box, drawn in place on the consumer's own copy of the frame.
+    """
+    points = result.get('landmarks')
+    if landmarks and points is not None:
+        pts = [tuple(p) for p in points.tolist()]
+        for start, end in mp.solutions.hands.HAND_CONNECTIONS:
+            cv2.line(frame, pts[start], pts[end], (224, 224, 224), 2)
+        for p in pts:
+            cv2.circle(frame, p, 4, (0, 0, 255), cv2.FILLED)
+    if letter:
+        draw_letter(frame, result.get('letter'))
+    return frame
+
+def draw_letter(frame, letter):
+    """Draw the letter on the frame in place if detected (just like in main.py)"""
+    if letter:
+        cv2.rectangle(img=frame, pt1=(28, 355), pt2=(128, 455), 
+                     color=(0, 255, 0), thickness=cv2.FILLED)
+        cv2.putText(img=frame, text=letter, org=(45, 425), 
+                   fontFace=cv2.FONT_HERSHEY_COMPLEX, fontScale=3, 
+                   color=(255, 0, 0), thickness=8)
+    return frame
+
+def process_frame(input_queue, output_queue, running, ring=None, stopped=None, worker_id=0, output_mode='frame'):
+    """
+    Process frames from input_queue and put results in output_queue.
+    Accepts either {'frame': img} messages (frame pickled through the queue) or
+    {'slot': i, 'shape': shape} messages referring to a FrameRing slot, which is
+    annotated in place and handed back to the consumer by index. A 'seq' number on
+    the message is copied to the result so the consumer can put results back in order;
+    every message gets exactly one result, with an 'error' key if processing failed.
+
+    With output_mode='results' nothing is drawn and no frame is sent back: the result is
+    just letter, confidence, landmarks ((21, 2) int16 pixels or None), bbox and timing
+    in ms. Use draw_result() on the consumer side if the overlay is wanted.
+
+    The loop blocks on the queue, so an idle worker uses no CPU and a new frame is
+    picked up as soon as it arrives. A None message (or running set to 0, checked
+    every GET_TIMEOUT seconds) stops it; on the way out it sets the stopped event so
+    stop_processor knows the shutdown was clean.
+    """
     logger.info("Starting webcam processor")
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output_mode {output_mode!r}")
+    draw = output_mode == 'frame'
     
     # Initialize the hand detector
     try:
@@ -34,163 +287,451 @@ def process_frame(input_queue, output_queue, running):
     except Exception as e:
         logger.error(f"Failed to initialize detector: {e}")
         running.value = 0
+        if stopped is not None:
+            stopped.set()
         return
     
     while running.value:
+        frame_data = None
         try:
-            # Check if there's a frame to process
-            if not input_queue.empty():
-                # Get frame from queue
-                frame_data = input_queue.get()
-                
-                if frame_data is None:
-                    # This is a signal to stop
-                    break
-                
-                # Decode frame
+            # Wait for the next frame; the timeout only bounds how long a stop via running takes
+            try:
+                frame_data = input_queue.get(timeout=GET_TIMEOUT)
+            except queue.Empty:
+                continue
+            
+            if frame_data is None:
+                # This is a signal to stop
+                break
+            
+            slot = frame_data.get('slot')
+            if slot is not None:
+                if not ring.owned_by(slot, SLOT_WORKER):
+                    # Answered with an error below, without the slot
+                    raise RuntimeError(f"Slot {slot} was submitted without being handed to the worker")
+                frame = ring.view(slot, frame_data['shape'])
+            else:
                 frame = frame_data['frame']
-                
-                # Process frame with hand detection
-                frame = detector.findHands(frame)
-                lmList = detector.findPosition(frame, draw=False)
-                
-                # Initialize variables for ASL detection
-                letter = ""
-                confidence = 0
-                
-                # Process hand landmarks if detected
-                if lmList:
-                    try:
-                        # --- Similar logic to main.py ---
-                        finger_mcp = [5, 9, 13, 17]
-                        finger_dip = [6, 10, 14, 18]
-                        finger_pip = [7, 11, 15, 19]
-                        finger_tip = [8, 12, 16, 20]
-                        
-                        fingers = []
-                        for i in range(4):
-                            if len(lmList) > finger_tip[i] and len(lmList) > finger_dip[i]:
-                                if (lmList[finger_tip[i]][1] + 25 < lmList[finger_dip[i]][1]
-                                    and lmList[16][2] < lmList[20][2]):
-                                    fingers.append(0.25)
-                                elif (lmList[finger_tip[i]][2] > lmList[finger_dip[i]][2]):
-                                    fingers.append(0)
-                                elif (lmList[finger_tip[i]][2] < lmList[finger_pip[i]][2]):
-                                    fingers.append(1)
-                                elif (lmList[finger_tip[i]][1] > lmList[finger_pip[i]][1]
-                                    and lmList[finger_tip[i]][1] > lmList[finger_dip[i]][1]):
-                                    fingers.append(0.5)
-                        
-                        # Hand geometry based recognition
-                        if len(lmList) > 6 and len(fingers) == 4:
-                            if (lmList[3][2] > lmList[4][2]) and (lmList[3][1] > lmList[6][1]) and (lmList[4][2] < lmList[6][2]) and fingers.count(0) == 4:
-                                letter = "A"
-                            elif (lmList[3][1] > lmList[4][1]) and fingers.count(1) == 4:
-                                letter = "B"
-                            elif(lmList[3][1] > lmList[6][1]) and fingers.count(0.5) >= 1 and (lmList[4][2]> lmList[8][2]):
-                                letter = "C"
-                            elif(fingers[0]==1) and fingers.count(0) == 3 and (lmList[3][1] > lmList[4][1]):
-                                letter = "D"
-                            elif (lmList[3][1] < lmList[6][1]) and fingers.count(0) == 4 and lmList[12][2]<lmList[4][2]:
-                                letter = "E"
-                            elif (fingers.count(1) == 3) and (fingers[0]==0) and (lmList[3][2] > lmList[4][2]):
-                                letter = "F"
-                            elif(fingers[0]==0.25) and fingers.count(0) == 3:
-                                letter = "G"
-                            elif(fingers[0]==0.25) and(fingers[1]==0.25) and fingers.count(0) == 2:
-                                letter = "H"
-                            elif (lmList[4][1] < lmList[6][1]) and fingers.count(0) == 3:
-                                if (len(fingers)==4 and fingers[3] == 1):
-                                    letter = "I"
-                            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] > lmList[10][1] and fingers.count(1) == 2):
-                                letter = "K"
-                            elif(fingers[0]==1) and fingers.count(0) == 3 and (lmList[3][1] < lmList[4][1]):
-                                letter = "L"
-                            elif (lmList[4][1] < lmList[16][1]) and fingers.count(0) == 4:
-                                letter = "M"
-                            elif (lmList[4][1] < lmList[12][1]) and fingers.count(0) == 4:
-                                letter = "N"
-                            elif(lmList[3][1] > lmList[6][1]) and (lmList[3][2] < lmList[6][2]) and fingers.count(0.5) >= 1:
-                                letter = "O"
-                            elif (lmList[4][1] > lmList[12][1]) and lmList[4][2]<lmList[6][2] and fingers.count(0) == 4:
-                                letter = "T"
-                            elif (lmList[4][1] > lmList[12][1]) and lmList[4][2]<lmList[12][2] and fingers.count(0) == 4:
-                                letter = "S"
-                            elif(lmList[4][2] < lmList[8][2]) and (lmList[4][2] < lmList[12][2]) and (lmList[4][2] < lmList[16][2]) and (lmList[4][2] < lmList[20][2]):
-                                letter = "O"
-                            elif(fingers[2] == 0)  and (lmList[4][2] < lmList[12][2]) and (lmList[4][2] > lmList[6][2]):
-                                if (len(fingers)==4 and fingers[3] == 0):
-                                    letter = "P"
-                            elif(fingers[1] == 0) and (fingers[2] == 0) and (fingers[3] == 0) and (lmList[8][2] > lmList[5][2]) and (lmList[4][2] < lmList[1][2]):
-                                letter = "Q"
-                            elif(lmList[8][1] < lmList[12][1]) and (fingers.count(1) == 2) and (lmList[9][1] > lmList[4][1]):
-                                letter = "R"
-                            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 2 and lmList[3][2] > lmList[4][2] and (lmList[8][1] - lmList[11][1]) <= 50):
-                                letter = "U"
-                            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 2 and lmList[3][2] > lmList[4][2]):
-                                letter = "V"
-                            elif (lmList[4][1] < lmList[6][1] and lmList[4][1] < lmList[10][1] and fingers.count(1) == 3):
-                                letter = "W"
-                            elif (fingers[0] == 0.5 and fingers.count(0) == 3 and lmList[4][1] > lmList[6][1]):
-                                letter = "X"
-                            elif(fingers.count(0) == 3) and (lmList[3][1] < lmList[4][1]):
-                                if (len(fingers)==4 and fingers[3] == 1):
-                                    letter = "Y"
-                            
-                            confidence = 0.95  # Placeholder confidence value
-                    
-                    except Exception as e:
-                        logger.error(f"Error in ASL detection logic: {e}")
-                
-                # Draw the letter on the frame if detected (just like in main.py)
-                if letter:
-                    cv2.rectangle(img=frame, pt1=(28, 355), pt2=(128, 455), 
-                                 color=(0, 255, 0), thickness=cv2.FILLED)
-                    cv2.putText(img=frame, text=letter, org=(45, 425), 
-                               fontFace=cv2.FONT_HERSHEY_COMPLEX, fontScale=3, 
-                               color=(255, 0, 0), thickness=8)
-                
-                # Put results in output queue
-                result = {
-                    'frame': frame,
-                    'letter': letter,
-                    'confidence': confidence
+            
+            # Process frame with hand detection
+            start = time.perf_counter()
+            frame = detector.findHands(frame, draw=draw)
+            lmList = detector.findPosition(frame, draw=False)
+            detected = time.perf_counter()
+            
+            # Process hand landmarks if detected
+            letter, confidence = recognize_letter(lmList) if lmList else ("", 0)
+            if draw:
+                draw_letter(frame, letter)
+            
+            # Put results in output queue
+            result = {
+                'letter': letter,
+                'confidence': confidence,
+                'seq': frame_data.get('seq'),
+                'worker': worker_id
+            }
+            if not draw:
+                # Compact record only; the slot (if any) goes back with it so the consumer can free it
+                result['landmarks'], result['bbox'] = compact_result(lmList)
+                result['shape'] = frame.shape
+                done = time.perf_counter()
+                result['timing'] = {
+                    'detect_ms': (detected - start) * 1000,
+                    'recognize_ms': (done - detected) * 1000,
+                    'total_ms': (done - start) * 1000,
                 }
-                output_queue.put(result)
+                if slot is not None:
+                    result['slot'] = slot
+                    ring.hand_over(slot, SLOT_CONSUMER)
+            elif slot is not None:
+                # The annotated frame stays in the slot; pass ownership to the consumer
+                result['slot'] = slot
+                result['shape'] = frame_data['shape']
+                ring.hand_over(slot, SLOT_CONSUMER)
             else:
-                # Short sleep to avoid CPU spinning
-                time.sleep(0.01)
+                result['frame'] = frame
+            output_queue.put(result)
                 
         except Exception as e:
             logger.error(f"Error in frame processing loop: {e}")
-            # Continue trying to process frames even if one fails
+            # Continue trying to process frames even if one fails, but still answer this
+            # one so the consumer's reorder buffer doesn't wait for it. The slot only goes back
+            # with it if this worker holds it: one it doesn't own may be free or someone else's
+            if frame_data:
+                result = {'letter': "", 'confidence': 0, 'seq': frame_data.get('seq'),
+                          'worker': worker_id, 'error': str(e)}
+                slot = frame_data.get('slot')
+                if slot is not None and ring.owned_by(slot, SLOT_WORKER):
+                    result['slot'] = slot
+                    result['shape'] = frame_data['shape']
+                    ring.hand_over(slot, SLOT_CONSUMER)
+                output_queue.put(result)
     
+    # Shutdown handshake: release MediaPipe, then acknowledge. Only when the whole processor is
+    # stopping (running is 0) are unsent results dropped instead of blocking exit; a worker
+    # retired on its own exits after its last result is flushed to the consumer
+    detector.hands.close()
+    if not running.value:
+        output_queue.cancel_join_thread()
+    if stopped is not None:
+        stopped.set()
     logger.info("Webcam processor stopped")
 
-def start_processor():
-    """Start the frame processor in a separate process and return the queues to communicate with it"""
+class FrameProcessor:
+    """
+    Handle for the processor workers returned by start_processor.
+
+    Frames are spread over num_workers processes, each with its own handDetector, through one
+    shared input queue. submit() tags every frame with a sequence number and get_result() puts
+    results back in submission order ('ordered') or hands out only the newest one and drops
+    older ones ('latest'). With autoscale, the pool grows or shrinks between min_workers and
+    max_workers from the observed queue depth.
+
+    Also behaves like a multiprocessing.Process (is_alive/terminate/join) for older callers.
+    """
+
+    def __init__(self, input_queue, output_queue, running, ring=None, ordering='ordered',
+                 min_workers=1, max_workers=1, autoscale=False, reorder_timeout=REORDER_TIMEOUT,
+                 output_mode='frame'):
+        if ordering not in ('ordered', 'latest'):
+            raise ValueError(f"Unknown ordering {ordering!r}")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output_mode {output_mode!r}")
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.running = running
+        self.ring = ring
+        self.ordering = ordering
+        self.output_mode = output_mode
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.autoscaling = autoscale
+        self.reorder_timeout = reorder_timeout
+        self.processes = []
+        self.stopped_events = []
+        self._next_worker_id = 0
+        self._retiring = 0
+        # Sequence bookkeeping
+        self._next_seq = 0
+        self._received = 0
+        self._next_out = 0
+        self._pending = {}
+        self._gap_since = None
+        # Results that came back after a later frame's, and the furthest one was behind
+        self.out_of_order = 0
+        self.max_reorder = 0
+        # Results that came back after the ordered consumer had skipped past them
+        self.late = 0
+        self._highest_seq = -1
+        # Warned about frames too large for the ring
+        self._oversized = False
+        # Autoscaling bookkeeping
+        self._last_scale_check = time.monotonic()
+        self._idle_checks = 0
+
+    # --- worker pool ---
+
+    @property
+    def process(self):
+        """First worker process (what start_processor used to return)."""
+        return self.processes[0]
+
+    @property
+    def stopped(self):
+        return self.stopped_events[0] if self.stopped_events else None
+
+    @property
+    def num_workers(self):
+        return sum(p.is_alive() for p in self.processes) - self._retiring
+
+    def add_worker(self):
+        stopped = Event()
+        process = Process(target=process_frame, args=(self.input_queue, self.output_queue, self.running,
+                                                      self.ring, stopped, self._next_worker_id,
+                                                      self.output_mode))
+        process.daemon = True  # Will be terminated when main process exits
+        process.start()
+        self._next_worker_id += 1
+        self.processes.append(process)
+        self.stopped_events.append(stopped)
+        logger.info(f"Started worker {self._next_worker_id - 1} ({len(self.processes)} running)")
+
+    def retire_worker(self):
+        """Ask one worker (whichever takes the message) to finish its current frame and exit."""
+        self._retiring += 1
+        self.input_queue.put(None)
+
+    def _prune(self):
+        """Forget workers that have exited."""
+        alive = [(p, e) for p, e in zip(self.processes, self.stopped_events) if p.is_alive()]
+        exited = len(self.processes) - len(alive)
+        if exited:
+            self._retiring = max(0, self._retiring - exited)
+            self.processes = [p for p, _ in alive]
+            self.stopped_events = [e for _, e in alive]
+
+    def queue_depth(self):
+        """Frames submitted but not yet picked up by a worker."""
+        try:
+            return self.input_queue.qsize()
+        except NotImplementedError:
+            # macOS has no sem_getvalue; estimate from frames in flight
+            return max(0, self.in_flight() - self.num_workers)
+
+    def in_flight(self):
+        return self._next_seq - self._received
+
+    def autoscale(self):
+        """
+        Add a worker when every worker has a frame waiting behind the one it's on, remove one
+        after SCALE_DOWN_CHECKS consecutive checks with an empty queue. Runs at most once per
+        SCALE_INTERVAL seconds; called from submit() when autoscaling is on.
+        """
+        now = time.monotonic()
+        if now - self._last_scale_check < SCALE_INTERVAL:
+            return
+        self._last_scale_check = now
+        self._prune()
+        depth = self.queue_depth()
+        workers = self.num_workers
+        if depth > workers and workers < self.max_workers:
+            self._idle_checks = 0
+            self.add_worker()
+        elif depth == 0 and workers > self.min_workers:
+            self._idle_checks += 1
+            if self._idle_checks >= SCALE_DOWN_CHECKS:
+                self._idle_checks = 0
+                self.retire_worker()
+        else:
+            self._idle_checks = 0
+
+    # --- frames in ---
+
+    def submit(self, frame):
+        """
+        Send a frame to the workers, tagged with the next sequence number. With a ring, the
+        frame is copied once into a free slot; returns False (frame dropped) if every slot is
+        still in use. Frames larger than the ring's slots (a 1280x720 camera with the default
+        640x480 slots) go through the queue instead.
+        """
+        if self.autoscaling:
+            self.autoscale()
+        if self.ring is None or not self.ring.fits(frame):
+            if self.ring is not None and not self._oversized:
+                self._oversized = True
+                logger.warning(f"Frames of shape {frame.shape} don't fit ring slots of {self.ring.frame_shape}; "
+                               "sending them through the queue")
+            self.input_queue.put({'frame': frame, 'seq': self._next_seq})
+            self._next_seq += 1
+            return True
+        slot = self.ring.acquire()
+        if slot is None:
+            return False
+        try:
+            shape = self.ring.write(slot, frame)
+        except Exception:
+            self.ring.release(slot)
+            raise
+        self.ring.hand_over(slot, SLOT_WORKER)
+        self.input_queue.put({'slot': slot, 'shape': shape, 'seq': self._next_seq})
+        self._next_seq += 1
+        return True
+
+    # --- results out ---
+
+    def _pull(self, block, timeout):
+        result = self.output_queue.get(block, timeout)
+        if result.get('seq') is not None:
+            self._received += 1
+            if result['seq'] < self._highest_seq:
+                self.out_of_order += 1
+                self.max_reorder = max(self.max_reorder, self._highest_seq - result['seq'])
+            self._highest_seq = max(self._highest_seq, result['seq'])
+        if 'slot' in result:
+            if self.output_mode == 'results':
+                # Nothing to show from the slot; it can be reused straight away
+                self.ring.release(result.pop('slot'))
+            else:
+                result['frame'] = self.ring.view(result['slot'], result['shape'])
+        return result
+
+    def _pull_ready(self):
+        """Move every result that is already waiting into the reorder buffer."""
+        while True:
+            try:
+                result = self._pull(False, None)
+            except queue.Empty:
+                return None
+            if result.get('seq') is None:
+                # Legacy {'frame': img} message put on input_queue directly: no ordering
+                return result
+            self._buffer(result)
+
+    def _buffer(self, result):
+        """Keep a result for in-order delivery, or drop it if its frame was already skipped."""
+        if result['seq'] < self._next_out:
+            self.late += 1
+            self.release(result)
+            return
+        self._pending[result['seq']] = result
+
+    def get_result(self, block=True, timeout=None):
+        """
+        Get the next result. For ring frames, result['frame'] is a view into the slot and is
+        only valid until release(result) is called. Raises queue.Empty like Queue.get.
+        """
+        if self.ordering == 'latest':
+            return self._get_latest(block, timeout)
+        return self._get_ordered(block, timeout)
+
+    def _get_ordered(self, block, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            unordered = self._pull_ready()
+            if unordered is not None:
+                return unordered
+            if self._next_out in self._pending:
+                self._gap_since = None
+                result = self._pending.pop(self._next_out)
+                self._next_out += 1
+                return result
+            if self._pending:
+                # A later frame is back but the next one isn't: don't wait for it forever
+                self._gap_since = self._gap_since or time.monotonic()
+                if time.monotonic() - self._gap_since > self.reorder_timeout:
+                    logger.warning(f"Skipping frames {self._next_out}..{min(self._pending) - 1} that never returned")
+                    self._next_out = max(self._next_out, min(self._pending))
+                    continue
+            if not block:
+                raise queue.Empty
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            wait = self.reorder_timeout if self._pending else remaining
+            if remaining is not None and wait is not None:
+                wait = min(wait, remaining)
+            try:
+                result = self._pull(True, wait)
+            except queue.Empty:
+                continue
+            if result.get('seq') is None:
+                return result
+            self._buffer(result)
+
+    def _get_latest(self, block, timeout):
+        newest = self._pull(block, timeout)
+        while True:
+            try:
+                result = self._pull(False, None)
+            except queue.Empty:
+                break
+            if (result.get('seq') or 0) >= (newest.get('seq') or 0):
+                newest, result = result, newest
+            self.release(result)
+        if newest.get('seq') is not None:
+            if newest['seq'] < self._next_out:
+                # Older than something already delivered
+                self.release(newest)
+                raise queue.Empty
+            self._next_out = newest['seq'] + 1
+        return newest
+
+    def latest_result(self):
+        """
+        Non-blocking: drain every result that is ready and return only the newest (or None).
+        Older results are released straight away, so a slow consumer never falls behind.
+        """
+        latest = None
+        while True:
+            try:
+                result = self.get_result(block=False)
+            except queue.Empty:
+                return latest
+            if latest is not None:
+                self.release(latest)
+            latest = result
+
+    def release(self, result):
+        """Give a result's slot back to the ring. No-op for queue-path results."""
+        if result.get('slot') is not None:
+            self.ring.release(result['slot'])
+
+    # --- Process-like API ---
+
+    def is_alive(self):
+        return any(p.is_alive() for p in self.processes)
+
+    def terminate(self):
+        for p in self.processes:
+            if p.is_alive():
+                p.terminate()
+
+    def join(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for p in self.processes:
+            p.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+def start_processor(use_shared_memory=True, num_slots=None, frame_shape=(480, 640, 3), num_workers=1,
+                    max_workers=None, ordering='ordered', autoscale=False, output_mode='frame'):
+    """
+    Start the frame processor workers and return the queues to communicate with them.
+    The last item is a FrameProcessor; use its submit()/get_result()/release() to move frames
+    through shared memory with sequence numbers, or put {'frame': img} on input_queue directly as before.
+
+    num_workers processes are started straight away. With autoscale=True the pool then varies
+    between num_workers and max_workers (default: CPU count) with the queue depth.
+
+    output_mode='results' skips drawing in the workers and returns compact results without
+    a frame (see process_frame); draw_result() puts the overlay on the consumer's frame.
+    Frames larger than frame_shape bypass shared memory; size it for the camera in use.
+    """
     input_queue = Queue()
     output_queue = Queue()
     running = Value('i', 1)  # Shared value to signal when to stop
+    max_workers = max(num_workers, max_workers or (os.cpu_count() if autoscale else num_workers))
+    # Enough slots for every worker to have a frame in hand and one waiting
+    num_slots = num_slots or max(8, 2 * max_workers)
+    ring = FrameRing(num_slots, frame_shape) if use_shared_memory else None
     
-    processor = Process(target=process_frame, args=(input_queue, output_queue, running))
-    processor.daemon = True  # Will be terminated when main process exits
-    processor.start()
+    processor = FrameProcessor(input_queue, output_queue, running, ring, ordering=ordering,
+                               min_workers=num_workers, max_workers=max_workers, autoscale=autoscale,
+                               output_mode=output_mode)
+    for _ in range(num_workers):
+        processor.add_worker()
     
     return input_queue, output_queue, running, processor
 
-def stop_processor(input_queue, running, processor):
-    """Stop the frame processor gracefully"""
+def stop_processor(input_queue, running, processor, timeout=STOP_TIMEOUT):
+    """
+    Stop the frame processor gracefully.
+    Sends one stop signal per worker, then waits for the workers to acknowledge and exit.
+    Workers are only terminated if they haven't done so within timeout seconds.
+    """
     running.value = 0
-    input_queue.put(None)  # Signal to stop
+    workers = getattr(processor, 'processes', [processor])
+    for _ in workers:
+        input_queue.put(None)  # Signal to stop
     
-    # Give it a moment to clean up
-    time.sleep(0.5)
+    deadline = time.monotonic() + timeout
+    for stopped in getattr(processor, 'stopped_events', []):
+        if not stopped.wait(max(0, deadline - time.monotonic())):
+            logger.warning("Processor did not acknowledge stop request")
+    processor.join(max(0, deadline - time.monotonic()))
     
     # If it's still alive, terminate it
     if processor.is_alive():
+        logger.warning("Processor still running after stop request, terminating it")
         processor.terminate()
         processor.join()
+    
+    if hasattr(processor, 'close'):
+        processor.close()
 
 # Testing the processor directly
 if __name__ == "__main__":
@@ -208,13 +749,14 @@ if __name__ == "__main__":
                 print("Failed to grab frame")
                 break
                 
-            # Send frame to processor
-            input_queue.put({'frame': img})
+            # Send frame to processor (dropped if all shared-memory slots are busy)
+            processor.submit(img)
             
-            # Get processed frame
-            if not output_queue.empty():
-                result = output_queue.get()
+            # Show the newest processed frame, if any, without waiting for it
+            result = processor.latest_result()
+            if result is not None:
                 cv2.imshow("Processed Frame", result['frame'])
+                processor.release(result)
                 if result['letter']:
                     print(f"Detected letter: {result['letter']}")
                 
@@ -226,4 +768,4 @@ if __name__ == "__main__":
         # Clean up
         cap.release()
         cv2.destroyAllWindows()
-        stop_processor(input_queue, running, processor) 
\ No newline at end of file
+        stop_processor(input_queue, running, processor)
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Replay harness for the webcam processor.
+
+Feeds a recorded set of frames into start_processor() at a fixed rate and reports
+per-frame latency (submit -> result), throughput and the worker's CPU use, both
+while replaying and while idle.
+
+Frames come from a directory of images, a video file, or --source synthetic
+(random frames with no hand in them, which still exercises MediaPipe's palm detector).
+
+    python replay.py --source recordings/session1.mp4 --fps 15
+    python replay.py --source synthetic --frames 300 --fps 0 --idle-seconds 5
+"""
+
+import argparse
+import glob
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def load_frames(source, limit=300, size=(640, 480)):
+    """Load up to limit BGR frames of the given (width, height) from a directory, video file or 'synthetic'."""
+    frames = []
+    if source == 'synthetic':
+        rng = np.random.default_rng(0)
+        for _ in range(limit):
+            frames.append(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8))
+        return frames
+
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, '*')) if p.lower().endswith(IMAGE_EXTENSIONS))
+        for path in paths[:limit]:
+            img = cv2.imread(path)
+            if img is not None:
+                frames.append(cv2.resize(img, size))
+        return frames
+
+    cap = cv2.VideoCapture(source)
+    while len(frames) < limit:
+        success, img = cap.read()
+        if not success:
+            break
+        frames.append(cv2.resize(img, size))
+    cap.release()
+    return frames
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process from /proc (Linux only). Returns None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def worker_pids(processor):
+    """PIDs of the worker processes behind a FrameProcessor (including ones added by autoscaling)."""
+    return [p.pid for p in processor.processes if p.is_alive()]
+
+
+def total_cpu(processor):
+    samples = [cpu_seconds(pid) for pid in worker_pids(processor)]
+    return None if any(s is None for s in samples) else sum(samples)
+
+
+def measure_idle(processor, seconds):
+    """Worker CPU use (as a fraction of one core) while no frames are sent."""
+    before = total_cpu(processor)
+    time.sleep(seconds)
+    after = total_cpu(processor)
+    if before is None or after is None:
+        return None
+    return (after - before) / seconds
+
+
+def replay(processor, frames, fps=15.0):
+    """
+    Submit frames at fps (0 = as fast as the ring allows) and collect every result.
+    Returns a dict with latencies (ms), dropped count, throughput, worker CPU use and how
+    far results arrived out of submission order.
+
+    Runs until the result of the last frame submitted is in: with ordering='latest' the
+    processor drops results older than the newest, so those are counted as superseded.
+    """
+    sent_at = {}
+    latencies = []
+    done = threading.Event()
+    expected = [None]
+    received = [0]
+
+    def consume():
+        last = -1
+        while expected[0] is None or last < expected[0] - 1:
+            try:
+                result = processor.get_result(timeout=1.0)
+            except queue.Empty:
+                continue
+            now = time.perf_counter()
+            seq = result.get('seq', received[0])
+            if seq in sent_at:
+                latencies.append((now - sent_at.pop(seq)) * 1000)
+            processor.release(result)
+            received[0] += 1
+            last = max(last, seq)
+        done.set()
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+
+    interval = 1.0 / fps if fps else 0
+    cpu_before = total_cpu(processor)
+    start = time.perf_counter()
+    submitted = dropped = 0
+    for i, frame in enumerate(frames):
+        if interval:
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        while True:
+            sent_at[submitted] = time.perf_counter()
+            if processor.submit(frame):
+                submitted += 1
+                break
+            sent_at.pop(submitted)
+            if interval:
+                # Real-time replay: a frame that finds every slot busy is dropped, like a live camera
+                dropped += 1
+                break
+            # Throughput mode: wait for a slot instead
+            time.sleep(0.001)
+    expected[0] = submitted
+    done.wait(timeout=30)
+    elapsed = time.perf_counter() - start
+    cpu_after = total_cpu(processor)
+
+    latencies = np.array(latencies) if latencies else np.array([np.nan])
+    return {
+        'frames': submitted,
+        'dropped': dropped,
+        'superseded': submitted - received[0],
+        'fps': submitted / max(elapsed, 1e-9),
+        'latency_p50_ms': float(np.nanpercentile(latencies, 50)),
+        'latency_p95_ms': float(np.nanpercentile(latencies, 95)),
+        'latency_mean_ms': float(np.nanmean(latencies)),
+        'worker_cpu': None if cpu_before is None or cpu_after is None else (cpu_after - cpu_before) / elapsed,
+        'out_of_order': processor.out_of_order,
+        'max_reorder': processor.max_reorder,
+    }
+
+
+def print_report(stats, idle_cpu=None):
+    print(f"Frames: {stats['frames']} processed, {stats['dropped']} dropped, {stats['fps']:.1f} fps")
+    if stats['superseded']:
+        print(f"Results superseded by newer ones: {stats['superseded']}")
+    print(f"Latency: p50 {stats['latency_p50_ms']:.1f} ms, p95 {stats['latency_p95_ms']:.1f} ms, "
+          f"mean {stats['latency_mean_ms']:.1f} ms")
+    if stats['worker_cpu'] is not None:
+        print(f"Worker CPU while replaying: {stats['worker_cpu'] * 100:.1f}% of a core")
+    if idle_cpu is not None:
+        print(f"Worker CPU while idle: {idle_cpu * 100:.2f}% of a core")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded frames through the webcam processor")
+    parser.add_argument("--source", default="synthetic", help="Image directory, video file or 'synthetic'")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=15.0, help="Replay rate (0 = as fast as possible)")
+    parser.add_argument("--idle-seconds", type=float, default=5.0, help="How long to measure idle CPU for")
+    parser.add_argument("--warmup-seconds", type=float, default=3.0, help="Time for the worker to load its models")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--ordering", choices=['ordered', 'latest'], default='ordered')
+    parser.add_argument("--output-mode", choices=['frame', 'results'], default='frame',
+                        help="'results' returns compact records instead of annotated frames")
+    parser.add_argument("--no-shared-memory", action="store_true", help="Pickle frames through the queues")
+    args = parser.parse_args()
+
+    from process_webcam import start_processor, stop_processor
+
+    frames = load_frames(args.source, limit=args.frames)
+    if not frames:
+        print(f"No frames loaded from {args.source}")
+        return
+    print(f"Loaded {len(frames)} frames from {args.source}")
+
+    input_queue, output_queue, running, processor = start_processor(use_shared_memory=not args.no_shared_memory,
+                                                                    num_workers=args.workers, ordering=args.ordering,
+                                                                    output_mode=args.output_mode)
+    try:
+        time.sleep(args.warmup_seconds)
+        idle_cpu = measure_idle(processor, args.idle_seconds) if args.idle_seconds else None
+        stats = replay(processor, frames, fps=args.fps)
+        print_report(stats, idle_cpu)
+    finally:
+        stop_processor(input_queue, running, processor)
+
+
+if __name__ == "__main__":
+    main()
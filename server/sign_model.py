@@ -0,0 +1,415 @@
+"""
+Sign language model shared by the server entry points (app.py, asgi_app.py).
+
+SignLanguageModel wraps the secret-sauce hand detector, ASL CNN and geometry rules
+behind a single predict(frame, context) call; decode_frame turns a frame received
+from a client (base64 string or raw bytes) into an image.
+
+With INFERENCE_SOCKET set, detection and recognition run in the inference service
+(inference_service.py) listening on that Unix socket instead of in this process.
+
+Detector settings, processing resolution and classifier come from a named profile
+(profiles.py): ASL_PROFILE for the deployment, or per call / session.
+
+With ASL_CASCADE=1, the geometry rules run first and the CNN only when their answer
+is needed (see SignLanguageModel.needs_cnn and cascade_report.py).
+
+The motion letters J and Z come from a per-session temporal model (motion.py) when
+models/motion_model.npz exists.
+"""
+
+import base64
+import json
+import logging
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from motion import MotionModel
+from profiles import get_profile, profile_scale
+
+# Add the secret-sauce directory to the Python path so we can import from it
+secret_sauce_path = os.path.join(os.path.dirname(__file__), 'secret-sauce')
+if secret_sauce_path not in sys.path:
+    sys.path.append(secret_sauce_path)
+
+# Try importing OpenCV with error handling for missing dependencies
+try:
+    import cv2
+except ImportError as e:
+    print(f"Warning: OpenCV import error: {e}")
+    print("You may need to install a different OpenCV variant like 'opencv-contrib-python-headless'")
+    cv2 = None
+
+# Import the ASL recognition components from secret-sauce
+try:
+    from asl_recognition import ASLRecognizer
+    from geometry import geometry_letter
+    from main import NO_HAND, TrackingContext, handDetector
+except ImportError as e:
+    print(f"Error importing ASL recognition components: {e}")
+    print("Make sure the secret-sauce directory is properly set up")
+
+logger = logging.getLogger(__name__)
+
+# Default model location (secret-sauce/models)
+MODEL_PATH = os.path.join(secret_sauce_path, 'models', 'asl_model.h5')
+
+# Unix socket of a running inference service to forward to (unset: run the model in-process)
+INFERENCE_SOCKET = os.environ.get('INFERENCE_SOCKET')
+
+# Cascade mode: skip the CNN for geometry letters learned to be reliable (cascade_report.py --write)
+CASCADE = os.environ.get('ASL_CASCADE', '0') == '1'
+CASCADE_PATH = os.path.join(secret_sauce_path, 'models', 'cascade_reliable.json')
+
+# Class names of the CNN, normally shipped with the model (used when the model doesn't carry them)
+CLASS_NAMES_PATH = os.path.join(secret_sauce_path, 'models', 'class_names.txt')
+
+# Temporal model for the motion letters J and Z (motion.py train); off if the file is missing
+MOTION_PATH = os.path.join(secret_sauce_path, 'models', 'motion_model.npz')
+
+# The recognizer is loaded once per process; a pre-fork parent (prefork.py) loads it
+# before forking so every worker inherits it instead of loading its own
+_recognizer = None
+
+def read_class_names(path=CLASS_NAMES_PATH):
+    """Class names from class_names.txt, one per line ([] if the file is missing)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [line.strip() for line in f.readlines()]
+
+def load_recognizer(model_path=MODEL_PATH):
+    """Shared ASLRecognizer for this process, loaded on first use."""
+    global _recognizer
+    if _recognizer is None:
+        _recognizer = ASLRecognizer(model_path)
+    return _recognizer
+
+# Actual sign language detection model using the secret-sauce
+class SignLanguageModel:
+    def __init__(self, cascade=CASCADE, cascade_path=CASCADE_PATH, profile=None):
+        logger.info("Initializing sign language detection model...")
+        # Default profile for calls that don't name one (ASL_PROFILE)
+        self.profile = get_profile(profile)
+        # Geometry letters trusted without the CNN in cascade mode, with their measured agreement
+        self.cascade_letters = {}
+        # J / Z sequence model; None when there is no trained model
+        self.motion = None
+        # Check if OpenCV is available
+        self.ready = cv2 is not None
+        self.remote = False
+        if not self.ready:
+            logger.warning("OpenCV is not available. Using fallback mode.")
+            return
+        
+        try:
+            # Set the correct model path - use the one in secret-sauce/models
+            model_path = MODEL_PATH
+            print("MODEL PATH: ", model_path)
+            
+            if INFERENCE_SOCKET:
+                # The inference service owns the detector and the model; its client has the
+                # same detect() / tracking_context() calls as handDetector
+                from inference_service import InferenceClient
+                
+                self.detector = InferenceClient(INFERENCE_SOCKET)
+                self.remote = True
+            else:
+                # Initialize the hand detector with ASL recognition and the profile's MediaPipe settings
+                # Headless: the server only needs landmarks and top-k, never an annotated image
+                self.detector = handDetector(maxHands=self.profile.max_hands, detectionCon=self.profile.detection_con,
+                                             trackCon=self.profile.tracking_con, use_asl=True, headless=True,
+                                             modelComplexity=self.profile.model_complexity)
+                
+                # If the detector wasn't able to initialize the ASL recognizer on its own,
+                # we'll explicitly initialize it
+                if not self.detector.asl_recognizer:
+                    self.detector.asl_recognizer = load_recognizer(model_path)
+                    self.detector.use_asl = True
+            
+            # Tracking state for callers that don't bring their own context
+            self.context = self.tracking_context()
+            
+            # Define custom rules for conflicting predictions from main.py
+            self.custom_rules = {
+                ("H", "S"): "A",
+                ("U", "B"): "B",
+                ("C", "Y"): "C",
+                ("O", "C"): "C",
+                ("R", "D"): "D",
+                ("B", "F"): "F",
+                ("U", "F"): "F",
+                ("X", "I"): "I",
+                ("X", "Y"): "I",
+                ("R", "I"): "I",
+                ("X", "L"): "L",
+                ("M", "S"): "M",
+                ("M", "X"): "M",
+                ("N", "M"): "N",
+                ("N", "G"): "N",
+                ("S", "T"): "T",
+                ("H", "T"): "T",
+                ("U", "K"): "U",
+                ("V", "K"): "V",
+                ("H", "C"): "X",
+                ("G", "C"): "X",
+                ("P", "M"): "P",
+                ("G", "S"): "P",
+                ("G", "M"): "P",
+                ("Q", "M"): "Q",
+            }
+            
+            # Class names normally come with the model (from the compiled cache or
+            # class_names.txt next to the .h5); only read them here as a fallback
+            if (not self.remote and not self.detector.asl_recognizer.class_names
+                    and os.path.exists(CLASS_NAMES_PATH)):
+                self.detector.asl_recognizer.class_names = read_class_names()
+                logger.info(f"Loaded {len(self.detector.asl_recognizer.class_names)} class names")
+            
+            if cascade:
+                self.cascade_letters = self.load_cascade(cascade_path)
+            
+            self.motion = MotionModel.load(MOTION_PATH)
+            if self.motion:
+                logger.info(f"Motion letters {', '.join(self.motion.classes)} over {self.motion.window} frames")
+            
+            logger.info("ASL recognition model initialized successfully")
+            self.ready = True
+        except Exception as e:
+            logger.error(f"Failed to initialize ASL recognition model: {e}")
+            self.ready = False
+        
+    def tracking_context(self, profile=None):
+        """New tracking context with a profile's MediaPipe settings (the default profile for None)."""
+        if self.remote:
+            return self.detector.tracking_context()
+        p = get_profile(profile) if profile else self.profile
+        return TrackingContext(p.max_hands, p.detection_con, p.tracking_con, p.model_complexity)
+    
+    @property
+    def class_names(self):
+        """The CNN's class names (from class_names.txt with the inference service)."""
+        if self.ready and not self.remote:
+            return list(self.detector.asl_recognizer.class_names)
+        return read_class_names()
+    
+    def motion_tracker(self):
+        """New per-session MotionTracker, or None if there is no motion model."""
+        return self.motion.tracker() if self.motion else None
+    
+    def motion_summary(self, trackers):
+        """Motion model settings and the memory the given sessions' trackers use, for status routes."""
+        if not self.motion:
+            return {'enabled': False}
+        return self.motion.summary(trackers)
+    
+    def predict(self, frame, context=None, level=None, profile=None, motion=None):
+        """
+        Process a frame to detect and recognize ASL signs
+        Returns a dictionary with prediction results
+        
+        Keeps no per-frame state, so it can run on several threads at once provided each
+        uses its own context (tracking_context()); the default context is shared.
+        level: a degradation.Level to trade accuracy for speed under load (None = full quality).
+        profile: name of the profile to process with (None = the default); context should
+        come from tracking_context() with the same profile.
+        With the inference service, frame may also be the encoded image (see predict_image);
+        the service always processes at full quality with its own settings, and one hand.
+        The top-level fields describe the first hand; 'hands' has every hand's prediction
+        with its handedness (at most one with a single-hand profile).
+        motion: the session's MotionTracker (motion_tracker()); its result for the latest
+        frames is added as 'motion' (None until its window is full).
+        """
+        if not self.ready:
+            logger.warning("Model not ready")
+            return {"letter": None, "confidence": 0, "error": "Model not ready"}
+        
+        try:
+            # Detect and recognise the hand (the frame is not drawn on)
+            if isinstance(frame, bytes):
+                hand = self.detector.detect_image(frame, context or self.context)
+                hands = (hand,) if hand.landmarks else ()
+                cnn = True
+            else:
+                p = get_profile(profile) if profile else self.profile
+                scale = profile_scale(p, frame.shape)
+                if level:
+                    scale = min(scale, level.scale)
+                cnn = p.classifier == 'cnn' and (level is None or level.cnn)
+                if self.remote:
+                    hand = self.detector.detect(frame, context or self.context)
+                    hands = (hand,) if hand.landmarks else ()
+                else:
+                    hands = self._detect_local(frame, context or self.context, scale, cnn)
+            result = self.hands_prediction(hands, geometry_only=not cnn)
+            if motion is not None:
+                result["motion"] = self._update_motion(motion, hands)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error in prediction: {e}")
+            return {"letter": None, "confidence": 0, "error": str(e)}
+    
+    def _detect_local(self, frame, context, scale=1.0, cnn=True):
+        """
+        HandResults of every hand in the frame (detect_all()), with the CNN run as one batch
+        on the hands that need it: only if cnn is set and needs_cnn() says its answer could
+        matter. MediaPipe runs on the frame scaled by scale.
+        """
+        img = frame
+        if scale < 1:
+            img = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # Landmarks are normalised, so pixel positions (and the geometry rules' pixel
+        # thresholds) stay those of the full frame
+        return self.detector.detect_all(img, context, frame.shape,
+                                        classify=lambda letter: cnn and self.needs_cnn(letter))
+    
+    def needs_cnn(self, geometry_letter):
+        """
+        Whether the CNN has to run for a hand the geometry rules called geometry_letter:
+        they found nothing, the letter isn't in the learned reliable set, or a conflict
+        rule could turn it into another letter depending on the CNN's answer.
+        """
+        if not geometry_letter or geometry_letter not in self.cascade_letters:
+            return True
+        return any(geometry == geometry_letter and final != geometry_letter
+                   for (model, geometry), final in self.custom_rules.items())
+    
+    def load_cascade(self, path):
+        """Reliable geometry letters from cascade_report.py, as {letter: agreement}; {} if unavailable."""
+        if not os.path.exists(path):
+            logger.warning(f"Cascade mode needs {path} (cascade_report.py --write); running the CNN on every hand")
+            return {}
+        with open(path) as f:
+            letters = json.load(f)['letters']
+        logger.info(f"Cascade mode: CNN skipped for geometry letters {''.join(sorted(letters))}")
+        return letters
+    
+    def hand_prediction(self, hand, geometry_only=False):
+        """
+        The prediction dict for a HandResult. A hand without top-k whose geometry letter
+        needs no CNN (cascade mode), or any geometry letter when geometry_only (the CNN was
+        skipped under load), is reported with the letter's learned agreement as confidence
+        (0 if it has none).
+        """
+        # Initialize result
+        result = {
+            "letter": None,
+            "confidence": 0,
+            "alternatives": []
+        }
+        
+        if (hand.landmarks and not hand.top_k and hand.geometry_letter
+                and (geometry_only or not self.needs_cnn(hand.geometry_letter))):
+            result["letter"] = hand.geometry_letter
+            result["confidence"] = float(self.cascade_letters.get(hand.geometry_letter, 0.0))
+            result["geometry_letter"] = hand.geometry_letter
+        
+        # If a hand is detected and the model recognised it
+        elif hand.landmarks and hand.top_k:
+            # Get the model's best prediction
+            model_letter, model_confidence = hand.best
+            
+            # Get top-3 predictions for alternatives
+            alternatives = [{"letter": letter, "confidence": float(conf)} for letter, conf in hand.top_k]
+            
+            # Geometry-based prediction (rules from main.py)
+            geometry_letter = hand.geometry_letter
+            
+            # Determine final letter using combined approach
+            final_letter = self._determine_final_letter(model_letter, model_confidence, geometry_letter)
+            
+            # Only return a prediction if we're confident enough
+            if model_confidence > 0.3 or final_letter:
+                result["letter"] = final_letter or model_letter
+                result["confidence"] = float(model_confidence)
+                result["alternatives"] = alternatives
+                result["geometry_letter"] = geometry_letter
+        
+        return result
+    
+    def hands_prediction(self, hands, geometry_only=False):
+        """
+        The prediction dict for a frame's HandResults: the first hand's prediction at the
+        top level (as before two-hand support), and every hand's under 'hands'.
+        """
+        predictions = []
+        for hand in hands:
+            prediction = self.hand_prediction(hand, geometry_only)
+            prediction["handedness"] = hand.handedness
+            predictions.append(prediction)
+        result = dict(predictions[0]) if predictions else self.hand_prediction(NO_HAND)
+        result["hands"] = predictions
+        return result
+    
+    def _update_motion(self, motion, hands):
+        """Feed the session's MotionTracker the hand it follows (same handedness, else the first)."""
+        if not hands:
+            return motion.update(None)
+        hand = next((h for h in hands if h.handedness == motion.handedness), hands[0])
+        return motion.update(hand.landmarks.pixels, hand.handedness)
+    
+    def predict_image(self, image_data, context=None, level=None, profile=None, motion=None):
+        """
+        predict() for a frame as received from a client (base64 text or raw bytes).
+        The inference service is sent the encoded image as is; otherwise it is decoded here.
+        """
+        if self.ready and self.remote:
+            if not isinstance(image_data, (bytes, bytearray, memoryview)):
+                image_data = base64.b64decode(image_data)
+            return self.predict(bytes(image_data), context, motion=motion)
+        return self.predict(decode_frame(image_data), context, level, profile, motion)
+    
+    def _get_geometry_prediction(self, lmList):
+        """Geometry-based prediction using hand landmarks (see geometry.py)"""
+        return geometry_letter(lmList)
+    
+    def _determine_final_letter(self, model_letter, model_confidence, geometry_letter):
+        """Determine the final letter by combining model and geometry predictions"""
+        # If there's no geometry prediction, use the model
+        if not geometry_letter:
+            return model_letter
+        
+        # If model and geometry agree, use that letter
+        if model_letter == geometry_letter:
+            return model_letter
+        
+        # Check custom rules for known conflicts
+        rule_key = (model_letter, geometry_letter)
+        if rule_key in self.custom_rules:
+            return self.custom_rules[rule_key]
+        
+        # Default to model's prediction if confidence is high enough
+        if model_confidence > 0.7:
+            return model_letter
+        
+        # Fall back to geometry for specific letters that the model struggles with
+        geometry_reliable_letters = ["A", "B", "C", "D", "Y"]
+        if geometry_letter in geometry_reliable_letters:
+            return geometry_letter
+        
+        # If still undecided, use model prediction
+        return model_letter
+
+def decode_frame(image_data):
+    """
+    JPEG/PNG to a BGR (or RGB without OpenCV) numpy frame.
+    image_data is base64 text (JSON clients) or the raw bytes (binary Socket.IO frames).
+    """
+    if isinstance(image_data, (bytes, bytearray, memoryview)):
+        image_bytes = bytes(image_data)
+    else:
+        image_bytes = base64.b64decode(image_data)
+    
+    # Convert to image
+    image = Image.open(BytesIO(image_bytes))
+    
+    # Convert to OpenCV format if available
+    if cv2 is not None:
+        return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    # Fallback if OpenCV not available
+    return np.array(image)
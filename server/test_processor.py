@@ -1,5 +1,4 @@
 import cv2
-import time
 import sys
 import os
 
@@ -8,12 +7,12 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     # Import the processor functions 
-    from secret_sauce.process_webcam import start_processor, stop_processor
+    from secret_sauce.process_webcam import draw_result, start_processor, stop_processor
     
     print("Starting webcam processor test...")
     
-    # Start the processor
-    input_queue, output_queue, running, processor = start_processor()
+    # Start the processor; it only returns results, the overlay is drawn here
+    input_queue, output_queue, running, processor = start_processor(output_mode='results')
     
     # Open webcam
     cap = cv2.VideoCapture(0)
@@ -26,27 +25,23 @@ try:
                 print("Failed to grab frame")
                 break
                 
-            # Send frame to processor
-            input_queue.put({'frame': img})
+            # Send frame to processor through shared memory (dropped if every slot is busy)
+            processor.submit(img)
             
-            # Get processed frame (if available)
-            if not output_queue.empty():
-                result = output_queue.get()
-                
-                # Show processed frame
-                cv2.imshow("ASL Recognition", result['frame'])
+            # Get the newest result (if any) without blocking; stale ones are skipped
+            result = processor.latest_result()
+            if result is not None:
+                # Draw the landmarks and letter onto our own copy of the frame
+                cv2.imshow("ASL Recognition", draw_result(img, result))
                 
                 # Display the detected letter
                 if result['letter']:
                     print(f"Detected: {result['letter']} (confidence: {result['confidence']:.2f})")
             
-            # Exit on 'q' key
+            # Exit on 'q' key (waitKey also paces the loop)
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
             
-            # Short sleep to reduce CPU usage
-            time.sleep(0.01)
-            
     finally:
         print("Cleaning up...")
         cap.release()
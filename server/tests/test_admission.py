@@ -0,0 +1,71 @@
+import pytest
+
+from admission import RATE, AdmissionController, simulate
+
+
+def test_burst_then_throttled_until_a_token_refills():
+    controller = AdmissionController(1, fps=10, burst=3)
+    session = {}
+    assert [controller.admit(session, 0.0) for _ in range(4)] == [None, None, None, RATE]
+    assert controller.admit(session, 0.05) == RATE
+    assert controller.admit(session, 0.11) is None
+    assert (controller.admitted, controller.throttled) == (4, 2)
+
+
+def test_tokens_never_exceed_the_burst():
+    controller = AdmissionController(1, fps=10, burst=2)
+    session = {}
+    controller.admit(session, 0.0)
+    assert [controller.admit(session, 100.0) for _ in range(3)] == [None, None, RATE]
+
+
+def test_no_ceiling_when_fps_is_zero():
+    controller = AdmissionController(1, fps=0, burst=1)
+    session = {}
+    assert all(controller.admit(session, 0.0) is None for _ in range(100))
+
+
+def test_retry_after_is_when_the_next_token_is_due():
+    controller = AdmissionController(1, fps=10, burst=1)
+    session = {}
+    controller.admit(session, 0.0)
+    assert controller.admit(session, 0.04) == RATE
+    payload = controller.throttled_payload(session, RATE, 123)
+    assert payload == {'type': 'throttled', 'reason': RATE, 'retry_after': 60, 'timestamp': 123}
+
+
+def test_slots_go_to_waiting_sessions_in_arrival_order():
+    controller = AdmissionController(2)
+    sessions = [{} for _ in range(4)]
+    assert controller.acquire(sessions[0], 'w0')
+    assert controller.acquire(sessions[1], 'w1')
+    assert not controller.acquire(sessions[2], 'w2')
+    assert not controller.acquire(sessions[3], 'w3')
+    assert controller.release(sessions[1]) == 'w2'
+    assert controller.release(sessions[0]) == 'w3'
+    assert controller.in_flight == 2
+    assert controller.release(sessions[2]) is None
+    assert controller.release(sessions[3]) is None
+    assert controller.in_flight == 0
+
+
+def test_summary_reports_per_session_state():
+    controller = AdmissionController(1, fps=10, burst=1)
+    first, second = {}, {}
+    controller.admit(first, 0.0)
+    controller.admit(first, 0.0)
+    controller.acquire(first, 'w0')
+    controller.acquire(second, 'w1')
+    summary = controller.summary({'a': first, 'b': second, 'c': {}})
+    assert (summary['in_flight'], summary['waiting']) == (1, 1)
+    assert summary['sessions'] == {'a': {'admitted': 1, 'throttled': 1, 'in_flight': 1, 'waiting': 0},
+                                   'b': {'admitted': 0, 'throttled': 0, 'in_flight': 0, 'waiting': 1}}
+
+
+def test_the_ceiling_holds_a_greedy_client_to_its_rate():
+    rates = [60] + [10] * 8
+    uncapped = simulate(AdmissionController(4, fps=0), rates, 0.03, 20)
+    capped = simulate(AdmissionController(4, fps=15, burst=5), rates, 0.03, 20)
+    assert uncapped[0]['processed'] / 20 > 20
+    assert capped[0]['processed'] / 20 == pytest.approx(15, abs=1)
+    assert all(client['processed'] == client['sent'] for client in capped[1:])
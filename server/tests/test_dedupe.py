@@ -0,0 +1,104 @@
+import base64
+
+import numpy as np
+import pytest
+
+from dedupe import EXACT, NEAR, DedupeStats, FrameDeduper, fingerprint, frame_bytes
+
+cv2 = pytest.importorskip('cv2')
+
+KEY = (None, 'full')
+
+
+def jpeg(image, quality=90):
+    return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    # Smooth enough that JPEG re-encoding barely changes it
+    return cv2.resize(rng.integers(0, 255, (12, 16, 3), dtype=np.uint8), (320, 240), interpolation=cv2.INTER_LINEAR)
+
+
+def analyse(deduper, data, key=KEY, prediction=None):
+    """What the servers do with a frame: the cached prediction, or store a new one."""
+    cached = deduper.exact(data, key)
+    if cached is None:
+        cached = deduper.near(frame_bytes(data))
+    if cached is None:
+        deduper.store(prediction or {'letter': 'A', 'confidence': 0.9})
+    return cached
+
+
+def test_fingerprint_is_the_same_for_text_and_bytes():
+    assert fingerprint('abc') == fingerprint(b'abc')
+    assert fingerprint('abc') != fingerprint('abd')
+
+
+def test_frame_bytes_decodes_base64_text():
+    assert frame_bytes(base64.b64encode(b'\xff\xd8').decode()) == b'\xff\xd8'
+    assert frame_bytes(b'\xff\xd8') == b'\xff\xd8'
+
+
+def test_an_identical_frame_gets_the_cached_prediction(image):
+    deduper = FrameDeduper(near=False)
+    data = base64.b64encode(jpeg(image)).decode()
+    assert analyse(deduper, data) is None and deduper.hit is None
+    assert analyse(deduper, data) == {'letter': 'A', 'confidence': 0.9}
+    assert deduper.hit == EXACT
+
+
+def test_a_different_profile_or_level_is_analysed_again(image):
+    deduper = FrameDeduper(near=False)
+    data = jpeg(image)
+    analyse(deduper, data)
+    assert analyse(deduper, data, key=('fast', 'full')) is None
+    assert analyse(deduper, data, key=('fast', 'geometry_only')) is None
+
+
+def test_errors_are_never_reused(image):
+    deduper = FrameDeduper(near=False)
+    data = jpeg(image)
+    analyse(deduper, data, prediction={'error': 'no model'})
+    assert analyse(deduper, data) is None
+
+
+def test_disabled_deduper_never_hits(image):
+    deduper = FrameDeduper(enabled=False)
+    data = jpeg(image)
+    analyse(deduper, data)
+    assert analyse(deduper, data) is None
+
+
+def test_a_re_encoded_frame_is_a_near_hit_only_when_enabled(image):
+    original, re_encoded = jpeg(image, 90), jpeg(image, 85)
+    assert original != re_encoded
+    exact_only = FrameDeduper(near=False)
+    analyse(exact_only, original)
+    assert analyse(exact_only, re_encoded) is None
+
+    deduper = FrameDeduper(near=True)
+    analyse(deduper, original)
+    assert analyse(deduper, re_encoded) is not None
+    assert deduper.hit == NEAR
+    # Byte-identical copies of the near hit are then exact hits
+    assert analyse(deduper, re_encoded) is not None
+    assert deduper.hit == EXACT
+
+
+def test_a_changed_frame_is_not_a_near_hit(image):
+    changed = image.copy()
+    changed[100:140, 140:180] = 255 - changed[100:140, 140:180]
+    deduper = FrameDeduper(near=True)
+    analyse(deduper, jpeg(image))
+    assert analyse(deduper, jpeg(changed)) is None
+
+
+def test_stats_hit_ratio():
+    stats = DedupeStats(enabled=True, near=True)
+    for hit in (None, EXACT, EXACT, NEAR):
+        stats.count(hit)
+    summary = stats.summary()
+    assert (summary['frames'], summary['exact_hits'], summary['near_hits']) == (4, 2, 1)
+    assert summary['hit_ratio'] == 0.75
@@ -0,0 +1,60 @@
+from degradation import DOWN_AFTER, FRAME_STRIDE, LEVELS, UP_AFTER, DegradationController
+
+TARGET = 0.1
+
+
+def checks(controller, count, processing_time=0.0, busy=0, capacity=2):
+    for _ in range(count):
+        controller.update([processing_time] * 5, busy, capacity)
+
+
+def test_steps_down_one_level_after_sustained_pressure():
+    controller = DegradationController(target=TARGET, enabled=True)
+    checks(controller, DOWN_AFTER - 1, processing_time=2 * TARGET)
+    assert controller.index == 0
+    checks(controller, 1, processing_time=2 * TARGET)
+    assert controller.index == 1
+    checks(controller, DOWN_AFTER * len(LEVELS), processing_time=2 * TARGET)
+    assert controller.index == len(LEVELS) - 1
+
+
+def test_busy_sessions_count_as_pressure():
+    controller = DegradationController(target=TARGET, enabled=True)
+    checks(controller, DOWN_AFTER, busy=6, capacity=2)
+    assert controller.index == 1
+    assert controller.pressure == 3
+
+
+def test_steps_back_up_only_after_a_longer_calm():
+    controller = DegradationController(target=TARGET, enabled=True)
+    checks(controller, DOWN_AFTER, processing_time=2 * TARGET)
+    checks(controller, UP_AFTER - 1, processing_time=0.1 * TARGET)
+    assert controller.index == 1
+    checks(controller, 1, processing_time=0.1 * TARGET)
+    assert controller.index == 0
+    assert controller.changes == 2
+
+
+def test_moderate_load_resets_the_counts():
+    controller = DegradationController(target=TARGET, enabled=True)
+    for _ in range(3 * DOWN_AFTER):
+        checks(controller, DOWN_AFTER - 1, processing_time=2 * TARGET)
+        checks(controller, 1, processing_time=0.8 * TARGET)
+    assert controller.index == 0
+
+
+def test_disabled_controller_reports_pressure_but_stays_at_full():
+    controller = DegradationController(target=TARGET, enabled=False)
+    checks(controller, 10 * DOWN_AFTER, processing_time=5 * TARGET)
+    assert controller.index == 0
+    assert controller.pressure == 5
+
+
+def test_every_kth_frame_level_admits_one_frame_in_stride():
+    controller = DegradationController(target=TARGET, enabled=True)
+    controller.index = len(LEVELS) - 1
+    session = {}
+    admitted = [controller.admit(session) for _ in range(3 * FRAME_STRIDE)]
+    assert admitted.count(True) == 3
+    controller.index = 0
+    assert all(controller.admit(session) for _ in range(5))
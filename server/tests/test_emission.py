@@ -0,0 +1,71 @@
+import pytest
+
+from emission import BUCKET_WIDTH, ChangeFilter, EmissionStats, check_mode, fused
+
+
+def prediction(letter, confidence=0.9, motion=None):
+    result = {'letter': letter, 'confidence': confidence}
+    if motion is not None:
+        result['motion'] = motion
+    return result
+
+
+def run(changes, predictions, interval=0.1):
+    return [changes.update(p, i * interval) for i, p in enumerate(predictions)]
+
+
+def test_check_mode_rejects_unknown_modes():
+    assert check_mode('changes') == 'changes'
+    with pytest.raises(ValueError):
+        check_mode('bogus')
+
+
+def test_fused_prefers_the_motion_letter():
+    assert fused(prediction('I', 0.8, motion={'letter': 'J', 'confidence': 0.7})) == ('J', 0.7)
+    assert fused(prediction('I', 0.8, motion={'letter': None, 'confidence': 0.3})) == ('I', 0.8)
+    assert fused(prediction('I', 0.8, motion=None)) == ('I', 0.8)
+
+
+def test_first_frame_is_sent_then_only_the_letter_becoming_stable():
+    changes = ChangeFilter(stable_frames=3, heartbeat=10)
+    decisions = run(changes, [prediction('A')] * 6)
+    assert decisions == ['prediction', None, 'prediction', None, None, None]
+    assert changes.letter == 'A'
+
+
+def test_a_new_letter_is_only_sent_once_it_is_stable():
+    changes = ChangeFilter(stable_frames=3, heartbeat=10)
+    decisions = run(changes, [prediction('A')] * 3 + [prediction('B')] * 4)
+    assert decisions == ['prediction', None, 'prediction', None, None, 'prediction', None]
+    assert changes.letter == 'B'
+
+
+def test_single_frame_flicker_is_never_sent():
+    frames = [prediction('A')] * 3 + [prediction('B')] + [prediction('A')] * 3
+    changes = ChangeFilter(stable_frames=3, heartbeat=10)
+    decisions = run(changes, frames)
+    assert decisions[3:] == [None] * 4
+    assert changes.letter == 'A'
+
+
+def test_confidence_bucket_changes_need_the_margin():
+    changes = ChangeFilter(stable_frames=1, heartbeat=10)
+    low = BUCKET_WIDTH * 3
+    decisions = run(changes, [prediction('A', low + 0.1), prediction('A', low - 0.01),
+                              prediction('A', low - 0.1)])
+    assert decisions == ['prediction', None, 'prediction']
+
+
+def test_heartbeat_while_nothing_changes():
+    changes = ChangeFilter(stable_frames=3, heartbeat=1.0)
+    decisions = run(changes, [prediction('A')] * 25, interval=0.1)
+    assert decisions.count('heartbeat') == 2
+    payload = changes.heartbeat_payload(123)
+    assert payload == {'type': 'heartbeat', 'letter': 'A', 'bucket': changes.bucket, 'timestamp': 123}
+
+
+def test_stats_count_every_decision():
+    stats = EmissionStats()
+    for decision in ['prediction', None, None, 'heartbeat']:
+        stats.count(decision)
+    assert stats.summary() == {'emitted': 1, 'heartbeats': 1, 'suppressed': 2, 'suppressed_ratio': 0.5}
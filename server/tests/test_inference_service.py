@@ -0,0 +1,71 @@
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip('mediapipe')
+
+from inference_service import (ERROR, IMAGE, RESULT, decode_result, encode_result, pack_message, read_message,
+                               recv_exact)
+from landmarks import HandLandmarks
+from main import NO_HAND, HandResult
+
+
+@pytest.fixture
+def pair():
+    a, b = socket.socketpair()
+    yield a, b
+    a.close()
+    b.close()
+
+
+def test_messages_round_trip(pair):
+    a, b = pair
+    a.sendall(pack_message(7, 3, IMAGE, b'jpeg bytes') + pack_message(8, 3, ERROR))
+    assert read_message(b) == (7, 3, IMAGE, b'jpeg bytes')
+    assert read_message(b) == (8, 3, ERROR, b'')
+
+
+def test_messages_split_across_writes_are_reassembled(pair):
+    a, b = pair
+    data = pack_message(1, 2, RESULT, bytes(range(200)))
+
+    def send_slowly():
+        for i in range(0, len(data), 7):
+            a.sendall(data[i:i + 7])
+
+    sender = threading.Thread(target=send_slowly)
+    sender.start()
+    assert read_message(b) == (1, 2, RESULT, bytes(range(200)))
+    sender.join()
+
+
+def test_a_closed_connection_reads_as_none(pair):
+    a, b = pair
+    a.sendall(pack_message(1, 2, IMAGE, b'abcdef')[:-2])
+    a.close()
+    assert read_message(b) is None
+    assert recv_exact(b, 4) is None
+
+
+def test_results_round_trip():
+    rng = np.random.default_rng(0)
+    landmarks = HandLandmarks.from_pixels(rng.integers(0, 640, (21, 2)))
+    hand = HandResult(landmarks, landmarks.bbox, (('A', 0.5), ('B', 0.25)), 'A')
+    decoded = decode_result(encode_result(hand))
+    assert decoded.landmarks == hand.landmarks
+    assert decoded.bbox == hand.bbox
+    assert decoded.top_k == hand.top_k
+    assert decoded.geometry_letter == 'A'
+
+
+def test_a_hand_without_a_geometry_letter_or_top_k_round_trips():
+    landmarks = HandLandmarks.from_pixels(np.arange(42).reshape(21, 2))
+    decoded = decode_result(encode_result(HandResult(landmarks, landmarks.bbox, (), None)))
+    assert decoded.top_k == () and decoded.geometry_letter is None
+
+
+def test_no_hand_round_trips():
+    assert encode_result(NO_HAND) == b'\x00'
+    assert decode_result(b'\x00') is NO_HAND
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from motion import CHANNELS, FEATURES, KERNEL, NONE_CLASS, MotionModel, frame_features
+
+
+def random_model(window, seed=0):
+    rng = np.random.default_rng(seed)
+    return MotionModel(rng.normal(0, 0.1, (KERNEL, FEATURES, CHANNELS)), rng.normal(0, 0.1, CHANNELS),
+                       rng.normal(0, 0.5, (CHANNELS, 3)), np.zeros(3), ['J', 'Z', NONE_CLASS], window)
+
+
+def random_stream(frames, seed=1):
+    """Pixel landmarks per frame, with some frames without a hand (None)."""
+    rng = np.random.default_rng(seed)
+    return [None if rng.random() < 0.15 else rng.uniform(0, 480, (21, 2)).astype(np.float32)
+            for _ in range(frames)]
+
+
+@pytest.mark.parametrize('window', [KERNEL, 5, 16])
+def test_incremental_updates_match_classifying_each_whole_window(window):
+    model = random_model(window)
+    stream = random_stream(10 * window)
+    tracker = model.tracker()
+    features, previous = [], None
+    for i, pixels in enumerate(stream):
+        result = tracker.update(pixels)
+        features.append(frame_features(pixels, previous))
+        previous = pixels
+        if i + 1 < window:
+            assert result is None
+            continue
+        expected = model.result(model.classify(np.array(features[-window:])))
+        assert result['letter'] == expected['letter']
+        assert result['confidence'] == pytest.approx(expected['confidence'], abs=1e-5)
+
+
+def test_frame_features_without_a_hand_are_zero():
+    assert not frame_features(None).any()
+
+
+def test_frame_features_do_not_depend_on_the_frame_size():
+    pixels = random_stream(1, seed=2)[0]
+    moved = pixels + 3
+    small = frame_features(moved, pixels)
+    large = frame_features(moved * 2, pixels * 2)
+    assert small == pytest.approx(large, abs=1e-5)
+    assert small[-1] == 1
+
+
+def test_tracker_state_does_not_grow_with_the_stream():
+    tracker = random_model(16).tracker()
+    size = tracker.nbytes
+    for pixels in random_stream(200):
+        tracker.update(pixels)
+    assert tracker.nbytes == size
@@ -0,0 +1,81 @@
+import pytest
+
+from prediction_codec import (HANDEDNESS, NONE, PredictionCodec, check_encoding, quantise, sample_messages,
+                              table_letters)
+
+CLASS_NAMES = [letter for letter in 'ABCDEFGHIKLMNOPQRSTUVWXY']
+PROFILES = ['fast', 'balanced', 'accurate']
+LEVELS = ['full', 'reduced_resolution', 'geometry_only', 'every_kth_frame']
+
+
+@pytest.fixture
+def codec():
+    return PredictionCodec(table_letters(CLASS_NAMES), PROFILES, LEVELS)
+
+
+def quantised(message):
+    """The message as decode() gives it back: confidences rounded to 1/255."""
+    q = lambda confidence: quantise(confidence) / 255
+    prediction = message['prediction']
+    hands = [{**hand, 'confidence': q(hand['confidence']),
+              'alternatives': [{'letter': alt['letter'], 'confidence': q(alt['confidence'])}
+                               for alt in hand['alternatives']]} for hand in prediction['hands']]
+    expected = dict(hands[0]) if hands else {'letter': None, 'confidence': 0, 'alternatives': []}
+    expected['hands'] = hands
+    if 'motion' in prediction:
+        motion = prediction['motion']
+        expected['motion'] = motion and {'letter': motion['letter'], 'confidence': q(motion['confidence'])}
+    return {**message, 'prediction': expected}
+
+
+def test_table_letters_add_the_motion_letters_after_the_classes():
+    letters = table_letters(CLASS_NAMES)
+    assert letters[:len(CLASS_NAMES)] == CLASS_NAMES
+    assert letters[len(CLASS_NAMES):] == ['J', 'Z']
+
+
+def test_check_encoding_rejects_unknown_encodings():
+    assert check_encoding('binary') == 'binary'
+    with pytest.raises(ValueError):
+        check_encoding('bogus')
+
+
+def test_sample_messages_round_trip(codec):
+    for message in sample_messages(codec, 500):
+        data = codec.encode(message)
+        assert isinstance(data, bytes)
+        assert codec.decode(data) == quantised(message)
+
+
+@pytest.mark.parametrize('motion', [None, {'letter': 'J', 'confidence': 0.83}])
+def test_motion_field_round_trips(codec, motion):
+    message = sample_messages(codec, 1, seed=3)[0]
+    message['prediction']['motion'] = motion
+    assert codec.decode(codec.encode(message)) == quantised(message)
+
+
+def test_messages_without_a_motion_field_decode_without_one(codec):
+    message = sample_messages(codec, 1, seed=4)[0]
+    assert 'motion' not in codec.decode(codec.encode(message))['prediction']
+
+
+def test_unencodable_messages_fall_back_to_json(codec):
+    message = sample_messages(codec, 1)[0]
+    assert codec.encode({**message, 'prediction': {'error': 'decode failed'}}) is None
+    assert codec.encode({**message, 'profile': 'unknown'}) is None
+    hand = {'letter': '?', 'confidence': 0.5, 'alternatives': [], 'geometry_letter': None, 'handedness': 'Left'}
+    assert codec.encode({**message, 'prediction': {**hand, 'hands': [hand]}}) is None
+
+
+def test_table_matches_the_indices_used(codec):
+    table = codec.table()
+    assert table['handedness'] == HANDEDNESS
+    assert table['letters'] == codec.letters and len(table['letters']) < NONE
+    assert (table['profiles'], table['levels']) == (PROFILES, LEVELS)
+
+
+def test_other_versions_are_rejected(codec):
+    data = bytearray(codec.encode(sample_messages(codec, 1)[0]))
+    data[0] = 2
+    with pytest.raises(ValueError):
+        codec.decode(bytes(data))
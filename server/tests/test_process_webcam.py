@@ -0,0 +1,199 @@
+import queue
+from multiprocessing import Value
+
+import numpy as np
+import pytest
+
+pytest.importorskip('mediapipe')
+
+from secret_sauce.process_webcam import (SLOT_CONSUMER, SLOT_FREE, SLOT_PRODUCER, SLOT_WORKER,
+                                         FrameProcessor, FrameRing)
+
+SHAPE = (8, 8, 3)
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing(num_slots=3, frame_shape=SHAPE)
+    yield ring
+    ring.close()
+
+
+def make_processor(ring, **kwargs):
+    """A FrameProcessor on in-process queues with no worker processes; tests play the worker."""
+    return FrameProcessor(queue.Queue(), queue.Queue(), Value('i', 1), ring, **kwargs)
+
+
+def frame(value=0, shape=SHAPE):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_slot_ownership_moves_forward(ring):
+    slot = ring.acquire()
+    assert ring.owned_by(slot, SLOT_PRODUCER)
+    ring.write(slot, frame(7))
+    ring.hand_over(slot, SLOT_WORKER)
+    assert ring.owned_by(slot, SLOT_WORKER)
+    ring.hand_over(slot, SLOT_CONSUMER)
+    assert ring.in_flight() == 1
+    assert (ring.view(slot, SHAPE) == 7).all()
+    ring.release(slot)
+    assert ring.owned_by(slot, SLOT_FREE)
+    assert ring.in_flight() == 0
+
+
+def test_acquire_returns_none_when_every_slot_is_in_flight(ring):
+    slots = [ring.acquire() for _ in range(3)]
+    assert sorted(slots) == [0, 1, 2]
+    assert ring.acquire() is None
+    ring.release(slots[1])
+    assert ring.acquire() == slots[1]
+
+
+def test_write_rejects_frames_that_do_not_fit(ring):
+    slot = ring.acquire()
+    assert ring.fits(frame(shape=(4, 6, 3)))
+    assert not ring.fits(frame(shape=(16, 8, 3)))
+    assert not ring.fits(frame(shape=(8, 8, 1)))
+    with pytest.raises(ValueError):
+        ring.write(slot, frame(shape=(16, 8, 3)))
+
+
+def test_submit_copies_into_a_slot_handed_to_the_worker(ring):
+    processor = make_processor(ring)
+    assert processor.submit(frame(3))
+    message = processor.input_queue.get_nowait()
+    assert message['seq'] == 0 and 'frame' not in message
+    assert ring.owned_by(message['slot'], SLOT_WORKER)
+    assert (ring.view(message['slot'], message['shape']) == 3).all()
+
+
+def test_submit_drops_the_frame_when_the_ring_is_full(ring):
+    processor = make_processor(ring)
+    assert all(processor.submit(frame()) for _ in range(3))
+    assert not processor.submit(frame())
+    assert processor.input_queue.qsize() == 3
+
+
+def test_oversized_frames_go_through_the_queue_without_a_slot(ring):
+    processor = make_processor(ring)
+    for _ in range(3):
+        assert processor.submit(frame(shape=(16, 16, 3)))
+    messages = [processor.input_queue.get_nowait() for _ in range(3)]
+    assert [m['seq'] for m in messages] == [0, 1, 2]
+    assert all('slot' not in m and m['frame'].shape == (16, 16, 3) for m in messages)
+    assert ring.in_flight() == 0
+
+
+def test_a_failed_copy_gives_the_slot_back(ring, monkeypatch):
+    processor = make_processor(ring)
+
+    def fail(slot, frame):
+        raise ValueError("copy failed")
+
+    monkeypatch.setattr(ring, 'write', fail)
+    with pytest.raises(ValueError):
+        processor.submit(frame())
+    assert ring.in_flight() == 0
+    assert processor.input_queue.empty()
+
+
+def answer(processor, message, **fields):
+    """Do what a worker does with a message: hand the slot to the consumer and send a result."""
+    result = {'letter': "", 'confidence': 0, 'seq': message['seq'], 'worker': 0, **fields}
+    if 'slot' in message:
+        processor.ring.hand_over(message['slot'], SLOT_CONSUMER)
+        result['slot'], result['shape'] = message['slot'], message['shape']
+    processor.output_queue.put(result)
+
+
+def submit_all(processor, count):
+    for _ in range(count):
+        assert processor.submit(frame())
+    return [processor.input_queue.get_nowait() for _ in range(count)]
+
+
+def test_ordered_results_come_back_in_submission_order(ring):
+    processor = make_processor(ring)
+    messages = submit_all(processor, 3)
+    for i in (2, 0, 1):
+        answer(processor, messages[i])
+    delivered = []
+    for _ in range(3):
+        result = processor.get_result(timeout=1)
+        delivered.append(result['seq'])
+        processor.release(result)
+    assert delivered == [0, 1, 2]
+    assert processor.out_of_order == 2 and processor.max_reorder == 2
+    assert ring.in_flight() == 0
+
+
+def test_a_missing_result_is_skipped_after_the_reorder_timeout(ring):
+    processor = make_processor(ring, reorder_timeout=0.05)
+    messages = submit_all(processor, 2)
+    answer(processor, messages[1])
+    result = processor.get_result(timeout=1)
+    assert result['seq'] == 1
+    processor.release(result)
+
+
+def test_a_result_arriving_after_its_frame_was_skipped_is_dropped(ring):
+    processor = make_processor(ring, reorder_timeout=0.05)
+    messages = submit_all(processor, 3)
+    answer(processor, messages[1])
+    processor.release(processor.get_result(timeout=1))
+    answer(processor, messages[0])
+    answer(processor, messages[2])
+    result = processor.get_result(timeout=1)
+    assert result['seq'] == 2
+    processor.release(result)
+    assert processor.late == 1
+    assert processor._next_out == 3
+    assert not processor._pending
+    assert ring.in_flight() == 0
+    with pytest.raises(queue.Empty):
+        processor.get_result(timeout=0.1)
+
+
+def test_latest_hands_out_the_newest_result_and_releases_the_rest(ring):
+    processor = make_processor(ring, ordering='latest')
+    messages = submit_all(processor, 3)
+    for message in messages:
+        answer(processor, message)
+    result = processor.get_result(timeout=1)
+    assert result['seq'] == 2
+    assert ring.in_flight() == 1
+    processor.release(result)
+    assert ring.in_flight() == 0
+
+
+def test_latest_never_goes_back_to_an_older_result(ring):
+    processor = make_processor(ring, ordering='latest')
+    messages = submit_all(processor, 2)
+    answer(processor, messages[1])
+    processor.release(processor.get_result(timeout=1))
+    answer(processor, messages[0])
+    with pytest.raises(queue.Empty):
+        processor.get_result(timeout=1)
+    assert ring.in_flight() == 0
+
+
+def test_results_mode_frees_the_slot_as_soon_as_the_result_is_pulled(ring):
+    processor = make_processor(ring, output_mode='results')
+    messages = submit_all(processor, 2)
+    for message in messages:
+        answer(processor, message, landmarks=None, bbox=None)
+    assert [processor.get_result(timeout=1)['seq'] for _ in range(2)] == [0, 1]
+    assert ring.in_flight() == 0
+
+
+def test_error_results_keep_their_place_in_the_order(ring):
+    processor = make_processor(ring)
+    messages = submit_all(processor, 2)
+    answer(processor, messages[1])
+    answer(processor, messages[0], error="detector failed")
+    first = processor.get_result(timeout=1)
+    assert first['seq'] == 0 and first['error'] == "detector failed"
+    processor.release(first)
+    processor.release(processor.get_result(timeout=1))
+    assert ring.in_flight() == 0
@@ -10,6 +10,81 @@ export interface WebcamStreamConfig {
   quality: number;
   width: number;
   height: number;
+  binary: boolean;  // Ask for compact binary prediction messages instead of JSON
+}
+
+// Tables binary prediction messages index into, sent by the server in an 'encoding' event
+export interface PredictionEncoding {
+  format: 'binary';
+  version: number;
+  letters: string[];
+  handedness: string[];
+  profiles: string[];
+  levels: string[];
+}
+
+const ENCODING_VERSION = 1;
+const NONE = 255;
+// Flags byte of the header
+const FLAG_MOTION = 1;         // the prediction has a 'motion' field
+const FLAG_MOTION_RESULT = 2;  // ... that isn't null
+
+/**
+ * Decode a binary prediction message (server/prediction_codec.py) into the same shape
+ * as the JSON message: { type, prediction, degradation, profile, timestamp }.
+ * Confidences are quantised to steps of 1/255.
+ */
+export function decodePrediction(buffer: ArrayBuffer, encoding: PredictionEncoding): any {
+  const view = new DataView(buffer);
+  const version = view.getUint8(0);
+  if (version !== ENCODING_VERSION) {
+    throw new Error(`Unsupported prediction encoding version ${version}`);
+  }
+  const letter = (index: number) => (index === NONE ? null : encoding.letters[index]);
+  const flags = view.getUint8(1);
+  const level = view.getUint8(2);
+  const profile = view.getUint8(3);
+  const timestamp = view.getFloat64(4, true);
+  let offset = 12;
+
+  const count = view.getUint8(offset++);
+  const hands = [];
+  for (let i = 0; i < count; i++) {
+    const handedness = view.getUint8(offset);
+    const hand: any = {
+      letter: letter(view.getUint8(offset + 1)),
+      confidence: view.getUint8(offset + 2) / 255,
+      alternatives: [],
+      handedness: handedness === NONE ? null : encoding.handedness[handedness],
+    };
+    const geometry = view.getUint8(offset + 3);
+    if (geometry !== NONE) {
+      hand.geometry_letter = letter(geometry);
+    }
+    const k = view.getUint8(offset + 4);
+    offset += 5;
+    for (let j = 0; j < k; j++) {
+      hand.alternatives.push({ letter: letter(view.getUint8(offset)), confidence: view.getUint8(offset + 1) / 255 });
+      offset += 2;
+    }
+    hands.push(hand);
+  }
+
+  const prediction: any = hands.length ? { ...hands[0] } : { letter: null, confidence: 0, alternatives: [] };
+  prediction.hands = hands;
+  if (flags & FLAG_MOTION) {
+    prediction.motion = null;
+    if (flags & FLAG_MOTION_RESULT) {
+      prediction.motion = { letter: letter(view.getUint8(offset)), confidence: view.getUint8(offset + 1) / 255 };
+    }
+  }
+  return {
+    type: 'prediction',
+    prediction,
+    degradation: { level, name: encoding.levels[level] },
+    profile: encoding.profiles[profile],
+    timestamp,
+  };
 }
 
 // Default configuration
@@ -18,7 +93,8 @@ export const defaultStreamConfig: WebcamStreamConfig = {
   frameRate: 3,  // Frames per second to send
   quality: 0.7,   // JPEG quality (0-1)
   width: 320,     // Resized width
-  height: 240     // Resized height
+  height: 240,    // Resized height
+  binary: false   // JSON prediction messages
 };
 
 // Class for managing the webcam stream connection
@@ -31,6 +107,8 @@ export class WebcamStreamManager {
   private frameInterval: number | null = null;
   private config: WebcamStreamConfig;
   private onPredictionCallback: ((prediction: any) => void) | null = null;
+  private encoding: PredictionEncoding | null = null;
+  private resumeAt = 0;  // Date.now() before which frames aren't sent (after a 'throttled' reply)
 
   constructor(config: Partial<WebcamStreamConfig> = {}) {
     this.config = { ...defaultStreamConfig, ...config };
@@ -65,7 +143,9 @@ export class WebcamStreamManager {
       });
 
       this.socket.on('connect', this.handleSocketOpen.bind(this));
+      this.socket.on('encoding', this.handleEncoding.bind(this));
       this.socket.on('prediction', this.handlePrediction.bind(this));
+      this.socket.on('throttled', this.handleThrottled.bind(this));
       this.socket.on('error', this.handleServerError.bind(this));
       this.socket.on('disconnect', this.handleSocketClose.bind(this));
       this.socket.on('connect_error', this.handleConnectError.bind(this));
@@ -81,8 +161,20 @@ export class WebcamStreamManager {
     this.startStreaming();
   }
 
+  // Keep the tables binary prediction messages refer to
+  private handleEncoding(data: PredictionEncoding): void {
+    this.encoding = data;
+  }
+
   // Handle prediction messages
   private handlePrediction(data: any): void {
+    if (data instanceof ArrayBuffer) {
+      if (!this.encoding) {
+        console.error("Binary prediction received before its encoding tables");
+        return;
+      }
+      data = decodePrediction(data, this.encoding);
+    }
     console.log("Received prediction:", data.prediction);
     
     if (this.onPredictionCallback) {
@@ -90,6 +182,13 @@ export class WebcamStreamManager {
     }
   }
 
+  // The server turned a frame away (over its per-session frame-rate ceiling): hold off until it has room
+  private handleThrottled(data: { reason: string; retry_after: number | null }): void {
+    if (data.retry_after) {
+      this.resumeAt = Date.now() + data.retry_after;
+    }
+  }
+
   // Handle server errors
   private handleServerError(data: any): void {
     console.error("Server error:", data.message);
@@ -137,6 +236,9 @@ export class WebcamStreamManager {
     if (!this.streaming || !this.videoElement || !this.context || !this.socket) {
       return;
     }
+    if (Date.now() < this.resumeAt) {
+      return;
+    }
 
     try {
       // Draw the current video frame to the canvas with resizing
@@ -157,7 +259,8 @@ export class WebcamStreamManager {
       // Send the frame with additional metadata
       this.socket.emit('frame', {
         image: base64Image,
-        timestamp: Date.now()
+        timestamp: Date.now(),
+        encoding: this.config.binary ? 'binary' : 'json'
       });
     } catch (error) {
       console.error("Error capturing or sending frame:", error);
@@ -182,6 +285,8 @@ export class WebcamStreamManager {
     
     this.videoElement = null;
     this.onPredictionCallback = null;
+    this.encoding = null;
+    this.resumeAt = 0;
   }
 
   // Update stream configuration